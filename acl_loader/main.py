@@ -4,7 +4,6 @@ import click
 import ipaddress
 import json
 import syslog
-import operator
 
 import openconfig_acl
 import tabulate
@@ -12,8 +11,11 @@ import pyangbind.lib.pybindJSON as pybindJSON
 from natsort import natsorted
 from sonic_py_common import multi_asic
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from utilities_common import bulk_db
 from utilities_common.general import load_db_config
 
+from acl_loader import openconfig_json
+
 def info(msg):
     click.echo(click.style("Info: ", fg='cyan') + click.style(str(msg), fg='green'))
     syslog.syslog(syslog.LOG_INFO, msg)
@@ -114,9 +116,12 @@ class AclLoader(object):
         self.requested_session = None
         self.mirror_stage = None
         self.current_table = None
+        self.dataplane_incremental = False
         self.tables_db_info = {}
         self.rules_db_info = {}
         self.rules_info = {}
+        self.table_classes = {}
+        self.capabilities = {}
 
         # Load database config files
         load_db_config()
@@ -163,6 +168,7 @@ class AclLoader(object):
         :return:
         """
         self.tables_db_info = self.configdb.get_table(self.ACL_TABLE)
+        self.table_classes = {}
 
     def get_tables_db_info(self):
         return self.tables_db_info
@@ -279,16 +285,39 @@ class AclLoader(object):
         """
         self.max_priority = int(priority)
 
+    def set_dataplane_incremental(self, enabled):
+        """
+        Set whether updates only touch the dataplane rules which changed, instead
+        of removing all the existing dataplane rules and installing the new ones
+        :param enabled: True to update only the changed dataplane rules
+        :return:
+        """
+        self.dataplane_incremental = enabled
+
     def is_table_valid(self, tname):
         return self.tables_db_info.get(tname)
 
+    def get_table_class(self, tname):
+        """
+        Get ACL table type and stage, cached until the tables are read again or
+        rules are converted
+        :param tname: ACL table name
+        :return: Tuple, upper case table type and stage
+        """
+        table_class = self.table_classes.get(tname)
+        if table_class is None:
+            table = self.tables_db_info[tname]
+            table_class = (table["type"].upper(), table.get("stage", Stage.INGRESS).upper())
+            self.table_classes[tname] = table_class
+        return table_class
+
     def is_table_egress(self, tname):
         """
         Check if ACL table stage is egress
         :param tname: ACL table name
         :return: True if table type is Egress
         """
-        return self.tables_db_info[tname].get("stage", Stage.INGRESS).upper() == Stage.EGRESS
+        return self.get_table_class(tname)[1] == Stage.EGRESS
 
     def is_table_mirror(self, tname):
         """
@@ -296,7 +325,7 @@ class AclLoader(object):
         :param tname: ACL table name
         :return: True if table type is MIRROR or MIRRORV6 else False
         """
-        return self.tables_db_info[tname]['type'].upper().startswith(self.ACL_TABLE_TYPE_MIRROR)
+        return self.get_table_class(tname)[0].startswith(self.ACL_TABLE_TYPE_MIRROR)
 
     def is_table_l3v6(self, tname):
         """
@@ -304,7 +333,7 @@ class AclLoader(object):
         :param tname: ACL table name
         :return: True if table type is L3V6 else False
         """
-        return self.tables_db_info[tname]["type"].upper() == "L3V6"
+        return self.get_table_class(tname)[0] == "L3V6"
 
     def is_table_l3(self, tname):
         """
@@ -312,7 +341,7 @@ class AclLoader(object):
         :param tname: ACL table name
         :return: True if table type is L3 else False
         """
-        return self.tables_db_info[tname]["type"].upper() == "L3"
+        return self.get_table_class(tname)[0] == "L3"
 
     def is_table_ipv6(self, tname):
         """
@@ -320,7 +349,7 @@ class AclLoader(object):
         :param tname: ACL table name
         :return: True if table type is IPv6 else False
         """
-        return self.tables_db_info[tname]["type"].upper() in ("L3V6", "MIRRORV6")
+        return self.get_table_class(tname)[0] in ("L3V6", "MIRRORV6")
 
     def is_table_control_plane(self, tname):
         """
@@ -328,17 +357,23 @@ class AclLoader(object):
         :param tname: ACL table name
         :return: True if table type is ACL_TABLE_TYPE_CTRLPLANE else False
         """
-        return self.tables_db_info[tname]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE
+        return self.get_table_class(tname)[0] == self.ACL_TABLE_TYPE_CTRLPLANE
 
     @staticmethod
     def parse_acl_json(filename):
+        with open(filename, 'r') as f:
+            plain_json = json.load(f)
+
+        # Files using only the common part of the model are parsed without pyangbind
+        yang_acl = openconfig_json.parse(plain_json)
+        if yang_acl is not None:
+            return yang_acl
+
         yang_acl = pybindJSON.load(filename, openconfig_acl, "openconfig_acl")
         # Check pybindJSON parsing
         # pybindJSON.load will silently return an empty json object if input invalid
-        with open(filename, 'r') as f:
-            plain_json = json.load(f)
-            if len(plain_json['acl']['acl-sets']['acl-set']) != len(yang_acl.acl.acl_sets.acl_set):
-                raise AclLoaderException("Invalid input file %s" % filename)
+        if len(plain_json['acl']['acl-sets']['acl-set']) != len(yang_acl.acl.acl_sets.acl_set):
+            raise AclLoaderException("Invalid input file %s" % filename)
         return yang_acl
 
     def load_rules_from_file(self, filename):
@@ -386,16 +421,15 @@ class AclLoader(object):
 
         return rule_props
 
-    def validate_actions(self, table_name, action_props):
-        if self.is_table_control_plane(table_name):
-            return True
-
-        action_count = len(action_props)
-
-        if table_name not in self.tables_db_info:
-            raise AclLoaderException("Table {} does not exist".format(table_name))
-
-        stage = self.tables_db_info[table_name].get("stage", Stage.INGRESS)
+    def get_capabilities(self, stage):
+        """
+        Get ACL stage and switch capabilities from state database, cached until
+        rules are converted again
+        :param stage: ACL stage, upper case
+        :return: Tuple, ACL stage capability and switch capability
+        """
+        if stage in self.capabilities:
+            return self.capabilities[stage]
 
         # check if per npu state db is there then read using first state db
         # else read from global statedb
@@ -404,11 +438,25 @@ class AclLoader(object):
             # Same information should be there in all state DB's
             # as it is static information about switch capability
             namespace_statedb = list(self.per_npu_statedb.values())[0]
-            aclcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
+            aclcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage))
             switchcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
         else:
-            aclcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
+            aclcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage))
             switchcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
+
+        self.capabilities[stage] = (aclcapability, switchcapability)
+        return self.capabilities[stage]
+
+    def validate_actions(self, table_name, action_props):
+        if self.is_table_control_plane(table_name):
+            return True
+
+        action_count = len(action_props)
+
+        if table_name not in self.tables_db_info:
+            raise AclLoaderException("Table {} does not exist".format(table_name))
+
+        aclcapability, switchcapability = self.get_capabilities(self.get_table_class(table_name)[1])
         for action_key in dict(action_props):
             action_list_key = self.ACL_ACTIONS_CAPABILITY_FIELD
             if action_list_key not in aclcapability:
@@ -648,6 +696,9 @@ class AclLoader(object):
         Convert rules in openconfig ACL format to Config DB schema
         :return:
         """
+        self.table_classes = {}
+        self.capabilities = {}
+
         for acl_set_name in self.yang_acl.acl.acl_sets.acl_set:
             table_name = acl_set_name.replace(" ", "_").replace("-", "_").upper()
             acl_set = self.yang_acl.acl.acl_sets.acl_set[acl_set_name]
@@ -670,26 +721,109 @@ class AclLoader(object):
             if not self.is_table_mirror(table_name) and not self.is_table_egress(table_name):
                 deep_update(self.rules_info, self.deny_rule(table_name))
 
+    def get_rule_sort_key(self, key, rule):
+        """
+        Key ordering rules by table, then from the highest priority to the lowest,
+        so that rules are always written in the same order
+        :param key: ACL rule key, (table name, rule name)
+        :param rule: ACL rule in Config DB schema
+        :return: sort key
+        """
+        try:
+            priority = int(rule.get("PRIORITY", 0))
+        except ValueError:
+            priority = 0
+        return (key[0], -priority, key[1])
+
+    def diff_rules(self, new_rules, current_rules):
+        """
+        Compare the rules of new_rules keys in rules_info with the rules of current_rules
+        keys in rules_db_info
+        :param new_rules: set of the keys of the new rules
+        :param current_rules: set of the keys of the existing rules
+        :return: sets of the keys of the added, removed and modified rules
+        """
+        added = new_rules.difference(current_rules)
+        removed = current_rules.difference(new_rules)
+        changed = set(key for key in new_rules.intersection(current_rules)
+                      if self.rules_info[key] != self.rules_db_info[key])
+        return added, removed, changed
+
+    def get_rule_transactions(self, configdb, removed, updated):
+        """
+        Build the redis transactions removing the rules of removed keys and writing the
+        rules of updated keys, one transaction per rule. A rule is written with a single
+        HSET of its fields, in the same transaction as its removal or as the removal of
+        its deleted fields, so that a half-written rule is never seen. An updated rule
+        which is not removed first only has its modified fields written.
+        :param configdb: Config DB connector the transactions are for
+        :param removed: set of the keys of the rules to remove
+        :param updated: set of the keys of the rules to write
+        :return: list of transactions, lists of (command, args) or (command, args, kwargs)
+        """
+        def db_key(key):
+            return self.ACL_RULE + configdb.TABLE_NAME_SEPARATOR + configdb.serialize_key(key)
+
+        transactions = []
+        for key in sorted(removed.difference(updated),
+                          key=lambda key: self.get_rule_sort_key(key, self.rules_db_info.get(key, {}))):
+            transactions.append([('delete', (db_key(key),))])
+
+        for key in sorted(updated, key=lambda key: self.get_rule_sort_key(key, self.rules_info[key])):
+            new_fvs = configdb.typed_to_raw(self.rules_info[key])
+            old_fvs = {}
+            transaction = []
+            if key in removed:
+                transaction.append(('delete', (db_key(key),)))
+            elif key in self.rules_db_info:
+                old_fvs = configdb.typed_to_raw(self.rules_db_info[key])
+
+            fvs = {field: value for field, value in new_fvs.items() if old_fvs.get(field) != value}
+            if fvs:
+                transaction.append(('hset', (db_key(key),), {'mapping': fvs}))
+            deleted_fields = [field for field in old_fvs if field not in new_fvs]
+            if deleted_fields:
+                transaction.append(('hdel', (db_key(key),) + tuple(deleted_fields)))
+            if transaction:
+                transactions.append(transaction)
+        return transactions
+
+    def apply_rule_changes(self, removed, updated):
+        """
+        Remove and write ACL rules in Config DB and, if present, in the Config DB of
+        every front asic namespace. Each rule is changed atomically, the writes are
+        pipelined and the namespaces are programmed concurrently.
+        :param removed: set of the keys of the rules to remove
+        :param updated: set of the keys of the rules to write, from rules_info
+        :return:
+        """
+        configdbs = [self.configdb] + list((self.per_npu_configdb or {}).values())
+
+        def apply(configdb):
+            bulk_db.run_transactions(configdb, configdb.CONFIG_DB,
+                                     self.get_rule_transactions(configdb, removed, updated))
+
+        bulk_db.run_for_namespaces(apply, configdbs)
+
     def full_update(self):
         """
         Perform full update of ACL rules configuration. All existing rules
         will be removed. New rules loaded from file will be installed. If
         the current_table is not empty, only rules within that table will
         be removed and new rules in that table will be installed.
+        If dataplane_incremental is set, only the rules which changed are
+        removed or installed.
         :return:
         """
-        for key in self.rules_db_info:
-            if self.current_table is None or self.current_table == key[0]:
-                self.configdb.mod_entry(self.ACL_RULE, key, None)
-                # Program for per front asic namespace also if present
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
+        new_rules = set(self.rules_info.keys())
+        current_rules = set(key for key in self.rules_db_info
+                            if self.current_table is None or self.current_table == key[0])
 
-        self.configdb.mod_config({self.ACL_RULE: self.rules_info})
-        # Program for per front asic namespace also if present
-        for namespace_configdb in self.per_npu_configdb.values():
-            namespace_configdb.mod_config({self.ACL_RULE: self.rules_info})
+        if self.dataplane_incremental:
+            added, removed, changed = self.diff_rules(new_rules, current_rules)
+            self.apply_rule_changes(removed, added.union(changed))
+        else:
+            self.apply_rule_changes(current_rules, new_rules)
 
     def incremental_update(self):
         """
@@ -700,9 +834,9 @@ class AclLoader(object):
         """
 
         # TODO: Until we test ASIC behavior, we cannot assume that we can insert
-        # dataplane ACLs and shift existing ACLs. Therefore, we perform a full
-        # update on dataplane ACLs, and only perform an incremental update on
-        # control plane ACLs.
+        # dataplane ACLs and shift existing ACLs. Therefore, unless dataplane_incremental
+        # is set, we perform a full update on dataplane ACLs, and only perform an
+        # incremental update on control plane ACLs.
 
         new_rules = set(self.rules_info.keys())
         new_dataplane_rules = set()
@@ -725,46 +859,21 @@ class AclLoader(object):
             else:
                 current_dataplane_rules.add(key)
 
-        # Remove all existing dataplane rules
-        for key in current_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace also if present
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        # Add all new dataplane rules
-        for key in new_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        added_controlplane_rules = new_controlplane_rules.difference(current_controlplane_rules)
-        removed_controlplane_rules = current_controlplane_rules.difference(new_controlplane_rules)
-        existing_controlplane_rules = new_rules.intersection(current_controlplane_rules)
-
-        for key in added_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        for key in removed_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-        for key in existing_controlplane_rules:
-            if not operator.eq(self.rules_info[key], self.rules_db_info[key]):
-                self.configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
-                # Program for per-asic namespace corresponding to front asic also if present.
-                # For control plane ACL it's not needed but to keep all db in sync program everywhere
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
+        # For control plane ACL the per-asic namespaces are not needed but to keep
+        # all db in sync they are programmed everywhere
+        added, removed, changed = self.diff_rules(new_controlplane_rules, current_controlplane_rules)
+        updated = added.union(changed)
+
+        if self.dataplane_incremental:
+            added, removed_dataplane_rules, changed = self.diff_rules(new_dataplane_rules, current_dataplane_rules)
+            removed.update(removed_dataplane_rules)
+            updated.update(added, changed)
+        else:
+            # Remove all existing dataplane rules and add all new dataplane rules
+            removed.update(current_dataplane_rules)
+            updated.update(new_dataplane_rules)
+
+        self.apply_rule_changes(removed, updated)
 
     def delete(self, table=None, rule=None):
         """
@@ -772,13 +881,13 @@ class AclLoader(object):
         :param rule:
         :return:
         """
+        removed = set()
         for key in self.rules_db_info:
             if not table or table == key[0]:
                 if not rule or rule == key[1]:
-                    self.configdb.set_entry(self.ACL_RULE, key, None)
-                    # Program for per-asic namespace corresponding to front asic also if present.
-                    for namespace_configdb in self.per_npu_configdb.values():
-                        namespace_configdb.set_entry(self.ACL_RULE, key, None)
+                    removed.add(key)
+
+        self.apply_rule_changes(removed, set())
 
     def show_table(self, table_name):
         """
@@ -1022,8 +1131,10 @@ def update(ctx):
 @click.option('--session_name', type=click.STRING, required=False)
 @click.option('--mirror_stage', type=click.Choice(["ingress", "egress"]), default="ingress")
 @click.option('--max_priority', type=click.INT, required=False)
+@click.option('--dataplane_incremental', is_flag=True, default=False,
+              help='Only remove, add or modify the dataplane rules which changed')
 @click.pass_context
-def full(ctx, filename, table_name, session_name, mirror_stage, max_priority):
+def full(ctx, filename, table_name, session_name, mirror_stage, max_priority, dataplane_incremental):
     """
     Full update of ACL rules configuration.
     If a table_name is provided, the operation will be restricted in the specified table.
@@ -1041,6 +1152,7 @@ def full(ctx, filename, table_name, session_name, mirror_stage, max_priority):
     if max_priority:
         acl_loader.set_max_priority(max_priority)
 
+    acl_loader.set_dataplane_incremental(dataplane_incremental)
     acl_loader.load_rules_from_file(filename)
     acl_loader.full_update()
 
@@ -1050,8 +1162,10 @@ def full(ctx, filename, table_name, session_name, mirror_stage, max_priority):
 @click.option('--session_name', type=click.STRING, required=False)
 @click.option('--mirror_stage', type=click.Choice(["ingress", "egress"]), default="ingress")
 @click.option('--max_priority', type=click.INT, required=False)
+@click.option('--dataplane_incremental', is_flag=True, default=False,
+              help='Only remove, add or modify the dataplane rules which changed')
 @click.pass_context
-def incremental(ctx, filename, session_name, mirror_stage, max_priority):
+def incremental(ctx, filename, session_name, mirror_stage, max_priority, dataplane_incremental):
     """
     Incremental update of ACL rule configuration.
     """
@@ -1065,6 +1179,7 @@ def incremental(ctx, filename, session_name, mirror_stage, max_priority):
     if max_priority:
         acl_loader.set_max_priority(max_priority)
 
+    acl_loader.set_dataplane_incremental(dataplane_incremental)
     acl_loader.load_rules_from_file(filename)
     acl_loader.incremental_update()
 
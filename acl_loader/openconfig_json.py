@@ -0,0 +1,262 @@
+"""
+Fast parser of ACL files in openconfig ACL JSON format.
+
+The file is read with the json module and every leaf is checked against its
+type in the openconfig_acl model. The result has the same layout and leaf
+values as the object built by pybindJSON, so the rule conversion is the same
+for both, but it does not carry pyangbind's per leaf overhead.
+
+Only the containers and leaves used by acl-loader are known to the parser. A
+file using any other part of the model, or a value the parser is not sure the
+model accepts, is left to pybindJSON: parse() returns None for it, which
+keeps pyangbind the reference for validation and error reporting.
+"""
+
+import ipaddress
+import re
+
+FORWARDING_ACTIONS = ("ACCEPT", "DROP", "REJECT")
+
+TCP_FLAGS = ("TCP_SYN", "TCP_FIN", "TCP_RST", "TCP_PSH", "TCP_ACK", "TCP_URG", "TCP_ECE", "TCP_CWR")
+
+ETHERTYPES = ("ETHERTYPE_LLDP", "ETHERTYPE_VLAN", "ETHERTYPE_ROCE", "ETHERTYPE_ARP",
+              "ETHERTYPE_IPV4", "ETHERTYPE_IPV6", "ETHERTYPE_MPLS")
+
+IP_PROTOCOLS = ("IP_TCP", "IP_ICMP", "IP_UDP", "IP_IGMP", "IP_PIM", "IP_RSVP",
+                "IP_GRE", "IP_AUTH", "IP_ICMPV6", "IP_L2TP")
+
+_UINT_RE = re.compile(r"^[0-9]+$")
+# Bounds of a port range, as the port-num-range pattern of the model accepts them
+_PORT_RANGE_RE = re.compile(r"^([0-5]?[0-9]{1,4})\.\.([0-5]?[0-9]{1,4})$")
+_IPV4_PREFIX_RE = re.compile(r"^(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+                             r"(\.(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])){3}"
+                             r"/(3[0-2]|[12]?[0-9])$")
+_IPV6_PREFIX_LEN_RE = re.compile(r"^(12[0-8]|1[01][0-9]|[1-9]?[0-9])$")
+
+
+class UnsupportedAclJson(Exception):
+    """ raised for a part of the file the fast parser does not handle """
+    pass
+
+
+class Container(object):
+    """ container of the parsed model, leaves and children are attributes """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _uint(low, high):
+    def parse(value):
+        if isinstance(value, bool):
+            raise UnsupportedAclJson(value)
+        if isinstance(value, str) and _UINT_RE.match(value):
+            value = int(value)
+        if not isinstance(value, int) or value < low or value > high:
+            raise UnsupportedAclJson(value)
+        return value
+    return parse
+
+
+def _identity(names):
+    def parse(value):
+        if value not in names:
+            raise UnsupportedAclJson(value)
+        return value
+    return parse
+
+
+def _union(*types):
+    def parse(value):
+        for leaf_type in types:
+            try:
+                return leaf_type(value)
+            except UnsupportedAclJson:
+                pass
+        raise UnsupportedAclJson(value)
+    return parse
+
+
+def _string(value):
+    if not isinstance(value, str):
+        raise UnsupportedAclJson(value)
+    return value
+
+
+def _ip_prefix(value):
+    if not isinstance(value, str):
+        raise UnsupportedAclJson(value)
+    if _IPV4_PREFIX_RE.match(value):
+        return value
+
+    address, _, prefix_len = value.partition("/")
+    if ":" not in address or "%" in address or not _IPV6_PREFIX_LEN_RE.match(prefix_len):
+        raise UnsupportedAclJson(value)
+    try:
+        ipaddress.IPv6Address(address)
+    except ValueError:
+        raise UnsupportedAclJson(value)
+    return value
+
+
+def _port_range(value):
+    match = _PORT_RANGE_RE.match(value) if isinstance(value, str) else None
+    if match is None or int(match.group(1)) > 65535 or int(match.group(2)) > 65535:
+        raise UnsupportedAclJson(value)
+    return value
+
+
+class _LeafList(object):
+    def __init__(self, leaf_type):
+        self.leaf_type = leaf_type
+
+    def __call__(self, value):
+        if not isinstance(value, list):
+            raise UnsupportedAclJson(value)
+        return [self.leaf_type(item) for item in value]
+
+
+class _Schema(object):
+    """
+    Compiled schema of a container: leaf or child container name to its type
+    or _Schema, with the attributes of the container when absent from the file
+    """
+
+    def __init__(self, nodes):
+        self.nodes = {}
+        self.defaults = {}
+        for name, node in nodes.items():
+            attr = name.replace("-", "_")
+            if isinstance(node, dict):
+                node = _Schema(node)
+                self.defaults[attr] = node.default
+            else:
+                self.defaults[attr] = [] if isinstance(node, _LeafList) else ""
+            self.nodes[name] = (attr, node)
+        # containers and leaf-lists of absent parts of the file are shared, they are read only
+        self.default = Container(**self.defaults)
+
+    def build(self, data):
+        """
+        Build the container from data, its JSON content
+        :param data: dict, JSON content of the container
+        :return: Container, unset leaves are empty strings and unset leaf-lists empty lists
+        """
+        if not isinstance(data, dict):
+            raise UnsupportedAclJson(data)
+
+        attrs = dict(self.defaults)
+        for name, value in data.items():
+            if name not in self.nodes:
+                raise UnsupportedAclJson(name)
+            attr, node = self.nodes[name]
+            attrs[attr] = node.build(value) if isinstance(node, _Schema) else node(value)
+        return Container(**attrs)
+
+
+_uint8 = _uint(0, 255)
+_uint32 = _uint(0, 4294967295)
+
+ACL_ENTRY_SCHEMA = _Schema({
+    "sequence-id": _uint32,
+    "config": {
+        "sequence-id": _uint32,
+        "description": _string,
+    },
+    "actions": {
+        "config": {
+            "forwarding-action": _identity(FORWARDING_ACTIONS),
+        },
+    },
+    "l2": {
+        "config": {
+            "ethertype": _union(_uint(1536, 65535), _identity(ETHERTYPES)),
+            "vlan-id": _uint(1, 4094),
+        },
+    },
+    "ip": {
+        "config": {
+            "protocol": _union(_uint(0, 254), _identity(IP_PROTOCOLS)),
+            "source-ip-address": _ip_prefix,
+            "destination-ip-address": _ip_prefix,
+            "dscp": _uint(0, 63),
+        },
+    },
+    "icmp": {
+        "config": {
+            "type": _uint8,
+            "code": _uint8,
+        },
+    },
+    "transport": {
+        "config": {
+            "source-port": _union(_port_range, _uint(0, 65535)),
+            "destination-port": _union(_port_range, _uint(0, 65535)),
+            "tcp-flags": _LeafList(_identity(TCP_FLAGS)),
+        },
+    },
+    "input-interface": {
+        "interface-ref": {
+            "config": {
+                "interface": _string,
+            },
+        },
+    },
+})
+
+ACL_SET_SCHEMA = _Schema({
+    "name": _string,
+    "config": {
+        "name": _string,
+        "description": _string,
+    },
+})
+
+
+def _build_acl_set(data):
+    if not isinstance(data, dict):
+        raise UnsupportedAclJson(data)
+
+    acl_entries = data.get("acl-entries", {})
+    if not isinstance(acl_entries, dict) or set(acl_entries) - {"acl-entry"}:
+        raise UnsupportedAclJson(acl_entries)
+    entries = acl_entries.get("acl-entry", {})
+    if not isinstance(entries, dict):
+        raise UnsupportedAclJson(entries)
+
+    acl_entry = {}
+    for entry_name, entry in entries.items():
+        rule = ACL_ENTRY_SCHEMA.build(entry)
+        if rule.config.sequence_id == "":
+            raise UnsupportedAclJson(entry_name)
+        acl_entry[entry_name] = rule
+
+    acl_set = ACL_SET_SCHEMA.build({name: value for name, value in data.items() if name != "acl-entries"})
+    acl_set.acl_entries = Container(acl_entry=acl_entry)
+    return acl_set
+
+
+def parse(plain_json):
+    """
+    Parse ACL rules in openconfig ACL format
+    :param plain_json: content of the ACL file, as loaded by json.load
+    :return: Container laid out as the openconfig_acl model, None if the content
+        has to be parsed by pybindJSON
+    """
+    try:
+        if not isinstance(plain_json, dict) or set(plain_json) != {"acl"}:
+            raise UnsupportedAclJson(plain_json)
+        acl = plain_json["acl"]
+        if not isinstance(acl, dict) or set(acl) != {"acl-sets"}:
+            raise UnsupportedAclJson(acl)
+        acl_sets = acl["acl-sets"]
+        if not isinstance(acl_sets, dict) or set(acl_sets) != {"acl-set"} or not isinstance(acl_sets["acl-set"], dict):
+            raise UnsupportedAclJson(acl_sets)
+
+        acl_set = {}
+        for acl_set_name, data in acl_sets["acl-set"].items():
+            acl_set[acl_set_name] = _build_acl_set(data)
+    except UnsupportedAclJson:
+        return None
+
+    return Container(acl=Container(acl_sets=Container(acl_set=acl_set)))
@@ -7,6 +7,7 @@ import utilities_common.cli as clicommon
 import utilities_common.multi_asic as multi_asic_util
 
 from flow_counter_util.route import exit_if_route_flow_counter_not_support
+from utilities_common import script_runner
 from utilities_common import util_base
 from show.plugins.pbh import read_pbh_counters
 from config.plugins.pbh import serialize_pbh_counters
@@ -102,6 +103,17 @@ routing_stack = get_routing_stack()
 
 def run_command(command, pager=False, return_output=False, return_exitstatus=False):
     # Provide option for caller function to Process the output.
+    result = script_runner.run_command(command)
+    if result is not None:
+        output, returncode = result
+        if return_output:
+            return (output, None) if not return_exitstatus else (output, None, returncode)
+        elif pager:
+            click.echo_via_pager(output)
+        else:
+            click.echo(output)
+        return
+
     proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
     if return_output:
         output = proc.communicate()
@@ -17,6 +17,7 @@ import sonic_yang
 from jsondiff import diff
 from sonic_py_common import port_util
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from utilities_common import sonic_yang_cache
 from utilities_common.general import load_module_from_source
 
 
@@ -68,9 +69,9 @@ class ConfigMgmt():
         return
 
     def __init_sonic_yang(self):
-        self.sy = sonic_yang.SonicYang(YANG_DIR, debug=self.DEBUG, sonic_yang_options=self.sonicYangOptions)
-        # load yang models
-        self.sy.loadYangModel()
+        # yang models are loaded once per process and cached on disk until
+        # a model in YANG_DIR changes
+        self.sy = sonic_yang_cache.get_sonic_yang(YANG_DIR, debug=self.DEBUG, sonic_yang_options=self.sonicYangOptions)
         # load jIn from config DB or from config DB json file.
         if self.source.lower() == 'configdb':
             self.readConfigDB()
@@ -15,14 +15,15 @@ import itertools
 import copy
 
 from jsonpatch import JsonPatchConflict
-from collections import OrderedDict
 from generic_config_updater.generic_updater import GenericUpdater, ConfigFormat
 from minigraph import parse_device_desc_xml, minigraph_encoder
-from natsort import natsorted
 from portconfig import get_child_ports
 from socket import AF_INET, AF_INET6
 from sonic_py_common import device_info, multi_asic
 from sonic_py_common.interface import get_interface_table_name, get_port_table_name, get_intf_longname
+from utilities_common import bulk_db
+from utilities_common import config_db_file
+from utilities_common import systemd_util
 from utilities_common import util_base
 from swsscommon import swsscommon
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
@@ -115,19 +116,6 @@ sonic_cfggen = load_module_from_source('sonic_cfggen', '/usr/local/bin/sonic-cfg
 # Helper functions
 #
 
-# Sort nested dict
-def sort_dict(data):
-    """ Sort of 1st level and 2nd level dict of data naturally by its key
-        data: data to be sorted
-    """
-    if type(data) is not dict:
-        return data
-
-    for table in data:
-        if type(data[table]) is dict:
-            data[table] = OrderedDict(natsorted(data[table].items()))
-    return OrderedDict(natsorted(data.items()))
-
 # Read given JSON file
 def read_json_file(fileName):
     try:
@@ -857,29 +845,22 @@ def _stop_services():
     clicommon.run_command("sudo systemctl stop sonic.target --job-mode replace-irreversibly")
 
 
-def _get_sonic_services():
-    out, _ = clicommon.run_command("systemctl list-dependencies --plain sonic.target | sed '1d'", return_cmd=True)
-    return (unit.strip() for unit in out.splitlines())
+def _get_sonic_services(systemd_units):
+    return systemd_units.get_dependencies("sonic.target")
 
 
-def _get_delayed_sonic_units(get_timers=False):
-    rc1, _ = clicommon.run_command("systemctl list-dependencies --plain sonic-delayed.target | sed '1d'", return_cmd=True)
-    rc2, _ = clicommon.run_command("systemctl is-enabled {}".format(rc1.replace("\n", " ")), return_cmd=True)
-    timer = [line.strip() for line in rc1.splitlines()]
-    state = [line.strip() for line in rc2.splitlines()]
-    services = []
-    for unit in timer:
-        if state[timer.index(unit)] == "enabled":
-            if not get_timers:
-                services.append(re.sub('\.timer$', '', unit, 1))
-            else:
-                services.append(unit)
-    return services
+def _get_delayed_sonic_units(systemd_units, get_timers=False):
+    timers = systemd_units.get_enabled_units(systemd_units.get_dependencies("sonic-delayed.target"))
+    if get_timers:
+        return timers
+    return [re.sub('\.timer$', '', unit, 1) for unit in timers]
 
 
 def _reset_failed_services():
-    for service in itertools.chain(_get_sonic_services(), _get_delayed_sonic_units()):
-        clicommon.run_command("systemctl reset-failed {}".format(service))
+    # The units are queried again, the config loaded may have enabled or disabled some of them
+    systemd_units = systemd_util.SystemdUnits()
+    systemd_units.reset_failed(list(itertools.chain(_get_sonic_services(systemd_units),
+                                                    _get_delayed_sonic_units(systemd_units))))
 
 
 def _restart_services():
@@ -897,26 +878,23 @@ def _restart_services():
     click.echo("Reloading Monit configuration ...")
     clicommon.run_command("sudo monit reload")
 
-def _delay_timers_elapsed():
-    for timer in _get_delayed_sonic_units(get_timers=True):
-        out, _ = clicommon.run_command("systemctl show {} --property=LastTriggerUSecMonotonic --value".format(timer), return_cmd=True)
-        if out.strip() == "0":
+def _delay_timers_elapsed(systemd_units):
+    for timer in _get_delayed_sonic_units(systemd_units, get_timers=True):
+        if systemd_units.get_property(timer, "LastTriggerUSecMonotonic") == "0":
             return False
     return True
 
-def _per_namespace_swss_ready(service_name):
-    out, _ = clicommon.run_command("systemctl show {} --property ActiveState --value".format(service_name), return_cmd=True)
-    if out.strip() != "active":
+def _per_namespace_swss_ready(systemd_units, service_name):
+    if systemd_units.get_property(service_name, "ActiveState") != "active":
         return False
-    out, _ = clicommon.run_command("systemctl show {} --property ActiveEnterTimestampMonotonic --value".format(service_name), return_cmd=True)
-    swss_up_time = float(out.strip())/1000000
+    swss_up_time = float(systemd_units.get_property(service_name, "ActiveEnterTimestampMonotonic"))/1000000
     now =  time.monotonic()
     if (now - swss_up_time > 120):
         return True
     else:
         return False
 
-def _swss_ready():
+def _get_swss_services():
     list_of_swss = []
     num_asics = multi_asic.get_num_asics()
     if num_asics == 1:
@@ -925,13 +903,20 @@ def _swss_ready():
         for asic in range(num_asics):
             service = "swss@{}.service".format(asic)
             list_of_swss.append(service)
+    return list_of_swss
 
-    for service_name in list_of_swss:
-        if _per_namespace_swss_ready(service_name) == False:
+def _swss_ready(systemd_units):
+    for service_name in _get_swss_services():
+        if _per_namespace_swss_ready(systemd_units, service_name) == False:
             return False
 
     return True
 
+def _prefetch_readiness(systemd_units):
+    """Read the properties of the delayed timers and of the swss services checked before a reload at once"""
+    units = _get_delayed_sonic_units(systemd_units, get_timers=True) + _get_swss_services()
+    systemd_units.prefetch(units, ["LastTriggerUSecMonotonic", "ActiveState", "ActiveEnterTimestampMonotonic"])
+
 def _is_system_starting():
     out, _ = clicommon.run_command("sudo systemctl is-system-running", return_cmd=True)
     return out.strip() == "starting"
@@ -1271,6 +1256,7 @@ def save(filename):
 
     # In case of multi-asic mode we have additional config_db{NS}.json files for
     # various namespaces created per ASIC. {NS} is the namespace index.
+    namespace_files = []
     for inst in range(-1, num_cfg_file-1):
         #inst = -1, refers to the linux host where there is no namespace.
         if inst == -1:
@@ -1287,17 +1273,17 @@ def save(filename):
             else:
                 file = "/etc/sonic/config_db{}.json".format(inst)
 
-        if namespace is None:
-            command = "{} -d --print-data > {}".format(SONIC_CFGGEN_PATH, file)
-        else:
-            command = "{} -n {} -d --print-data > {}".format(SONIC_CFGGEN_PATH, namespace, file)
+        namespace_files.append((namespace, file))
 
-        log.log_info("'save' executing...")
-        clicommon.run_command(command, display_cmd=True)
-
-        config_db = sort_dict(read_json_file(file))
-        with open(file, 'w') as config_db_file:
-            json.dump(config_db, config_db_file, indent=4)
+    # The namespaces are read concurrently and each file is replaced atomically,
+    # a file whose content is unchanged is not written
+    log.log_info("'save' executing...")
+    saved_files = config_db_file.save_config(namespace_files)
+    for namespace, file in namespace_files:
+        if file in saved_files:
+            click.echo("Saved {} config to {}".format(namespace or "host", file))
+        else:
+            click.echo("{} is up to date".format(file))
 
 @config.command()
 @click.option('-y', '--yes', is_flag=True)
@@ -1373,9 +1359,10 @@ def print_dry_run_message(dry_run):
 @click.option('-d', '--dry-run', is_flag=True, default=False, help='test out the command without affecting config state')
 @click.option('-n', '--ignore-non-yang-tables', is_flag=True, default=False, help='ignore validation for tables without YANG models', hidden=True)
 @click.option('-i', '--ignore-path', multiple=True, help='ignore validation for config specified by given path which is a JsonPointer', hidden=True)
+@click.option('-p', '--parallel', is_flag=True, default=False, help='sort the updates of independent tables separately and in parallel')
 @click.option('-v', '--verbose', is_flag=True, default=False, help='print additional details of what the operation is doing')
 @click.pass_context
-def apply_patch(ctx, patch_file_path, format, dry_run, ignore_non_yang_tables, ignore_path, verbose):
+def apply_patch(ctx, patch_file_path, format, dry_run, ignore_non_yang_tables, ignore_path, parallel, verbose):
     """Apply given patch of updates to Config. A patch is a JsonPatch which follows rfc6902.
        This command can be used do partial updates to the config with minimum disruption to running processes.
        It allows addition as well as deletion of configs. The patch file represents a diff of ConfigDb(ABNF)
@@ -1405,7 +1392,7 @@ def apply_patch(ctx, patch_file_path, format, dry_run, ignore_non_yang_tables, i
                     patch_line['path'] = prefix + ipv6_address_str + suffix
 
         config_format = ConfigFormat[format.upper()]
-        GenericUpdater().apply_patch(patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path)
+        GenericUpdater().apply_patch(patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path, parallel)
 
         click.secho("Patch applied successfully.", fg="cyan", underline=True)
     except Exception as ex:
@@ -1515,6 +1502,68 @@ def list_checkpoints(ctx, verbose):
         click.secho("Failed to list config checkpoints", fg="red", underline=True, err=True)
         ctx.fail(ex)
 
+class _NamespacePipeline(object):
+    """
+    The commands run for one namespace by a worker thread. What they display is
+    recorded, to be echoed once the namespace is done, so that the outputs of
+    the namespaces are not interleaved.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.transcript = []
+        self.error = None
+        self.returncode = 0
+        self.elapsed = 0
+
+    def run_command(self, command, display_cmd=True):
+        if display_cmd:
+            self.transcript.append(click.style("Running command: ", fg='cyan') + click.style(command, fg='green'))
+        output, returncode = clicommon.run_command(command, return_cmd=True)
+        if output:
+            self.transcript.append(output.rstrip('\n'))
+        if returncode != 0:
+            self.returncode = returncode
+            raise RuntimeError("'{}' failed with exit code {}".format(command, returncode))
+
+
+def _run_namespace_pipelines(cmd_name, tasks):
+    """
+    Run the pipelines of tasks, a list of (namespace, func), concurrently:
+    func(pipeline) runs the commands of namespace with pipeline.run_command().
+    The output of each namespace is echoed as soon as it is done, in the order
+    of tasks, and the time taken by each namespace is logged. Once all of them
+    are done, exit with the return code of the first namespace which failed.
+    """
+    def run_pipeline(task):
+        namespace, func = task
+        pipeline = _NamespacePipeline(namespace)
+        start = time.time()
+        try:
+            func(pipeline)
+        except SystemExit as e:
+            if e.code:
+                pipeline.error = "exit code {}".format(e.code)
+                pipeline.returncode = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            pipeline.error = e
+            pipeline.returncode = pipeline.returncode or 1
+        pipeline.elapsed = time.time() - start
+        return pipeline
+
+    returncode = 0
+    for pipeline in bulk_db.iter_for_namespaces(run_pipeline, tasks):
+        for line in pipeline.transcript:
+            click.echo(line)
+        ns_name = pipeline.namespace or 'host'
+        if pipeline.error is not None:
+            log.log_error("'{}' failed for {} after {:.2f}s: {}".format(cmd_name, ns_name, pipeline.elapsed, pipeline.error))
+            click.secho("Failed to {} {}: {}".format(cmd_name, ns_name, pipeline.error), fg='red', err=True)
+            returncode = returncode or pipeline.returncode
+        else:
+            log.log_info("'{}' done for {} in {:.2f}s".format(cmd_name, ns_name, pipeline.elapsed))
+    if returncode:
+        sys.exit(returncode)
+
 @config.command()
 @click.option('-y', '--yes', is_flag=True)
 @click.option('-l', '--load-sysinfo', is_flag=True, help='load system default information (mac, portmap etc) first.')
@@ -1533,11 +1582,14 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
             click.echo("System is not up. Retry later or use -f to avoid system checks")
             sys.exit(CONFIG_RELOAD_NOT_READY)
 
-        if not _delay_timers_elapsed():
+        systemd_units = systemd_util.SystemdUnits()
+        _prefetch_readiness(systemd_units)
+
+        if not _delay_timers_elapsed(systemd_units):
             click.echo("Relevant services are not up. Retry later or use -f to avoid system checks")
             sys.exit(CONFIG_RELOAD_NOT_READY)
 
-        if not _swss_ready():
+        if not _swss_ready(systemd_units):
             click.echo("SwSS container is not ready. Retry later or use -f to avoid system checks")
             sys.exit(CONFIG_RELOAD_NOT_READY)
 
@@ -1576,6 +1628,8 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
     # service running in the host + DB services running in each ASIC namespace created per ASIC.
     # In the below logic, we get all namespaces in this platform and add an empty namespace ''
     # denoting the current namespace which we are in ( the linux host )
+    # The files of all the namespaces are checked before any namespace DB is flushed.
+    reload_files = {}
     for inst in range(-1, num_cfg_file-1):
         # Get the namespace name, for linux host it is None
         if inst == -1:
@@ -1620,6 +1674,11 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
 
             cfg_hwsku = output.strip()
 
+        reload_files[namespace] = (file, cfg_hwsku if load_sysinfo else None)
+
+    def reload_namespace(pipeline):
+        namespace = pipeline.namespace
+        file, cfg_hwsku = reload_files[namespace]
         if namespace is None:
             config_db = ConfigDBConnector()
         else:
@@ -1629,12 +1688,12 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
         client = config_db.get_redis_client(config_db.CONFIG_DB)
         client.flushdb()
 
-        if load_sysinfo:
+        if cfg_hwsku is not None:
             if namespace is None:
                 command = "{} -H -k {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku)
             else:
                 command = "{} -H -k {} -n {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku, namespace)
-            clicommon.run_command(command, display_cmd=True)
+            pipeline.run_command(command)
 
         # For the database service running in linux host we use the file user gives as input
         # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
@@ -1659,7 +1718,7 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
             sonic_cfggen=SONIC_CFGGEN_PATH,
             options=config_gen_opts)
 
-        clicommon.run_command(command, display_cmd=True)
+        pipeline.run_command(command)
         client.set(config_db.INIT_INDICATOR, 1)
 
         # Migrate DB contents to latest version
@@ -1669,7 +1728,10 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, force, file_form
                 command = "{} -o migrate".format(db_migrator)
             else:
                 command = "{} -o migrate -n {}".format(db_migrator, namespace)
-            clicommon.run_command(command, display_cmd=True)
+            pipeline.run_command(command)
+
+    # The namespaces are flushed, loaded and migrated concurrently
+    _run_namespace_pipelines('reload', [(namespace, reload_namespace) for namespace in reload_files])
 
     # Re-generate the environment variable in case config_db.json was edited
     update_sonic_environment()
@@ -1740,15 +1802,14 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
     if num_npus > 1:
         namespace_list += multi_asic.get_namespaces_from_linux()
 
-    for namespace in namespace_list:
+    def load_namespace(pipeline):
+        namespace = pipeline.namespace
         if namespace is DEFAULT_NAMESPACE:
             config_db = ConfigDBConnector()
             cfggen_namespace_option = " "
-            ns_cmd_prefix = ""
         else:
             config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
             cfggen_namespace_option = " -n {}".format(namespace)
-            ns_cmd_prefix = "sudo ip netns exec {} ".format(namespace)
         config_db.connect()
         client = config_db.get_redis_client(config_db.CONFIG_DB)
         client.flushdb()
@@ -1756,9 +1817,12 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
             command = "{} -H -m -j /etc/sonic/init_cfg.json {} --write-to-db".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
         else:
             command = "{} -H -m --write-to-db {}".format(SONIC_CFGGEN_PATH, cfggen_namespace_option)
-        clicommon.run_command(command, display_cmd=True)
+        pipeline.run_command(command)
         client.set(config_db.INIT_INDICATOR, 1)
 
+    # The namespaces are flushed and loaded concurrently
+    _run_namespace_pipelines('load_minigraph', [(namespace, load_namespace) for namespace in namespace_list])
+
     # Update SONiC environmnet file
     update_sonic_environment()
 
@@ -1786,12 +1850,14 @@ def load_minigraph(db, no_service_restart, traffic_shift_away, override_config,
     # Write latest db version string into db
     db_migrator='/usr/local/bin/db_migrator.py'
     if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
-        for namespace in namespace_list:
-            if namespace is DEFAULT_NAMESPACE:
+        def set_version(pipeline):
+            if pipeline.namespace is DEFAULT_NAMESPACE:
                 cfggen_namespace_option = " "
             else:
-                cfggen_namespace_option = " -n {}".format(namespace)
-            clicommon.run_command(db_migrator + ' -o set_version' + cfggen_namespace_option)
+                cfggen_namespace_option = " -n {}".format(pipeline.namespace)
+            pipeline.run_command(db_migrator + ' -o set_version' + cfggen_namespace_option, display_cmd=False)
+
+        _run_namespace_pipelines('load_minigraph', [(namespace, set_version) for namespace in namespace_list])
 
     # Keep device isolated with TSA
     if traffic_shift_away:
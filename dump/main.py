@@ -3,13 +3,17 @@ import sys
 import json
 import re
 import click
+from concurrent.futures import ThreadPoolExecutor
 from tabulate import tabulate
 from sonic_py_common import multi_asic
 from utilities_common.constants import DEFAULT_NAMESPACE
-from dump.match_infra import RedisSource, JsonSource, MatchEngine, CONN
+from dump.match_infra import JsonSource, MatchEngine, TableCache, DumpFiles
 from swsscommon.swsscommon import ConfigDBConnector
 from dump import plugins
 
+# Upper bound of identifiers dumped at the same time
+MAX_WORKERS = 8
+
 # Autocompletion Helper
 def get_available_modules(ctx, args, incomplete):
     return [k for k in plugins.dump_modules.keys() if incomplete in k]
@@ -49,7 +53,10 @@ def dump(ctx):
               help="Prints any intermediate output to stdout useful for dev & troubleshooting")
 @click.option('--namespace', '-n', default=DEFAULT_NAMESPACE, type=str,
               show_default=True, help='Dump the redis-state for this namespace.')
-def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
+@click.option('--dump-dir', type=click.Path(exists=True, file_okay=False),
+              help="Dump the state from the DBs saved by sonic-db-dump in this directory, "
+                   "Eg: the dump directory of a techsupport, instead of Redis")
+def state(ctx, module, identifier, db, table, key_map, verbose, namespace, dump_dir):
     """
     Dump the current state of the identifier for the specified module from Redis DB or CONFIG_FILE
     """
@@ -70,30 +77,35 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
     else:
         os.environ["VERBOSE"] = "0"
 
-    obj = plugins.dump_modules[module](ctx.obj)
+    match_engine = ctx.obj
+    if dump_dir:
+        # Offline mode: the DB dumps are loaded once and indexed, Redis is not accessed
+        match_engine = MatchEngine(ctx.obj.conn_pool, dump_files=DumpFiles(dump_dir))
+
+    obj = plugins.dump_modules[module](match_engine)
 
     if identifier == "all":
         ids = obj.get_all_args(namespace)
     else:
         ids = identifier.split(",")
 
-    params = {}
-    collected_info = {}
-    params['namespace'] = namespace
-    for arg in ids:
-        params[plugins.dump_modules[module].ARG_NAME] = arg
-        try:
-            collected_info[arg] = obj.execute(params)
-        except ValueError as err:
-            click.fail(f"Failed to execute plugin: {err}")
+    if len(ids) > 1 and not dump_dir:
+        # Bulk mode: every table is read once and the identifiers are matched in memory
+        match_engine = MatchEngine(ctx.obj.conn_pool, TableCache())
+        obj = plugins.dump_modules[module](match_engine)
+
+    try:
+        collected_info = execute_plugin(obj, module, ids, namespace)
+    except ValueError as err:
+        ctx.fail(f"Failed to execute plugin: {err}")
 
     if len(db) > 0:
         collected_info = filter_out_dbs(db, collected_info)
 
-    vidtorid = extract_rid(collected_info, namespace, ctx.obj.conn_pool)
+    vidtorid = extract_rid(collected_info, namespace, match_engine)
 
     if not key_map:
-        collected_info = populate_fv(collected_info, module, namespace, ctx.obj.conn_pool)
+        collected_info = populate_fv(collected_info, module, namespace, match_engine)
 
     for id in vidtorid.keys():
         collected_info[id]["ASIC_DB"]["vidtorid"] = vidtorid[id]
@@ -103,11 +115,31 @@ def state(ctx, module, identifier, db, table, key_map, verbose, namespace):
     return
 
 
-def extract_rid(info, ns, conn_pool):
-    r = RedisSource(conn_pool)
+def execute_plugin(obj, module, ids, namespace):
+    """
+    Run the plugin for every identifier, concurrently when there are several.
+    Every identifier is then run by its own plugin object, sharing obj's MatchEngine,
+    as the plugins keep per identifier state.
+    Returns {identifier: collected_info} in the order of ids.
+    """
+    arg_name = plugins.dump_modules[module].ARG_NAME
+    if len(ids) <= 1:
+        return {arg: obj.execute({'namespace': namespace, arg_name: arg}) for arg in ids}
+
+    def execute(arg):
+        return plugins.dump_modules[module](obj.match_engine).execute({'namespace': namespace, arg_name: arg})
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(ids))) as executor:
+        return dict(zip(ids, executor.map(execute, ids)))
+
+
+def extract_rid(info, ns, match_engine):
+    r = match_engine.get_redis_source_adapter()
     r.connect("ASIC_DB", ns)
     vidtorid = {}
-    vid_cache = {}  # Cache Entries to reduce number of Redis Calls
+    # The RIDs of all the VIDs are read at once
+    vids = list(dict.fromkeys(vid for arg in info.keys() for vid in get_vids(info[arg])))
+    vid_cache = dict(zip(vids, r.hmget("ASIC_DB", "VIDTORID", vids)))
     for arg in info.keys():
         mp = get_v_r_map(r, info[arg], vid_cache)
         if mp:
@@ -115,8 +147,9 @@ def extract_rid(info, ns, conn_pool):
     return vidtorid
 
 
-def get_v_r_map(r, single_dict, vid_cache):
-    v_r_map = {}
+def get_vids(single_dict):
+    """ Return the VIDs of the ASIC_DB keys collected """
+    vids = []
     asic_obj_ptrn = "ASIC_STATE:.*:oid:0x\w{1,14}"
 
     if "ASIC_DB" in single_dict and "keys" in single_dict["ASIC_DB"]:
@@ -124,13 +157,19 @@ def get_v_r_map(r, single_dict, vid_cache):
             if re.match(asic_obj_ptrn, redis_key):
                 matches = re.findall(r"oid:0x\w{1,14}", redis_key)
                 if matches:
-                    vid = matches[0]
-                    if vid in vid_cache:
-                        rid = vid_cache[vid]
-                    else:
-                        rid = r.hget("ASIC_DB", "VIDTORID", vid)
-                        vid_cache[vid] = rid
-                    v_r_map[vid] = rid if rid else "Real ID Not Found"
+                    vids.append(matches[0])
+    return vids
+
+
+def get_v_r_map(r, single_dict, vid_cache):
+    v_r_map = {}
+    for vid in get_vids(single_dict):
+        if vid in vid_cache:
+            rid = vid_cache[vid]
+        else:
+            rid = r.hget("ASIC_DB", "VIDTORID", vid)
+            vid_cache[vid] = rid
+        v_r_map[vid] = rid if rid else "Real ID Not Found"
     return v_r_map
 
 
@@ -145,20 +184,24 @@ def filter_out_dbs(db_list, collected_info):
     return collected_info
 
 
-def populate_fv(info, module, namespace, conn_pool):
+def populate_fv(info, module, namespace, match_engine):
     all_dbs = set()
     for id in info.keys():
         for db_name in info[id].keys():
             all_dbs.add(db_name)
 
-    db_cfg_file = JsonSource()
+    # The field-value pairs of the keys of a DB are read at once,
+    # through the source of the match_engine, Eg: its table cache
+    all_fvs = {}
     for db_name in all_dbs:
+        keys = list(dict.fromkeys(key for id in info.keys() for key in info[id].get(db_name, {}).get("keys", [])))
         if db_name == "CONFIG_FILE":
-            db_cfg_file.connect(plugins.dump_modules[module].CONFIG_FILE, namespace)
+            src = JsonSource()
+            src.connect(plugins.dump_modules[module].CONFIG_FILE, namespace)
         else:
-            conn_pool.get(db_name, namespace)
-    
-    db_conn = conn_pool.cache.get(namespace, {}).get(CONN, None)
+            src = match_engine.get_redis_source_adapter()
+            src.connect(db_name, namespace)
+        all_fvs[db_name] = dict(zip(keys, src.get_bulk(db_name, keys)))
 
     final_info = {}
     for id in info.keys():
@@ -168,11 +211,7 @@ def populate_fv(info, module, namespace, conn_pool):
             final_info[id][db_name]["keys"] = []
             final_info[id][db_name]["tables_not_found"] = info[id][db_name]["tables_not_found"]
             for key in info[id][db_name]["keys"]:
-                if db_name == "CONFIG_FILE":
-                    fv = db_cfg_file.get(db_name, key)
-                else:
-                    fv = db_conn.get_all(db_name, key)
-                final_info[id][db_name]["keys"].append({key: fv})
+                final_info[id][db_name]["keys"].append({key: all_fvs[db_name][key]})
 
     return final_info
 
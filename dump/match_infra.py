@@ -1,10 +1,15 @@
+import os
 import json
 import fnmatch
 import copy
+import re
+import threading
+from bisect import bisect_left
 from abc import ABC, abstractmethod
 from dump.helper import verbose_print
 from swsscommon.swsscommon import SonicV2Connector, SonicDBConfig
 from sonic_py_common import multi_asic
+from utilities_common import bulk_db
 from utilities_common.constants import DEFAULT_NAMESPACE
 
 # Constants
@@ -131,6 +136,15 @@ class MatchRequest:
         return str
 
 
+def split_field_values(f_values, match_entire_list=False):
+    """ Return the values of a field to compare with MatchRequest.value, none if the field is empty """
+    if not f_values:
+        return []
+    if "," in f_values and not match_entire_list:
+        return f_values.split(",")
+    return [f_values]
+
+
 class SourceAdapter(ABC):
     """ Source Adaptor offers unified interface to Data Sources """
 
@@ -162,6 +176,23 @@ class SourceAdapter(ABC):
     def hgetall(self, db, key):
         raise NotImplementedError
 
+    def get_bulk(self, db, keys):
+        """ Return the field-value pairs of every key, in the order of keys """
+        return [self.get(db, key) for key in keys]
+
+    def hget_bulk(self, db, keys, field):
+        """ Return the value of field in every key, in the order of keys """
+        return [self.hget(db, key, field) for key in keys]
+
+    def filter_keys(self, db, table, keys, field, value, match_entire_list):
+        """ Return the keys of table whose field matches value """
+        return [key for key, f_values in zip(keys, self.hget_bulk(db, keys, field))
+                if value in split_field_values(f_values, match_entire_list)]
+
+    def hmget(self, db, key, fields):
+        """ Return the value of every field in key, in the order of fields """
+        return [self.hget(db, key, field) for field in fields]
+
 
 class RedisSource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to Redis Data Sources """
@@ -193,6 +224,15 @@ class RedisSource(SourceAdapter):
     def hgetall(self, db, key):
         return self.conn.get_all(db, key)
 
+    def get_bulk(self, db, keys):
+        return bulk_db.hgetall_bulk(self.conn, db, keys)
+
+    def hget_bulk(self, db, keys, field):
+        return bulk_db.hget_bulk(self.conn, db, keys, field)
+
+    def hmget(self, db, key, fields):
+        return bulk_db.hmget(self.conn, db, key, fields)
+
 
 class JsonSource(SourceAdapter):
     """ Concrete Adaptor Class for connecting to JSON Data Sources """
@@ -236,6 +276,267 @@ class JsonSource(SourceAdapter):
         return self.json_data.get(table, {}).get(key)
 
 
+class TableIndex:
+    """
+    The keys of a table loaded at once with their field-value pairs,
+    indexed to match the key patterns without scanning every key when possible:
+    1) A key_pattern without any glob character is looked up directly
+    2) A key_pattern like *"attr":"value"* matching the JSON encoded ASIC_DB keys,
+       Eg: the route entries by "dest", is looked up in an index of these attributes
+    """
+    GLOB_CHARS = set("*?[")
+    JSON_ATTR_PATTERN = re.compile(r'^\*("[^"*?\[\]]+":"[^"*?\[\]]*")\*$')
+    JSON_ATTR = re.compile(r'"[^"]*":"[^"]*"')
+
+    def __init__(self, prefix, entries):
+        self.prefix = prefix  # Table name and separator
+        self.entries = entries  # {key: {field: value}}
+        self.__json_attr_index = None
+        self.__field_indexes = {}
+        self.__lock = threading.Lock()
+
+    def __get_json_attr_index(self):
+        with self.__lock:
+            if self.__json_attr_index is None:
+                index = {}
+                for key in self.entries:
+                    for attr in self.JSON_ATTR.findall(key):
+                        index.setdefault(attr, []).append(key)
+                self.__json_attr_index = index
+        return self.__json_attr_index
+
+    def get_field_index(self, field, match_entire_list=False):
+        """ Return {value: set of keys} of field, built the first time a field is filtered on """
+        with self.__lock:
+            index = self.__field_indexes.get((field, match_entire_list))
+            if index is None:
+                index = {}
+                for key, fvs in self.entries.items():
+                    for value in split_field_values(fvs.get(field), match_entire_list):
+                        index.setdefault(value, set()).add(key)
+                self.__field_indexes[(field, match_entire_list)] = index
+        return index
+
+    def match(self, key_pattern):
+        """ Return the keys matching key_pattern, with the semantics of KEYS """
+        if not self.GLOB_CHARS.intersection(key_pattern):
+            key = self.prefix + key_pattern
+            return [key] if key in self.entries else []
+
+        if key_pattern == "*":
+            return list(self.entries)
+
+        json_attr = self.JSON_ATTR_PATTERN.match(key_pattern)
+        if json_attr:
+            candidates = self.__get_json_attr_index().get(json_attr.group(1), [])
+        else:
+            candidates = self.entries
+        regex = re.compile(fnmatch.translate(self.prefix + key_pattern.replace("[^", "[!")), re.DOTALL)
+        return [key for key in candidates if regex.match(key)]
+
+
+class TableCache:
+    """
+    Caches the tables, keys and field-value pairs, read by a run of dump state
+    by (namespace, db, table). It can be shared by MatchEngines running in
+    different threads.
+    """
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables = {}
+        self.entries = {}  # {(namespace, db): {key: {field: value}}} of the tables loaded
+
+    @staticmethod
+    def is_cacheable(table, key_pattern):
+        """ A table name with glob characters spans several tables, escaped characters are not handled """
+        return not TableIndex.GLOB_CHARS.intersection(table) and "\\" not in table + key_pattern
+
+    def get_table(self, ns, db, table, load):
+        """ Return the TableIndex of the table, load() returns it the first time """
+        with self.lock:
+            index = self.tables.get((ns, db, table))
+            if index is None:
+                index = load()
+                self.tables[(ns, db, table)] = index
+                self.entries.setdefault((ns, db), {}).update(index.entries)
+            return index
+
+    def get_loaded_table(self, ns, db, table):
+        """ Return the TableIndex of the table if it is loaded, None otherwise """
+        return self.tables.get((ns, db, table))
+
+    def get_entry(self, ns, db, key):
+        """ Return the field-value pairs of key if its table is loaded, None otherwise """
+        return self.entries.get((ns, db), {}).get(key)
+
+
+class CachedRedisSource(RedisSource):
+    """
+    Redis Source Adaptor reading each table once with SCAN and pipelined HGETALLs,
+    the requests are then answered from the TableCache
+    """
+
+    def __init__(self, conn_pool, table_cache):
+        super().__init__(conn_pool)
+        self.table_cache = table_cache
+        self.ns = DEFAULT_NAMESPACE
+
+    def connect(self, db, ns):
+        # The connectors are shared by the threads, the redis calls are serialized
+        with self.table_cache.lock:
+            self.ns = ns
+            return super().connect(db, ns)
+
+    def __load_table(self, db, table):
+        prefix = table + self.get_separator(db)
+        keys = list(dict.fromkeys(bulk_db.scan_keys(self.conn, db, prefix + "*")))
+        return TableIndex(prefix, dict(zip(keys, bulk_db.hgetall_bulk(self.conn, db, keys))))
+
+    def getKeys(self, db, table, key_pattern):
+        if not self.table_cache.is_cacheable(table, key_pattern):
+            with self.table_cache.lock:
+                return super().getKeys(db, table, key_pattern)
+        index = self.table_cache.get_table(self.ns, db, table, lambda: self.__load_table(db, table))
+        return index.match(key_pattern)
+
+    def get(self, db, key):
+        entry = self.table_cache.get_entry(self.ns, db, key)
+        if entry is None:
+            with self.table_cache.lock:
+                return super().get(db, key)
+        return dict(entry)
+
+    def hget(self, db, key, field):
+        entry = self.table_cache.get_entry(self.ns, db, key)
+        if entry is None:
+            with self.table_cache.lock:
+                return super().hget(db, key, field)
+        return entry.get(field)
+
+    def hgetall(self, db, key):
+        return self.get(db, key)
+
+    def __get_cached(self, db, keys, select, load_missing):
+        """ Select from the cached entries of keys, the missing ones are loaded in bulk """
+        entries = [self.table_cache.get_entry(self.ns, db, key) for key in keys]
+        missing = [key for key, entry in zip(keys, entries) if entry is None]
+        if missing:
+            with self.table_cache.lock:
+                loaded = iter(load_missing(missing))
+        return [select(entry) if entry is not None else next(loaded) for entry in entries]
+
+    def get_bulk(self, db, keys):
+        return self.__get_cached(db, keys, dict, lambda missing: super(CachedRedisSource, self).get_bulk(db, missing))
+
+    def hget_bulk(self, db, keys, field):
+        return self.__get_cached(db, keys, lambda entry: entry.get(field),
+                                 lambda missing: super(CachedRedisSource, self).hget_bulk(db, missing, field))
+
+    def filter_keys(self, db, table, keys, field, value, match_entire_list):
+        index = self.table_cache.get_loaded_table(self.ns, db, table)
+        if index is None:
+            return super().filter_keys(db, table, keys, field, value, match_entire_list)
+        keys_with_value = index.get_field_index(field, match_entire_list).get(value, ())
+        return [key for key in keys if key in keys_with_value]
+
+
+class DbDump:
+    """
+    The hashes of a DB saved by 'sonic-db-dump -y', Eg: {key: {"type": "hash", "value": {field: value}, ...}}
+    The keys are kept sorted, so that the keys of a table are found by bisection,
+    the TableIndex of a table is built on its first request
+    """
+    def __init__(self, file_name):
+        with open(file_name) as f:
+            data = json.load(f)
+        self.entries = {}  # {key: {field: value}}
+        for key in list(data):
+            item = data.pop(key)  # Released while indexing, not to hold the dump twice
+            if isinstance(item, dict) and item.get("type") == "hash":
+                self.entries[key] = item.get("value", {})
+        self.sorted_keys = sorted(self.entries)
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def get_table(self, prefix):
+        """ Return the TableIndex of the keys starting with prefix, the table name and separator """
+        with self.lock:
+            index = self.tables.get(prefix)
+            if index is None:
+                start = bisect_left(self.sorted_keys, prefix)
+                end = bisect_left(self.sorted_keys, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+                index = TableIndex(prefix, {key: self.entries[key] for key in self.sorted_keys[start:end]})
+                self.tables[prefix] = index
+            return index
+
+
+class DumpFiles:
+    """
+    Loads the DBs saved by sonic-db-dump in a directory, Eg: the dump directory of a techsupport,
+    <db>.json for the default namespace and <db>.json.<asic id> for the asic namespaces.
+    Each DB is loaded once, when first requested.
+    """
+    def __init__(self, dump_dir):
+        self.dump_dir = dump_dir
+        self.dumps = {}  # {(namespace, db): DbDump}
+        self.lock = threading.Lock()
+
+    def get_file_name(self, db, ns):
+        file_name = os.path.join(self.dump_dir, db + ".json")
+        if ns != DEFAULT_NAMESPACE:
+            file_name += "." + str(multi_asic.get_asic_id_from_name(ns))
+        return file_name
+
+    def get(self, db, ns):
+        with self.lock:
+            if (ns, db) not in self.dumps:
+                self.dumps[(ns, db)] = DbDump(self.get_file_name(db, ns))
+            return self.dumps[(ns, db)]
+
+
+class DumpFileSource(SourceAdapter):
+    """ Concrete Adaptor Class for the DBs saved by sonic-db-dump, Eg: in a techsupport """
+
+    def __init__(self, dump_files):
+        self.dump_files = dump_files
+        self.db_dump = None
+
+    def connect(self, db, ns):
+        try:
+            self.db_dump = self.dump_files.get(db, ns)
+        except Exception as e:
+            verbose_print("DumpFileSource: Loading the DB dump failed\n" + str(e))
+            return False
+        return True
+
+    def get_separator(self, db):
+        return SonicDBConfig.getSeparator(db)
+
+    def getKeys(self, db, table, key_pattern):
+        if TableIndex.GLOB_CHARS.intersection(table):
+            # Spans several tables
+            pattern = table + self.get_separator(db) + key_pattern
+            regex = re.compile(fnmatch.translate(pattern.replace("[^", "[!")), re.DOTALL)
+            return [key for key in self.db_dump.sorted_keys if regex.match(key)]
+        return self.db_dump.get_table(table + self.get_separator(db)).match(key_pattern)
+
+    def get(self, db, key):
+        return dict(self.db_dump.entries.get(key, {}))
+
+    def hget(self, db, key, field):
+        return self.db_dump.entries.get(key, {}).get(field)
+
+    def hgetall(self, db, key):
+        return self.get(db, key)
+
+    def filter_keys(self, db, table, keys, field, value, match_entire_list):
+        if TableIndex.GLOB_CHARS.intersection(table):
+            return super().filter_keys(db, table, keys, field, value, match_entire_list)
+        index = self.db_dump.get_table(table + self.get_separator(db))
+        keys_with_value = index.get_field_index(field, match_entire_list).get(value, ())
+        return [key for key in keys if key in keys_with_value]
+
+
 class ConnectionPool:
     """ Caches SonicV2Connector objects for effective reuse """
     def __init__(self):
@@ -277,17 +578,26 @@ class MatchEngine:
     Usage Guidelines:
     1) Instantiate the class once for the entire execution,
                 to effectively use the caching of redis connection objects
+    2) Provide a TableCache to read each table once for all the requests of the run,
+                the key patterns and field-value filters are then evaluated in memory
+    3) Provide DumpFiles to match the requests to a DB against the DBs saved by sonic-db-dump instead of redis
     """
-    def __init__(self, pool=None):
+    def __init__(self, pool=None, table_cache=None, dump_files=None):
         if not isinstance(pool, ConnectionPool):
             self.conn_pool = ConnectionPool()
         else:
             self.conn_pool = pool
+        self.table_cache = table_cache
+        self.dump_files = dump_files
 
     def clear_cache(self, ns):
         self.conn_pool(ns)
 
     def get_redis_source_adapter(self):
+        if self.dump_files is not None:
+            return DumpFileSource(self.dump_files)
+        if self.table_cache is not None:
+            return CachedRedisSource(self.conn_pool, self.table_cache)
         return RedisSource(self.conn_pool)
 
     def get_json_source_adapter(self):
@@ -318,32 +628,19 @@ class MatchEngine:
         if not req.field:
             return all_matched_keys
 
-        filtered_keys = []
-        for key in all_matched_keys:
-            f_values = src.hget(req.db, key, req.field)
-            if not f_values:
-                continue
-            if "," in f_values and not req.match_entire_list:
-                f_value = f_values.split(",")
-            else:
-                f_value = [f_values]
-            if req.value in f_value:
-                filtered_keys.append(key)
-        return filtered_keys
+        return src.filter_keys(req.db, req.table, all_matched_keys, req.field, req.value, req.match_entire_list)
 
     def __fill_template(self, src, req, filtered_keys, template):
-        for key in filtered_keys:
-            temp = {}
-            if not req.just_keys:
-                temp[key] = src.get(req.db, key)
-                template["keys"].append(temp)
-            elif len(req.return_fields) > 0:
-                template["keys"].append(key)
-                template["return_values"][key] = {}
-                for field in req.return_fields:
-                    template["return_values"][key][field] = src.hget(req.db, key, field)
-            else:
+        if not req.just_keys:
+            for key, fv in zip(filtered_keys, src.get_bulk(req.db, filtered_keys)):
+                template["keys"].append({key: fv})
+        elif len(req.return_fields) > 0:
+            values = {field: src.hget_bulk(req.db, filtered_keys, field) for field in req.return_fields}
+            for i, key in enumerate(filtered_keys):
                 template["keys"].append(key)
+                template["return_values"][key] = {field: values[field][i] for field in req.return_fields}
+        else:
+            template["keys"].extend(filtered_keys)
         verbose_print("Return Values:" + str(template["return_values"]))
         return template
 
@@ -3,10 +3,9 @@ import json
 import jsondiff
 import importlib
 import os
-import tempfile
 from collections import defaultdict
 from swsscommon.swsscommon import ConfigDBConnector
-from .gu_common import genericUpdaterLogging
+from .gu_common import ConfigDbSnapshot, genericUpdaterLogging
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 UPDATER_CONF_FILE = f"{SCRIPT_DIR}/generic_config_updater.conf.json"
@@ -73,8 +72,9 @@ class ChangeApplier:
 
     updater_conf = None
 
-    def __init__(self):
+    def __init__(self, config_db_snapshot=None):
         self.config_db = get_config_db()
+        self.config_db_snapshot = config_db_snapshot if config_db_snapshot is not None else ConfigDbSnapshot(self.config_db)
         self.backend_tables = [
             "BUFFER_PG",
             "BUFFER_PROFILE",
@@ -149,8 +149,8 @@ class ChangeApplier:
                     upd_data.get(tbl, {}), upd_keys)
 
         ret = self._services_validate(run_data, upd_data, upd_keys)
+        run_data = self._get_running_config(upd_keys)
         if not ret:
-            run_data = self._get_running_config()
             self.remove_backend_tables_from_config(upd_data)
             self.remove_backend_tables_from_config(run_data)
             if upd_data != run_data:
@@ -166,12 +166,11 @@ class ChangeApplier:
             data.pop(key, None)
 
 
-    def _get_running_config(self):
-        (_, fname) = tempfile.mkstemp(suffix="_changeApplier")
-        os.system("sonic-cfggen -d --print-data > {}".format(fname))
-        run_data = {}
-        with open(fname, "r") as s:
-            run_data = json.load(s)
-        if os.path.isfile(fname):
-            os.remove(fname)
-        return run_data
+    def _get_running_config(self, updated_tables=None):
+        if updated_tables is None:
+            # ConfigDb may have been written by others since the last change, it is read again
+            self.config_db_snapshot.refresh()
+        elif updated_tables:
+            # Only the tables updated by the change are read again from ConfigDb
+            self.config_db_snapshot.refresh(updated_tables)
+        return self.config_db_snapshot.get_config()
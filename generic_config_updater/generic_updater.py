@@ -3,7 +3,7 @@ import os
 from enum import Enum
 from .gu_common import GenericConfigUpdaterError, EmptyTableError, ConfigWrapper, \
                        DryRunConfigWrapper, PatchWrapper, genericUpdaterLogging
-from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, ConfigSplitter, \
+from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, PartitionedPatchSorter, ConfigSplitter, \
                           TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter
 from .change_applier import ChangeApplier, DryRunChangeApplier
 
@@ -302,12 +302,12 @@ class ConfigLockDecorator(Decorator):
         self.config_lock.release_lock()
 
 class GenericUpdateFactory:
-    def create_patch_applier(self, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths):
+    def create_patch_applier(self, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths, parallel=False):
         self.init_verbose_logging(verbose)
         config_wrapper = self.get_config_wrapper(dry_run)
         change_applier = self.get_change_applier(dry_run, config_wrapper)
         patch_wrapper = PatchWrapper(config_wrapper)
-        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper)
+        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper, parallel)
         patch_applier = PatchApplier(config_wrapper=config_wrapper,
                                      patchsorter=patch_sorter,
                                      patch_wrapper=patch_wrapper,
@@ -385,11 +385,13 @@ class GenericUpdateFactory:
         if dry_run:
             return DryRunChangeApplier(config_wrapper)
         else:
-            return ChangeApplier()
+            return ChangeApplier(config_wrapper.config_db_snapshot)
+
+    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper, parallel=False):
+        inner_patch_sorter = PartitionedPatchSorter(config_wrapper, patch_wrapper) if parallel else None
 
-    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
         if not ignore_non_yang_tables and not ignore_paths:
-            return StrictPatchSorter(config_wrapper, patch_wrapper)
+            return StrictPatchSorter(config_wrapper, patch_wrapper, inner_patch_sorter)
 
         inner_config_splitters = []
         if ignore_non_yang_tables:
@@ -400,15 +402,15 @@ class GenericUpdateFactory:
 
         config_splitter = ConfigSplitter(config_wrapper, inner_config_splitters)
 
-        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter)
+        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter, patch_sorter=inner_patch_sorter)
 
 class GenericUpdater:
     def __init__(self, generic_update_factory=None):
         self.generic_update_factory = \
             generic_update_factory if generic_update_factory is not None else GenericUpdateFactory()
 
-    def apply_patch(self, patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths):
-        patch_applier = self.generic_update_factory.create_patch_applier(config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths)
+    def apply_patch(self, patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths, parallel=False):
+        patch_applier = self.generic_update_factory.create_patch_applier(config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths, parallel)
         patch_applier.apply(patch)
 
     def replace(self, target_config, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths):
@@ -3,12 +3,14 @@ import jsonpatch
 from jsonpointer import JsonPointer
 import sonic_yang
 import sonic_yang_ext
-import subprocess
 import yang as ly
 import copy
 import re
+from natsort import natsorted
 from sonic_py_common import logger
+from swsscommon.swsscommon import ConfigDBConnector
 from enum import Enum
+from utilities_common import config_db_file, sonic_yang_cache
 
 YANG_DIR = "/usr/local/yang-models"
 SYSLOG_IDENTIFIER = "GenericConfigUpdater"
@@ -47,26 +49,57 @@ class JsonChange:
             return self.patch == other.patch
         return False
 
+class ConfigDbSnapshot:
+    """
+    The content of ConfigDb read in-process, in the same format as 'sonic-cfggen -d --print-data'.
+
+    The whole ConfigDb is read once using pipelined reads and kept. Once some tables are updated,
+    only these tables have to be read again using 'refresh'.
+    """
+    def __init__(self, config_db=None):
+        self.config_db = config_db
+        self.config = None
+
+    def get_config(self):
+        if self.config is None:
+            self.refresh()
+        return copy.deepcopy(self.config)
+
+    def refresh(self, tables=None):
+        """
+        Reads the given tables again from ConfigDb, or the whole ConfigDb if no tables are given.
+        """
+        if self.config_db is None:
+            self.config_db = ConfigDBConnector()
+            self.config_db.connect()
+
+        client = self.config_db.get_redis_client(self.config_db.CONFIG_DB)
+        separator = self.config_db.TABLE_NAME_SEPARATOR
+        if tables is None or self.config is None:
+            config = {}
+            keys = client.keys("*") or []
+        else:
+            config = self.config
+            keys = []
+            for table in tables:
+                config.pop(table, None)
+                keys.extend(client.keys(f"{table}{separator}*") or [])
+
+        read_tables = config_db_file.read_config_entries(self.config_db, keys)
+
+        # Same order as sonic-cfggen, the order of the config affects the order of the generated changes
+        for table, entries in read_tables.items():
+            config[table] = {entry_key: entries[entry_key] for entry_key in natsorted(entries)}
+        self.config = {table: config[table] for table in sorted(config)}
+
 class ConfigWrapper:
-    def __init__(self, yang_dir = YANG_DIR):
+    def __init__(self, yang_dir = YANG_DIR, config_db_snapshot=None):
         self.yang_dir = YANG_DIR
         self.sonic_yang_with_loaded_models = None
+        self.config_db_snapshot = config_db_snapshot if config_db_snapshot is not None else ConfigDbSnapshot()
 
     def get_config_db_as_json(self):
-        text = self._get_config_db_as_text()
-        config_db_json = json.loads(text)
-        config_db_json.pop("bgpraw", None)
-        return config_db_json
-
-    def _get_config_db_as_text(self):
-        # TODO: Getting configs from CLI is very slow, need to get it from sonic-cffgen directly
-        cmd = "show runningconfiguration all"
-        result = subprocess.Popen(cmd, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        text, err = result.communicate()
-        return_code = result.returncode
-        if return_code: # non-zero means failure
-            raise GenericConfigUpdaterError(f"Failed to get running config, Return code: {return_code}, Error: {err}")
-        return text
+        return self.config_db_snapshot.get_config()
 
     def get_sonic_yang_as_json(self):
         config_db_json = self.get_config_db_as_json()
@@ -121,10 +154,6 @@ class ConfigWrapper:
     def validate_config_db_config(self, config_db_as_json):
         sy = self.create_sonic_yang_with_loaded_models()
 
-        # TODO: Move these validators to YANG models
-        supplemental_yang_validators = [self.validate_bgp_peer_group,
-                                        self.validate_lanes]
-
         try:
             tmp_config_db_as_json = copy.deepcopy(config_db_as_json)
 
@@ -132,13 +161,41 @@ class ConfigWrapper:
 
             sy.validate_data_tree()
 
-            for supplemental_yang_validator in supplemental_yang_validators:
-                success, error = supplemental_yang_validator(config_db_as_json)
-                if not success:
-                    return success, error
+            return self._validate_supplemental(config_db_as_json)
+        except sonic_yang.SonicYangException as ex:
+            return False, ex
+
+    def validate_config_db_config_as_sonic_yang(self, config_db_as_json, sonic_yang_as_json):
+        """
+        Same as validate_config_db_config, where config_db_as_json is already converted to sonic_yang_as_json
+        using convert_config_db_to_sonic_yang. The conversion is skipped and the data tree is loaded directly.
+        """
+        sy = self.create_sonic_yang_with_loaded_models()
+
+        try:
+            try:
+                sy.root = sy.ctx.parse_data_mem(json.dumps(sonic_yang_as_json), ly.LYD_JSON,
+                                                ly.LYD_OPT_CONFIG | ly.LYD_OPT_STRICT)
+            except Exception as ex:
+                sy.root = None
+                raise sonic_yang.SonicYangException(f"Data Loading Failed\n{ex}")
+
+            sy.validate_data_tree()
+
+            return self._validate_supplemental(config_db_as_json)
         except sonic_yang.SonicYangException as ex:
             return False, ex
 
+    def _validate_supplemental(self, config_db_as_json):
+        # TODO: Move these validators to YANG models
+        supplemental_yang_validators = [self.validate_bgp_peer_group,
+                                        self.validate_lanes]
+
+        for supplemental_yang_validator in supplemental_yang_validators:
+            success, error = supplemental_yang_validator(config_db_as_json)
+            if not success:
+                return success, error
+
         return True, None
 
     def validate_field_operation(self, old_config, target_config):
@@ -247,16 +304,15 @@ class ConfigWrapper:
                 config_with_non_empty_tables[table] = copy.deepcopy(config[table])
         return config_with_non_empty_tables
 
-    # TODO: move creating copies of sonic_yang with loaded models to sonic-yang-mgmt directly
     def create_sonic_yang_with_loaded_models(self):
         # sonic_yang_with_loaded_models will only be initialized once the first time this method is called
         if self.sonic_yang_with_loaded_models is None:
             sonic_yang_print_log_enabled = genericUpdaterLogging.get_verbose()
-            loaded_models_sy = sonic_yang.SonicYang(self.yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
-            loaded_models_sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
-            self.sonic_yang_with_loaded_models = loaded_models_sy
+            # The models are loaded once per process and cached on disk, see sonic_yang_cache
+            self.sonic_yang_with_loaded_models = sonic_yang_cache.get_sonic_yang(
+                self.yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
 
-        return copy.copy(self.sonic_yang_with_loaded_models)
+        return sonic_yang_cache.reset_data_tree(copy.copy(self.sonic_yang_with_loaded_models))
 
 class DryRunConfigWrapper(ConfigWrapper):
     # This class will simulate all read/write operations to ConfigDB on a virtual storage unit.
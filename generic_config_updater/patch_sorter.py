@@ -1,23 +1,73 @@
 import copy
 import json
 import jsonpatch
+import multiprocessing
+import os
 from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
                        JsonChange, PathAddressing, genericUpdaterLogging
 
+# Configs are hashed as the sum of the hashes of their entries, i.e. the keys under
+# each table, so that applying a move only rehashes the entry it touches.
+# Each entry is hashed as a single string, tuple hashes do not mix well enough to be summed.
+HASH_MASK = (1 << 64) - 1
+
+def _entry_hash(table, key, value):
+    return hash(json.dumps([table, key, value], sort_keys=True))
+
+def _table_hash(table, value):
+    if not isinstance(value, dict):
+        return hash(json.dumps([table, value], sort_keys=True))
+    table_hash = hash(json.dumps([table]))
+    for key, entry in value.items():
+        table_hash += _entry_hash(table, key, entry)
+    return table_hash
+
+def _config_hash(config):
+    if not isinstance(config, dict):
+        return hash(json.dumps(config, sort_keys=True)) & HASH_MASK
+    return sum(_table_hash(table, value) for table, value in config.items()) & HASH_MASK
+
+def _scope_hash(config, tokens, entry_level):
+    table = tokens[0]
+    if table not in config:
+        return 0
+    if not entry_level:
+        return _table_hash(table, config[table])
+    key = tokens[1]
+    return _entry_hash(table, key, config[table][key]) if key in config[table] else 0
+
 class Diff:
     """
     A class that contains the diff info between current and target configs.
+
+    The hashes of the configs are computed once, the hash of a diff produced by apply_move
+    is derived from the hash of its parent by rehashing only the table entry the move touches.
     """
-    def __init__(self, current_config, target_config):
+    def __init__(self, current_config, target_config, current_config_hash=None, target_config_hash=None):
         self.current_config = current_config
         self.target_config = target_config
+        self._current_config_hash = current_config_hash
+        self._target_config_hash = target_config_hash
+        self._last_move = None
+        self._last_move_diff = None
+
+    @property
+    def current_config_hash(self):
+        if self._current_config_hash is None:
+            self._current_config_hash = _config_hash(self.current_config)
+        return self._current_config_hash
+
+    @property
+    def target_config_hash(self):
+        if self._target_config_hash is None:
+            self._target_config_hash = _config_hash(self.target_config)
+        return self._target_config_hash
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        return hash((self.current_config_hash, self.target_config_hash))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
@@ -26,14 +76,38 @@ class Diff:
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
     def apply_move(self, move):
+        # The same move is usually applied twice in a row, once by the validators and once by the sorter
+        if move is self._last_move:
+            return self._last_move_diff
+
         new_current_config = move.apply(self.current_config)
-        return Diff(new_current_config, self.target_config)
+        new_current_config_hash = None
+        if self._current_config_hash is not None:
+            new_current_config_hash = self._get_moved_config_hash(move, new_current_config)
+
+        new_diff = Diff(new_current_config, self.target_config, new_current_config_hash, self._target_config_hash)
+        self._last_move = move
+        self._last_move_diff = new_diff
+        return new_diff
+
+    def _get_moved_config_hash(self, move, new_current_config):
+        tokens = move.path_tokens
+        if not tokens or not isinstance(self.current_config, dict) or not isinstance(new_current_config, dict):
+            return None
+
+        table = tokens[0]
+        entry_level = len(tokens) > 1 and \
+                      isinstance(self.current_config.get(table), dict) and \
+                      isinstance(new_current_config.get(table), dict)
+        old_scope_hash = _scope_hash(self.current_config, tokens, entry_level)
+        new_scope_hash = _scope_hash(new_current_config, tokens, entry_level)
+        return (self._current_config_hash - old_scope_hash + new_scope_hash) & HASH_MASK
 
     def has_no_diff(self):
+        if self._current_config_hash is not None and self._target_config_hash is not None and \
+           self._current_config_hash != self._target_config_hash:
+            return False
         return self.current_config == self.target_config
 
     def __str__(self):
@@ -63,6 +137,7 @@ class JsonMove:
         self.op_type = operation[OperationWrapper.OP_KEYWORD]
         self.path = operation[OperationWrapper.PATH_KEYWORD]
         self.value = operation.get(OperationWrapper.VALUE_KEYWORD, None)
+        self.path_tokens = PathAddressing().get_path_tokens(self.path)
 
         self.op_type = op_type
         self.current_config_tokens = current_config_tokens
@@ -272,7 +347,23 @@ class JsonMove:
         return JsonMove(diff, op_type, current_config_tokens, target_config_tokens)
 
     def apply(self, config):
-        return self.patch.apply(config)
+        # Only the containers on the path of the move are copied, the rest of the new config is
+        # shared with the given config. Configs are never updated in place, so sharing is safe.
+        return self.patch.apply(self._copy_path(config), in_place=True)
+
+    def _copy_path(self, config):
+        config = copy.copy(config)
+        parent = config
+        for token in self.path_tokens[:-1]:
+            if isinstance(parent, list):
+                if not token.isdigit() or int(token) >= len(parent):
+                    break
+                token = int(token)
+            elif not isinstance(parent, dict) or token not in parent:
+                break
+            parent[token] = copy.copy(parent[token])
+            parent = parent[token]
+        return config
 
     def __str__(self):
         return str(self.patch)
@@ -675,15 +766,76 @@ class DeleteWholeConfigMoveValidator:
 class FullConfigMoveValidator:
     """
     A class to validate that full config is valid according to YANG models after applying the move.
+
+    Validation is incremental: a move only replaces the tables along its path (see JsonMove.apply), the
+    other tables of the simulated config are the same objects as in the config the move applies to.
+    The SonicYang conversion of each table object is kept, so only the tables touched by the move are
+    converted again before the whole data tree is loaded and validated by libyang.
     """
+    # Upper bounds of validation results and table conversions kept, least recently used ones are dropped first
+    MAX_VALIDATED_CONFIGS = 1024
+    MAX_CONVERTED_TABLES = 1024
+
     def __init__(self, config_wrapper):
         self.config_wrapper = config_wrapper
+        # Validation results by config hash, the same config is often reached through different moves
+        self.validated_configs = OrderedDict()
+        # SonicYang conversion by table object id, the table object is kept alive with its conversion
+        self.converted_tables = OrderedDict()
 
     def validate(self, move, diff):
-        simulated_config = move.apply(diff.current_config)
-        is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
+        simulated_diff = diff.apply_move(move)
+        simulated_config = simulated_diff.current_config
+        config_hash = simulated_diff.current_config_hash
+        if config_hash in self.validated_configs:
+            self.validated_configs.move_to_end(config_hash)
+            validated_config, is_valid = self.validated_configs[config_hash]
+            if validated_config == simulated_config:
+                return is_valid
+
+        sonic_yang_as_json = self._convert_config_db_to_sonic_yang(simulated_config)
+        if sonic_yang_as_json is None:
+            is_valid = False
+        else:
+            is_valid, error = self.config_wrapper.validate_config_db_config_as_sonic_yang(simulated_config,
+                                                                                         sonic_yang_as_json)
+        self.validated_configs[config_hash] = (simulated_config, is_valid)
+        if len(self.validated_configs) > self.MAX_VALIDATED_CONFIGS:
+            self.validated_configs.popitem(last=False)
         return is_valid
 
+    def _convert_config_db_to_sonic_yang(self, config):
+        """
+        Returns the SonicYang conversion of config, or None if a table cannot be converted.
+        """
+        if not isinstance(config, dict):
+            return None
+
+        sonic_yang_as_json = {}
+        for table, value in config.items():
+            table_as_sonic_yang = self._convert_table_to_sonic_yang(table, value)
+            if table_as_sonic_yang is None:
+                return None
+            for module, containers in table_as_sonic_yang.items():
+                sonic_yang_as_json.setdefault(module, {}).update(containers)
+        return sonic_yang_as_json
+
+    def _convert_table_to_sonic_yang(self, table, value):
+        key = (table, id(value))
+        if key in self.converted_tables:
+            self.converted_tables.move_to_end(key)
+            return self.converted_tables[key][1]
+
+        try:
+            table_as_sonic_yang = self.config_wrapper.convert_config_db_to_sonic_yang({table: value})
+        except Exception:
+            table_as_sonic_yang = None
+
+        self.converted_tables[key] = (value, table_as_sonic_yang)
+        if len(self.converted_tables) > self.MAX_CONVERTED_TABLES:
+            self.converted_tables.popitem(last=False)
+        return table_as_sonic_yang
+
 class CreateOnlyMoveValidator:
     """
     A class to validate create-only fields are only created, but never modified/updated. In other words:
@@ -1937,3 +2089,106 @@ class PatchSorter:
         changes = [JsonChange(move.patch) for move in moves]
 
         return changes
+
+# Set by PartitionedPatchSorter before forking its worker processes, the workers inherit it
+_partitioned_sort_job = None
+
+def _sort_partition(index):
+    sort_algorithm_factory, diffs, algorithm = _partitioned_sort_job
+    moves = sort_algorithm_factory.create(algorithm).sort(diffs[index])
+    # Moves are sent back as plain JsonPatch operations
+    return None if moves is None else [list(move.patch) for move in moves]
+
+class PartitionedPatchSorter(PatchSorter):
+    """
+    A patch sorter that splits the updated tables into groups that do not depend on each other, and sorts
+    the update of each group separately. The search cost then depends on the largest group instead of the
+    whole patch.
+
+    Two tables are in the same group if one of them refers to the other, according to the YANG leafrefs
+    in the current or the target config. The groups are updated one after the other, the sort of a group
+    starts from the config where the previous groups are already updated. These intermediate configs are
+    known in advance, so the groups are sorted in parallel worker processes.
+
+    If a group cannot be sorted on its own, the whole patch is sorted at once.
+    """
+    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None, max_workers=None):
+        super().__init__(config_wrapper, patch_wrapper, sort_algorithm_factory)
+        self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Partitioned", print_all_to_console=True)
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+
+    def sort(self, patch, algorithm=Algorithm.DFS, preloaded_current_config=None):
+        current_config = preloaded_current_config if preloaded_current_config else self.config_wrapper.get_config_db_as_json()
+        target_config = self.patch_wrapper.simulate_patch(patch, current_config)
+
+        table_groups = self.get_table_groups(current_config, target_config)
+        if len(table_groups) <= 1:
+            return super().sort(patch, algorithm, current_config)
+
+        self.logger.log_info(f"Sorting {len(table_groups)} independent table groups: {table_groups}")
+        diffs = []
+        group_current_config = current_config
+        for tables in table_groups:
+            group_target_config = copy.copy(group_current_config)
+            for table in tables:
+                if table in target_config:
+                    group_target_config[table] = target_config[table]
+                else:
+                    group_target_config.pop(table, None)
+            diffs.append(Diff(group_current_config, group_target_config))
+            group_current_config = group_target_config
+
+        group_changes = self.sort_diffs(diffs, algorithm)
+        if any(changes is None for changes in group_changes):
+            self.logger.log_info("Table groups cannot be sorted separately, sorting the whole patch.")
+            return super().sort(patch, algorithm, current_config)
+
+        return [change for changes in group_changes for change in changes]
+
+    def get_table_groups(self, current_config, target_config):
+        """
+        Returns the groups of updated tables, tables referring to each other are in the same group.
+        """
+        tables = sorted(table for table in set(current_config) | set(target_config)
+                        if current_config.get(table) != target_config.get(table))
+        group_of = {table: table for table in tables}
+
+        def find(table):
+            while group_of[table] != table:
+                group_of[table] = group_of[group_of[table]]
+                table = group_of[table]
+            return table
+
+        for table in tables:
+            table_path = self.path_addressing.create_path([table])
+            for config in (current_config, target_config):
+                if table not in config:
+                    continue
+                for ref_path in self.path_addressing.find_ref_paths(table_path, config):
+                    ref_table = self.path_addressing.get_path_tokens(ref_path)[0]
+                    if ref_table in group_of:
+                        group_of[find(ref_table)] = find(table)
+
+        groups = OrderedDict()
+        for table in tables:
+            groups.setdefault(find(table), []).append(table)
+        return list(groups.values())
+
+    def sort_diffs(self, diffs, algorithm):
+        """
+        Sorts every diff, returns a list of changes or None per diff.
+        """
+        global _partitioned_sort_job
+        _partitioned_sort_job = (self.sort_algorithm_factory, diffs, algorithm)
+        try:
+            if self.max_workers <= 1:
+                results = [_sort_partition(index) for index in range(len(diffs))]
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.max_workers, len(diffs)),
+                                         mp_context=multiprocessing.get_context("fork")) as executor:
+                    results = list(executor.map(_sort_partition, range(len(diffs))))
+        finally:
+            _partitioned_sort_job = None
+
+        return [None if operations is None else [JsonChange(jsonpatch.JsonPatch(ops)) for ops in operations]
+                for operations in results]
@@ -4,8 +4,10 @@ import os
 import argparse
 import json
 import sys
+import time
 import traceback
 import re
+from collections import OrderedDict
 
 from sonic_py_common import device_info, logger
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector, SonicDBConfig
@@ -25,6 +27,9 @@ try:
 except KeyError:
     pass
 
+from utilities_common import config_db_file
+from utilities_common.db_snapshot import DbSnapshot
+
 SYSLOG_IDENTIFIER = 'db_migrator'
 
 
@@ -33,7 +38,7 @@ log = logger.Logger(SYSLOG_IDENTIFIER)
 
 
 class DBMigrator():
-    def __init__(self, namespace, socket=None):
+    def __init__(self, namespace, socket=None, dry_run=False, config_file=None, output_file=None):
         """
         Version string format:
            version_<major>_<minor>_<build>
@@ -44,6 +49,14 @@ class DBMigrator():
                      github public branches. These private branches shall use
                      none-zero values.
               build: sequentially increase within a minor version domain.
+
+        The version steps run against in-memory snapshots of CONFIG_DB, APPL_DB
+        and LOGLEVEL_DB, the changes are written back by commit(), or only
+        reported if dry_run is set.
+
+        If config_file is given, CONFIG_DB is read from this config_db.json
+        and written to output_file, by default config_file itself, redis is
+        not accessed and the other databases are empty.
         """
         self.CURRENT_VERSION = 'version_4_0_0'
 
@@ -55,30 +68,61 @@ class DBMigrator():
         if socket:
             db_kwargs['unix_socket_path'] = socket
 
+        self.dry_run = dry_run
+        self.timings = OrderedDict()
+        self.config_file = config_file
+        self.output_file = output_file or config_file
+
+        if config_file:
+            self.init_offline(config_file)
+            return
+
         if namespace is None:
-            self.configDB = ConfigDBConnector(**db_kwargs)
+            configDB = ConfigDBConnector(**db_kwargs)
         else:
-            self.configDB = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace, **db_kwargs)
-        self.configDB.db_connect('CONFIG_DB')
+            configDB = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace, **db_kwargs)
+        configDB.db_connect('CONFIG_DB')
+        self.configDB = DbSnapshot(configDB, 'CONFIG_DB')
 
         if namespace is None:
-            self.appDB = ConfigDBConnector(**db_kwargs)
+            appDB = ConfigDBConnector(**db_kwargs)
         else:
-            self.appDB = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace, **db_kwargs)
-        self.appDB.db_connect('APPL_DB')
+            appDB = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace, **db_kwargs)
+        appDB.db_connect('APPL_DB')
+        self.appDB = DbSnapshot(appDB, 'APPL_DB')
 
         self.stateDB = SonicV2Connector(host='127.0.0.1')
         if self.stateDB is not None:
             self.stateDB.connect(self.stateDB.STATE_DB)
 
-        self.loglevelDB = SonicV2Connector(host='127.0.0.1')
-        if self.loglevelDB is not None:
-            self.loglevelDB.connect(self.loglevelDB.LOGLEVEL_DB)
+        loglevelDB = SonicV2Connector(host='127.0.0.1')
+        loglevelDB.connect(loglevelDB.LOGLEVEL_DB)
+        self.loglevelDB = DbSnapshot(loglevelDB, 'LOGLEVEL_DB')
+
+        self.init_platform(device_info.get_hwsku())
 
+    def init_offline(self, config_file):
+        """
+        Load the databases of a config_db.json migration: CONFIG_DB from
+        config_file, the others empty, as on a cold boot. The hwsku is the one
+        of the file, only the asic type is the one of the running image.
+        """
+        with open(config_file) as f:
+            config = json.load(f)
+
+        configDB = ConfigDBConnector()
+        self.configDB = DbSnapshot(configDB, 'CONFIG_DB', config_db_file.config_to_entries(configDB, config))
+        self.appDB = DbSnapshot(ConfigDBConnector(), 'APPL_DB', {})
+        self.stateDB = DbSnapshot(SonicV2Connector(host='127.0.0.1'), 'STATE_DB', {})
+        self.loglevelDB = DbSnapshot(SonicV2Connector(host='127.0.0.1'), 'LOGLEVEL_DB', {})
+
+        self.init_platform(self.configDB.get_entry('DEVICE_METADATA', 'localhost').get('hwsku', ''))
+
+    def init_platform(self, hwsku):
         version_info = device_info.get_sonic_version_info()
         asic_type = version_info.get('asic_type')
         self.asic_type = asic_type
-        self.hwsku = device_info.get_hwsku()
+        self.hwsku = hwsku
 
         if asic_type == "mellanox":
             from mellanox_buffer_migrator import MellanoxBufferMigrator
@@ -131,12 +175,21 @@ class DBMigrator():
                 self.configDB.set_entry(table, key[0], data[key])
                 if_db.append(key[0])
 
+    def is_warm_restart_enabled(self):
+        """
+        Whether swss warm restarts, never on a config_db.json migration,
+        which is migrated as on a cold boot
+        """
+        if self.config_file:
+            return False
+        return device_info.is_warm_restart_enabled('swss')
+
     def migrate_mgmt_ports_on_s6100(self):
         '''
         During warm-reboot, add back two 10G management ports which got removed from 6100
         to ensure no change in bcm.config from older image
         '''
-        if device_info.is_warm_restart_enabled('swss') == False:
+        if not self.is_warm_restart_enabled():
             log.log_notice("Skip migration on {}, warm-reboot flag not set".format(self.hwsku))
             return True
 
@@ -899,16 +952,52 @@ class DBMigrator():
         else:
             log.log_notice("Asic Type: {}, Hwsku: {}".format(self.asic_type, self.hwsku))
 
+    def mark_timing(self, phase, start):
+        now = time.time()
+        self.timings[phase] = round(now - start, 3)
+        return now
+
+    def commit(self):
+        """
+        Write the changes made to the databases, one transaction per database.
+        CONFIG_DB, which holds the version, is written after APPL_DB so that an
+        interrupted commit is migrated again. On a config_db.json migration,
+        CONFIG_DB is written to the output file instead.
+        Nothing is written on dry run.
+        Returns the changes as {db_name: {key: changes}}.
+        """
+        changes = OrderedDict()
+        for db in (self.appDB, self.configDB, self.loglevelDB):
+            diff = db.get_diff() if self.dry_run else db.commit()
+            if diff:
+                changes[db.db_name] = OrderedDict(sorted(diff.items()))
+
+        if self.config_file and not self.dry_run:
+            config = config_db_file.entries_to_config(self.configDB, self.configDB.get_data())
+            if config_db_file.write_file_atomic(self.output_file, config_db_file.dump_config(config)):
+                log.log_notice('Migrated {} to {}'.format(self.config_file, self.output_file))
+        return changes
+
     def migrate(self):
+        start = time.time()
+        self.configDB.load()
+        start = self.mark_timing('load', start)
+
         version = self.get_version()
         log.log_info('Upgrading from version ' + version)
         while version:
             next_version = getattr(self, version)()
             if next_version == version:
                 raise Exception('Version migrate from %s stuck in same version' % version)
+            start = self.mark_timing(version, start)
             version = next_version
         # Perform common migration ops
         self.common_migration_ops()
+        start = self.mark_timing('common_migration_ops', start)
+
+        self.commit()
+        self.mark_timing('commit', start)
+        log.log_info('Timings in seconds: ' + json.dumps(self.timings))
 
 def main():
     try:
@@ -936,6 +1025,26 @@ def main():
                         required = False,
                         help = 'The asic namespace whose DB instance we need to connect',
                         default = None )
+        parser.add_argument('-c',
+                        dest='config_file',
+                        metavar='config file',
+                        type = str,
+                        required = False,
+                        help = 'migrate this config_db.json instead of the CONFIG_DB of the running system, '
+                               'as on a cold boot: the other databases are empty and the hwsku is the one '
+                               'of the file, only the asic type of the image and its init_cfg.json are used',
+                        default = None )
+        parser.add_argument('--output-file',
+                        dest='output_file',
+                        metavar='output file',
+                        type = str,
+                        required = False,
+                        help = 'the file the migrated config_db.json is written to [default: the config file]',
+                        default = None )
+        parser.add_argument('--dry-run',
+                        dest='dry_run',
+                        action='store_true',
+                        help = 'print the changes and the time spent in each step instead of writing them')
         args = parser.parse_args()
         operation = args.operation
         socket_path = args.socket
@@ -946,15 +1055,23 @@ def main():
         else:
             SonicDBConfig.initialize()
 
-        if socket_path:
-            dbmgtr = DBMigrator(namespace, socket=socket_path)
+        if args.config_file:
+            dbmgtr = DBMigrator(namespace, dry_run=args.dry_run, config_file=args.config_file,
+                                output_file=args.output_file)
+        elif socket_path:
+            dbmgtr = DBMigrator(namespace, socket=socket_path, dry_run=args.dry_run)
         else:
-            dbmgtr = DBMigrator(namespace)
+            dbmgtr = DBMigrator(namespace, dry_run=args.dry_run)
 
         result = getattr(dbmgtr, operation)()
         if result:
             print(str(result))
 
+        # get_version changes nothing, a config file is not written again
+        changes = dbmgtr.commit() if operation != 'get_version' else OrderedDict()
+        if args.dry_run:
+            print(json.dumps(OrderedDict([('changes', changes), ('timings', dbmgtr.timings)]), indent=4))
+
     except Exception as e:
         log.log_error('Caught exception: ' + str(e))
         traceback.print_exc()
@@ -13,6 +13,8 @@ import syslog
 import traceback
 import ipaddress
 from builtins import str #for unicode conversion in python2
+from utilities_common import bulk_db
+from utilities_common.fdb import FdbResolver
 
 
 ARP_CHUNK = binascii.unhexlify('08060001080006040001') # defines a part of the packet for ARP Request
@@ -63,10 +65,8 @@ def get_vlan_ifaces():
 
 def get_bridge_port_id_2_port_id(db):
     bridge_port_id_2_port_id = {}
-    keys = db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:*')
-    keys = [] if keys is None else keys
-    for key in keys:
-        value = db.get_all(db.ASIC_DB, key)
+    keys = list(bulk_db.scan_keys(db, db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:*'))
+    for key, value in zip(keys, bulk_db.hgetall_bulk(db, db.ASIC_DB, keys)):
         port_type = value['SAI_BRIDGE_PORT_ATTR_TYPE']
         if port_type != 'SAI_BRIDGE_PORT_TYPE_PORT':
             continue
@@ -77,21 +77,17 @@ def get_bridge_port_id_2_port_id(db):
 
     return bridge_port_id_2_port_id
 
-def get_lag_by_member(member_name, app_db):
-    keys = app_db.keys(app_db.APPL_DB, 'LAG_MEMBER_TABLE:*')
-    keys = [] if keys is None else keys
-    for key in keys:
+def get_map_lag_member_2_lag_name(app_db):
+    lag_member_2_lag = {}
+    for key in bulk_db.scan_keys(app_db, app_db.APPL_DB, 'LAG_MEMBER_TABLE:*'):
         _, lag_name, lag_member_name = key.split(":")
-        if lag_member_name == member_name:
-            return lag_name
-    return None
+        lag_member_2_lag.setdefault(lag_member_name, lag_name)
+    return lag_member_2_lag
 
 def get_map_host_port_id_2_iface_name(asic_db):
     host_port_id_2_iface = {}
-    keys = asic_db.keys(asic_db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_HOSTIF:oid:*')
-    keys = [] if keys is None else keys
-    for key in keys:
-        value = asic_db.get_all(asic_db.ASIC_DB, key)
+    keys = list(bulk_db.scan_keys(asic_db, asic_db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_HOSTIF:oid:*'))
+    for value in bulk_db.hgetall_bulk(asic_db, asic_db.ASIC_DB, keys):
         if value['SAI_HOSTIF_ATTR_TYPE'] != 'SAI_HOSTIF_TYPE_NETDEV':
             continue
         port_id = value['SAI_HOSTIF_ATTR_OBJ_ID']
@@ -102,16 +98,15 @@ def get_map_host_port_id_2_iface_name(asic_db):
 
 def get_map_lag_port_id_2_portchannel_name(asic_db, app_db, host_port_id_2_iface):
     lag_port_id_2_iface = {}
-    keys = asic_db.keys(asic_db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_LAG_MEMBER:oid:*')
-    keys = [] if keys is None else keys
-    for key in keys:
-        value = asic_db.get_all(asic_db.ASIC_DB, key)
+    lag_member_2_lag = get_map_lag_member_2_lag_name(app_db)
+    keys = list(bulk_db.scan_keys(asic_db, asic_db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_LAG_MEMBER:oid:*'))
+    for value in bulk_db.hgetall_bulk(asic_db, asic_db.ASIC_DB, keys):
         lag_id = value['SAI_LAG_MEMBER_ATTR_LAG_ID']
         if lag_id in lag_port_id_2_iface:
             continue
         member_id = value['SAI_LAG_MEMBER_ATTR_PORT_ID']
         member_name = host_port_id_2_iface[member_id]
-        lag_name = get_lag_by_member(member_name, app_db)
+        lag_name = lag_member_2_lag.get(member_name)
         if lag_name is not None:
             lag_port_id_2_iface[lag_id] = lag_name
 
@@ -140,45 +135,26 @@ def get_map_bridge_port_id_2_iface_name(asic_db, app_db):
 
     return bridge_port_id_2_iface_name
 
-def get_vlan_oid_by_vlan_id(db, vlan_id):
-    keys = db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_VLAN:oid:*')
-    keys = [] if keys is None else keys
-    for key in keys:
-        value = db.get_all(db.ASIC_DB, key)
-        if 'SAI_VLAN_ATTR_VLAN_ID' in value and int(value['SAI_VLAN_ATTR_VLAN_ID']) == vlan_id:
-            return key.replace('ASIC_STATE:SAI_OBJECT_TYPE_VLAN:', '')
-
-    raise Exception('Not found bvi oid for vlan_id: %d' % vlan_id)
-
-def get_fdb(db, vlan_name, vlan_id, bridge_id_2_iface):
-    fdb_types = {
-      'SAI_FDB_ENTRY_TYPE_DYNAMIC': 'dynamic',
-      'SAI_FDB_ENTRY_TYPE_STATIC' : 'static'
-    }
+def get_fdb(fdb_resolver, vlan_name, vlan_id, vlan_fdb_entries):
+    if not fdb_resolver.get_bvids(vlan_id):
+        raise Exception('Not found bvi oid for vlan_id: %d' % vlan_id)
 
-    bvid = get_vlan_oid_by_vlan_id(db, vlan_id)
     available_macs = set()
     map_mac_ip = {}
     fdb_entries = []
-    keys = db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:{*\"bvid\":\"%s\"*}' % bvid)
-    keys = [] if keys is None else keys
-    for key in keys:
-        key_obj = json.loads(key.replace('ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:', ''))
-        mac = str(key_obj['mac'])
+    for fdb in vlan_fdb_entries:
+        mac = str(fdb.mac)
         if not is_mac_unicast(mac):
             continue
         available_macs.add((vlan_name, mac.lower()))
         fdb_mac = mac.replace(':', '-')
-        # get attributes
-        value = db.get_all(db.ASIC_DB, key)
-        fdb_type = fdb_types[value['SAI_FDB_ENTRY_ATTR_TYPE']]
-        if value['SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID'] not in bridge_id_2_iface:
+        if fdb.port is None:
             continue
-        fdb_port = bridge_id_2_iface[value['SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID']]
+        fdb_port = fdb.port
 
         obj = {
           'FDB_TABLE:Vlan%d:%s' % (vlan_id, fdb_mac) : {
-            'type': fdb_type,
+            'type': fdb.type.lower(),
             'port': fdb_port,
           },
           'OP': 'SET'
@@ -214,9 +190,16 @@ def generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces):
 
     bridge_id_2_iface = get_map_bridge_port_id_2_iface_name(asic_db, app_db)
 
+    # All the FDB entries are loaded at once and grouped by vlan
+    fdb_resolver = FdbResolver(asic_db, bridge_id_2_iface)
+    fdb_entries_per_vlan = {}
+    for fdb in fdb_resolver.get_entries(skip_unknown_bvid=True, skip_unknown_port=False):
+        fdb_entries_per_vlan.setdefault(fdb.vlan_id, []).append(fdb)
+
     for vlan in vlan_ifaces:
         vlan_id = int(vlan.replace('Vlan', ''))
-        fdb_entry, available_macs, map_mac_ip_per_vlan[vlan] = get_fdb(asic_db, vlan, vlan_id, bridge_id_2_iface)
+        fdb_entry, available_macs, map_mac_ip_per_vlan[vlan] = get_fdb(fdb_resolver, vlan, vlan_id,
+                                                                        fdb_entries_per_vlan.get(vlan_id, []))
         all_available_macs |= available_macs
         fdb_entries.extend(fdb_entry)
 
@@ -10,14 +10,15 @@ What it is:
 
 How:
     NOTE: The flow from APPL-DB to ASIC-DB takes non zero milliseconds.
-    1) Initiate subscribe for ASIC-DB updates.
-    2) Read APPL-DB & ASIC-DB 
-    3) Get the diff.
-    4) If any diff, 
-        4.1) Collect subscribe messages for a second
-        4.2) check diff against the subscribe messages 
-    5) Rule out local interfaces & default routes
-    6) If still outstanding diffs, report failure.
+    1) Read the route keys of APPL-DB & ASIC-DB, parsing every prefix into
+       a normalized integer key.
+    2) Get the diff of the keys.
+    3) Rule out local interfaces & default routes
+    4) If any diff,
+        4.1) Initiate subscribe for ASIC-DB updates
+        4.2) Collect subscribe messages for a second
+        4.3) check diff against the current ASIC-DB routes & the subscribe messages
+    5) If still outstanding diffs, report failure.
 
 To verify:
     Run this tool in SONiC switch and watch the result. In case of failure
@@ -35,11 +36,13 @@ To verify:
 """
 
 import argparse
+from collections import Counter, OrderedDict
 from enum import Enum
 import ipaddress
 import json
 import os
 import re
+import socket
 import sys
 import syslog
 import time
@@ -56,6 +59,10 @@ ASIC_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:'
 
 SUBSCRIBE_WAIT_SECS = 1
 
+# Daemon mode: how long a mismatch may last before it is reported
+DEFAULT_GRACE_SECS = 10
+SELECT_TIMEOUT_MSECS = 1000
+
 # Max of 2 minutes
 TIMEOUT_SECONDS = 120
 
@@ -66,6 +73,11 @@ os.environ['PYTHONUNBUFFERED']='True'
 PREFIX_SEPARATOR = '/'
 IPV6_SEPARATOR = ':'
 
+# Route keys: prefix length in the low 8 bits, address above it and
+# IPV6_KEY_FLAG set for IPv6 prefixes.
+IPV6_KEY_FLAG = 1 << 136
+IPV6_ADDR_MASK = (1 << 128) - 1
+
 MIN_SCAN_INTERVAL = 10      # Every 10 seconds
 MAX_SCAN_INTERVAL = 3600    # An hour
 
@@ -153,14 +165,32 @@ def add_prefix_ifnot(ip):
     return ip if ip.find(PREFIX_SEPARATOR) != -1 else add_prefix(ip)
 
 
-def is_local(ip):
+def route_key(prefix):
     """
-    helper to check if this IP qualify as link local
-    :param ip: IP to check as string
+    helper to parse a prefix into a normalized integer key, so that
+    different spellings of the same prefix compare equal.
+    :param prefix: prefix as string, with or without length
+    :return route key as int
+    """
+    ip, _, length = prefix.partition(PREFIX_SEPARATOR)
+    if ip.find(IPV6_SEPARATOR) == -1:
+        addr = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+        return addr << 8 | int(length or 32)
+    addr = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+    return IPV6_KEY_FLAG | addr << 8 | int(length or 128)
+
+
+def is_local_key(key):
+    """
+    helper to check if a route key qualify as link local
+    :param key: route key as int
     :return True if link local, else False
     """
-    t = ipaddress.ip_address(ip.split("/")[0])
-    return t.is_link_local
+    if key & IPV6_KEY_FLAG:
+        # fe80::/10
+        return (key >> 8 & IPV6_ADDR_MASK) >> 118 == 0x3fa
+    # 169.254.0.0/16
+    return key >> 24 == 0xa9fe
 
 
 def is_default_route(ip):
@@ -173,76 +203,130 @@ def is_default_route(ip):
     return t.is_unspecified and ip.split("/")[1] == "0"
 
 
-def cmps(s1, s2):
-    """
-    helper to compare two strings
-    :param s1: left string
-    :param s2: right string
-    :return comparison result as -1/0/1
-    """
-    if (s1 == s2):
-        return 0
-    if (s1 < s2):
-        return -1
-    return 1
-
-
-def diff_sorted_lists(t1, t2):
-    """
-    helper to compare two sorted lists.
-    :param t1: list 1
-    :param t2: list 2
-    :return (<t1 entries that are not in t2>, <t2 entries that are not in t1>)
-    """
-    t1_x = t2_x = 0
-    t1_miss = []
-    t2_miss = []
-    t1_len = len(t1);
-    t2_len = len(t2);
-    while t1_x < t1_len and t2_x < t2_len:
-        d = cmps(t1[t1_x], t2[t2_x])
-        if (d == 0):
-            t1_x += 1
-            t2_x += 1
-        elif (d < 0):
-            t1_miss.append(t1[t1_x])
-            t1_x += 1
-        else:
-            t2_miss.append(t2[t2_x])
-            t2_x += 1
+def key_prefix(key):
+    """
+    helper to format a route key back into a prefix
+    :param key: route key as int
+    :return prefix as string
+    """
+    if key & IPV6_KEY_FLAG:
+        ip = socket.inet_ntop(socket.AF_INET6, (key >> 8 & IPV6_ADDR_MASK).to_bytes(16, 'big'))
+    else:
+        ip = socket.inet_ntop(socket.AF_INET, (key >> 8).to_bytes(4, 'big'))
+    return ip + PREFIX_SEPARATOR + str(key & 0xff)
+
 
-    while t1_x < t1_len:
-        t1_miss.append(t1[t1_x])
-        t1_x += 1
+class RouteSet(object):
+    """
+    Routes of a table as a multiset of route keys. Link local routes are
+    left out.
+    """
+
+    def __init__(self, prefixes=()):
+        self.keys = Counter()
+        self.update(prefixes)
+
+    def __contains__(self, prefix):
+        return route_key(prefix) in self.keys
+
+    def __len__(self):
+        return sum(self.keys.values())
+
+    def update(self, prefixes):
+        keys = [route_key(prefix) for prefix in prefixes]
+        self.keys.update(key for key in keys if not is_local_key(key))
+
+    def add(self, prefix):
+        self.update((prefix,))
 
-    while t2_x < t2_len:
-        t2_miss.append(t2[t2_x])
-        t2_x += 1
-    return t1_miss, t2_miss
+    def add_key(self, key):
+        """
+        :return False if the route was left out as link local
+        """
+        if is_local_key(key):
+            return False
+        self.keys[key] += 1
+        return True
 
+    def remove_key(self, key):
+        self.keys[key] -= 1
+        if self.keys[key] <= 0:
+            del self.keys[key]
 
-def checkout_rt_entry(k):
+    def to_list(self):
+        """
+        :return sorted list of the prefixes
+        """
+        return sorted(key_prefix(key) for key in self.keys.elements())
+
+    def missing_from(self, *others):
+        """
+        :param others: RouteSets to check against
+        :return sorted list of the prefixes that are in none of others
+        """
+        missing = self.keys
+        for other in others:
+            missing = missing - other.keys
+        return sorted(key_prefix(key) for key in missing.elements())
+
+
+class PhaseTimer(object):
     """
-    helper to filter out correct keys and strip out IP alone.
-    :param ip: key to check as string
-    :return (True, ip) or (False, None)
+    Collects the time spent in each phase of a check
+    """
+
+    def __init__(self):
+        self.timings = OrderedDict()
+        self.start = time.time()
+
+    def mark(self, phase):
+        now = time.time()
+        self.timings[phase] = round(now - self.start, 3)
+        self.start = now
+
+    def report(self):
+        print_message(syslog.LOG_INFO, "Timings in seconds: ", json.dumps(self.timings))
+
+
+def debug_enabled():
+    return syslog.LOG_DEBUG <= report_level
+
+
+def rt_entry_prefix(k):
+    """
+    helper to filter out route entry keys and strip out IP alone.
+    :param k: ASIC-DB key to check as string
+    :return IP as string or None
     """
     if k.startswith(ASIC_KEY_PREFIX):
-        e = k.lower().split("\"", -1)[3]
-        if not is_local(e):
-            return True, e
-    return False, None
+        return k.split("\"", 4)[3].lower()
+    return None
 
 
-def get_subscribe_updates(selector, subs):
+def get_subscribe_updates(asic_db):
     """
-    helper to collect subscribe messages for a period
-    :param selector: Selector object to wait
-    :param subs: Subscription object to pop messages
-    :return (add, del) messages as sorted
+    helper to subscribe to ASIC-DB updates and collect them for a period.
+    The subscription starts with the entries present in ASIC-DB, which
+    give the routes that reached or left ASIC-DB since it was read.
+    :param asic_db: ASIC-DB connection
+    :return (current, add, del) route sets
     """
-    adds = []
-    deletes = []
+    subs = swsscommon.SubscriberStateTable(asic_db, ASIC_TABLE_NAME)
+
+    current = RouteSet()
+    while True:
+        key, _, _ = subs.pop()
+        if not key:
+            break
+        e = rt_entry_prefix(key)
+        if e:
+            current.add(e)
+
+    selector = swsscommon.Select()
+    selector.addSelectable(subs)
+
+    adds = RouteSet()
+    deletes = RouteSet()
     t_end = time.time() + SUBSCRIBE_WAIT_SECS
     t_wait = SUBSCRIBE_WAIT_SECS
 
@@ -253,98 +337,96 @@ def get_subscribe_updates(selector, subs):
             key, op, val = subs.pop()
             if not key:
                 break
-            res, e = checkout_rt_entry(key)
-            if res:
+            e = rt_entry_prefix(key)
+            if e:
                 if op == "SET":
-                    adds.append(e)
+                    adds.add(e)
                 elif op == "DEL":
-                    deletes.append(e)
+                    deletes.add(e)
 
-    print_message(syslog.LOG_DEBUG, "adds={}".format(adds))
-    print_message(syslog.LOG_DEBUG, "dels={}".format(deletes))
-    return (sorted(adds), sorted(deletes))
+    print_message(syslog.LOG_DEBUG, "adds={}".format(adds.to_list()))
+    print_message(syslog.LOG_DEBUG, "dels={}".format(deletes.to_list()))
+    return (current, adds, deletes)
 
 
 def is_vrf(k):
     return k.startswith("Vrf")
 
 
-def get_routes():
+def route_prefix(k):
     """
-    helper to read route table from APPL-DB.
-    :return list of sorted routes with prefix ensured
+    helper to strip out the prefix of an APPL-DB:ROUTE_TABLE key.
+    :param k: key as string
+    :return prefix as string
     """
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    print_message(syslog.LOG_DEBUG, "APPL DB connected for routes")
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
-    keys = tbl.getKeys()
+    if (is_vrf(k)):
+        k = k.split(":", 1)[1]
+    return add_prefix_ifnot(k.lower())
 
-    valid_rt = []
-    for k in keys:
-        if (is_vrf(k)):
-            k = k.split(":", 1)[1]
 
-        if not is_local(k):
-            valid_rt.append(add_prefix_ifnot(k.lower()))
+def intf_prefix(k):
+    """
+    helper to strip out the IP of an APPL-DB:INTF_TABLE key.
+    :param k: key as string
+    :return IP with added prefix as string, or None
+    """
+    lst = re.split(':', k.lower(), maxsplit=1)
+    if len(lst) == 1:
+        # No IP address in key; ignore
+        return None
+    return add_prefix(lst[1].split("/", -1)[0])
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": sorted(valid_rt)}, indent=4))
-    return sorted(valid_rt)
 
+def get_routes(appl_db):
+    """
+    helper to read route table from APPL-DB.
+    :param appl_db: APPL-DB connection
+    :return RouteSet of routes with prefix ensured
+    """
+    tbl = swsscommon.Table(appl_db, 'ROUTE_TABLE')
 
-def get_route_entries():
+    valid_rt = RouteSet(route_prefix(k) for k in tbl.getKeys())
+
+    if debug_enabled():
+        print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": valid_rt.to_list()}, indent=4))
+    return valid_rt
+
+
+def get_route_entries(asic_db):
     """
-    helper to read present route entries from ASIC-DB and 
-    as well initiate selector for ASIC-DB:ASIC-state updates.
-    :return (selector,  subscriber, <list of sorted routes>)
+    helper to read present route entries from ASIC-DB.
+    Only the keys are read, the route entries' attributes are not needed.
+    :param asic_db: ASIC-DB connection
+    :return RouteSet of routes
     """
-    db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
-    subs = swsscommon.SubscriberStateTable(db, ASIC_TABLE_NAME)
-    print_message(syslog.LOG_DEBUG, "ASIC DB connected")
+    tbl = swsscommon.Table(asic_db, ASIC_TABLE_NAME)
 
-    rt = []
-    while True:
-        k, _, _ = subs.pop()
-        if not k:
-            break
-        res, e = checkout_rt_entry(k)
-        if res:
-            rt.append(e)
-                                
-    print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": sorted(rt)}, indent=4))
+    rt = RouteSet(k.split("\"", 4)[3].lower() for k in tbl.getKeys() if k.startswith(ASIC_KEY_PREFIX))
 
-    selector = swsscommon.Select()
-    selector.addSelectable(subs)
-    return (selector, subs, sorted(rt))
+    if debug_enabled():
+        print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": rt.to_list()}, indent=4))
+    return rt
 
 
-def get_interfaces():
+def get_interfaces(appl_db):
     """
     helper to read interface table from APPL-DB.
-    :return sorted list of IP addresses with added prefix
+    :param appl_db: APPL-DB connection
+    :return RouteSet of IP addresses with added prefix
     """
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    print_message(syslog.LOG_DEBUG, "APPL DB connected for interfaces")
-    tbl = swsscommon.Table(db, 'INTF_TABLE')
-    keys = tbl.getKeys()
+    tbl = swsscommon.Table(appl_db, 'INTF_TABLE')
 
-    intf = []
-    for k in keys:
-        lst = re.split(':', k.lower(), maxsplit=1)
-        if len(lst) == 1:
-            # No IP address in key; ignore
-            continue
-
-        ip = add_prefix(lst[1].split("/", -1)[0])
-        if not is_local(ip):
-            intf.append(ip)
+    intf = RouteSet(ip for ip in map(intf_prefix, tbl.getKeys()) if ip)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": sorted(intf)}, indent=4))
-    return sorted(intf)
+    if debug_enabled():
+        print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": intf.to_list()}, indent=4))
+    return intf
 
 
-def filter_out_local_interfaces(keys):
+def filter_out_local_interfaces(appl_db, keys):
     """
     helper to filter out local interfaces
+    :param appl_db: APPL-DB connection
     :param keys: APPL-DB:ROUTE_TABLE Routes to check.
     :return keys filtered out of local
     """
@@ -354,9 +436,8 @@ def filter_out_local_interfaces(keys):
 
     chassis_local_intfs = chassis.get_chassis_local_interfaces()
     local_if_lst.update(set(chassis_local_intfs))
-    
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
+
+    tbl = swsscommon.Table(appl_db, 'ROUTE_TABLE')
 
     for k in keys:
         e = dict(tbl.get(k)[1])
@@ -375,21 +456,21 @@ def filter_out_local_interfaces(keys):
     return rt
 
 
-def filter_out_voq_neigh_routes(keys):
+def filter_out_voq_neigh_routes(appl_db, keys):
     """
     helper to filter out voq neigh routes. These are the
     routes statically added for the voq neighbors. We skip
     writing route entries in asic db for these. We filter
     out reporting error on all the host routes written on
     inband interface prefixed with "Ethernte-IB"
+    :param appl_db: APPL-DB connection
     :param keys: APPL-DB:ROUTE_TABLE Routes to check.
     :return keys filtered out for voq neigh routes
     """
     rt = []
     local_if_re = [r'Ethernet-IB\d+']
 
-    db = swsscommon.DBConnector(APPL_DB_NAME, 0)
-    tbl = swsscommon.Table(db, 'ROUTE_TABLE')
+    tbl = swsscommon.Table(appl_db, 'ROUTE_TABLE')
 
     for k in keys:
         prefix = k.split("/")
@@ -420,26 +501,25 @@ def filter_out_default_routes(lst):
     return upd
 
 
-def filter_out_vnet_routes(routes):
+def filter_out_vnet_routes(appl_db, routes):
     """
     Helper to filter out VNET routes
+    :param appl_db: APPL-DB connection
     :param routes: list of routes to filter
     :return filtered list of routes.
     """
-    db = swsscommon.DBConnector('APPL_DB', 0)
-
-    vnet_route_table = swsscommon.Table(db, 'VNET_ROUTE_TABLE')
-    vnet_route_tunnel_table = swsscommon.Table(db, 'VNET_ROUTE_TUNNEL_TABLE')
+    vnet_route_table = swsscommon.Table(appl_db, 'VNET_ROUTE_TABLE')
+    vnet_route_tunnel_table = swsscommon.Table(appl_db, 'VNET_ROUTE_TUNNEL_TABLE')
 
     vnet_routes_db_keys = vnet_route_table.getKeys() + vnet_route_tunnel_table.getKeys()
 
-    vnet_routes = []
+    vnet_routes = set()
 
     for vnet_route_db_key in vnet_routes_db_keys:
         vnet_route_attrs = vnet_route_db_key.split(':')
         vnet_name = vnet_route_attrs[0]
         vnet_route = vnet_route_attrs[1]
-        vnet_routes.append(vnet_route)
+        vnet_routes.add(vnet_route)
 
     updated_routes = []
 
@@ -456,17 +536,13 @@ def is_dualtor(config_db):
     return subtype.lower() == 'dualtor'
 
 
-def filter_out_standalone_tunnel_routes(routes):
-    config_db = swsscommon.ConfigDBConnector()
-    config_db.connect()
-
+def filter_out_standalone_tunnel_routes(appl_db, config_db, routes):
     if not is_dualtor(config_db):
         return routes
 
-    app_db = swsscommon.DBConnector('APPL_DB', 0)
-    neigh_table = swsscommon.Table(app_db, 'NEIGH_TABLE')
+    neigh_table = swsscommon.Table(appl_db, 'NEIGH_TABLE')
     neigh_keys = neigh_table.getKeys()
-    standalone_tunnel_route_ips = []
+    standalone_tunnel_route_ips = set()
     updated_routes = []
 
     for neigh in neigh_keys:
@@ -474,7 +550,7 @@ def filter_out_standalone_tunnel_routes(routes):
         if mac == '00:00:00:00:00:00':
             # remove preceding 'VlanXXXX' to get just the neighbor IP
             neigh_ip = ':'.join(neigh.split(':')[1:])
-            standalone_tunnel_route_ips.append(neigh_ip)
+            standalone_tunnel_route_ips.add(neigh_ip)
 
     if not standalone_tunnel_route_ips:
         return routes
@@ -503,7 +579,7 @@ def get_soc_ips(config_db):
     return soc_ips
 
 
-def filter_out_soc_ip_routes(routes):
+def filter_out_soc_ip_routes(config_db, routes):
     """
     Ignore ASIC only routes for SOC IPs
 
@@ -513,13 +589,10 @@ def filter_out_soc_ip_routes(routes):
     will use the kernel routing table), but still provide connectivity to any external
     traffic in case of a link issue (since this traffic will be forwarded by the ASIC).
     """
-    config_db = swsscommon.ConfigDBConnector()
-    config_db.connect()
-
     if not is_dualtor(config_db):
         return routes
 
-    soc_ips = get_soc_ips(config_db)
+    soc_ips = set(get_soc_ips(config_db))
 
     if not soc_ips:
         return routes
@@ -548,47 +621,86 @@ def check_routes():
     :return (0, None) on sucess, else (-1, results) where results holds
     the unjustifiable entries.
     """
-    intf_appl_miss = []
-    rt_appl_miss = []
-    rt_asic_miss = []
-
-    results = {}
     adds = []
     deletes = []
 
-    selector, subs, rt_asic = get_route_entries()
+    timer = PhaseTimer()
+
+    appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0)
+    asic_db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
+    config_db = swsscommon.ConfigDBConnector()
+    config_db.connect()
+    print_message(syslog.LOG_DEBUG, "APPL DB, ASIC DB & CONFIG DB connected")
+
+    rt_asic = get_route_entries(asic_db)
+    timer.mark("read_asic_db")
 
-    rt_appl = get_routes()
-    intf_appl = get_interfaces()
+    rt_appl = get_routes(appl_db)
+    intf_appl = get_interfaces(appl_db)
+    timer.mark("read_appl_db")
 
     # Diff APPL-DB routes & ASIC-DB routes
-    rt_appl_miss, rt_asic_miss = diff_sorted_lists(rt_appl, rt_asic)
+    rt_appl_miss = rt_appl.missing_from(rt_asic)
 
     # Check missed ASIC routes against APPL-DB INTF_TABLE
-    _, rt_asic_miss = diff_sorted_lists(intf_appl, rt_asic_miss)
-    rt_asic_miss = filter_out_default_routes(rt_asic_miss)
-    rt_asic_miss = filter_out_vnet_routes(rt_asic_miss)
-    rt_asic_miss = filter_out_standalone_tunnel_routes(rt_asic_miss)
-    rt_asic_miss = filter_out_soc_ip_routes(rt_asic_miss)
+    rt_asic_miss = rt_asic.missing_from(rt_appl, intf_appl)
 
     # Check APPL-DB INTF_TABLE with ASIC table route entries
-    intf_appl_miss, _ = diff_sorted_lists(intf_appl, rt_asic)
+    intf_appl_miss = intf_appl.missing_from(rt_asic)
+    timer.mark("diff")
+
+    rt_appl_miss, rt_asic_miss = filter_mismatches(appl_db, config_db, rt_appl_miss, rt_asic_miss)
+    timer.mark("filter")
+
+    if rt_appl_miss or rt_asic_miss:
+        # Look for subscribe updates for a second
+        current, add_routes, del_routes = get_subscribe_updates(asic_db)
+        adds = add_routes.to_list()
+        deletes = del_routes.to_list()
+
+        # Drop all those present now or for which SET received
+        rt_appl_miss = [rt for rt in rt_appl_miss if rt not in current and rt not in add_routes]
+
+        # Drop all those gone now or for which DEL received
+        rt_asic_miss = [rt for rt in rt_asic_miss if rt in current and rt not in del_routes]
+        timer.mark("subscribe_updates")
+
+    timer.report()
+
+    return report_results(rt_appl_miss, intf_appl_miss, rt_asic_miss, adds, deletes)
+
+
+def filter_mismatches(appl_db, config_db, rt_appl_miss, rt_asic_miss):
+    """
+    helper to rule out the mismatches that are expected.
+    :param appl_db: APPL-DB connection
+    :param config_db: CONFIG-DB connection
+    :param rt_appl_miss: APPL-DB routes missing in ASIC-DB
+    :param rt_asic_miss: ASIC-DB routes missing in APPL-DB
+    :return (rt_appl_miss, rt_asic_miss) filtered
+    """
+    rt_asic_miss = filter_out_default_routes(rt_asic_miss)
+    rt_asic_miss = filter_out_vnet_routes(appl_db, rt_asic_miss)
+    rt_asic_miss = filter_out_standalone_tunnel_routes(appl_db, config_db, rt_asic_miss)
+    rt_asic_miss = filter_out_soc_ip_routes(config_db, rt_asic_miss)
 
     if rt_appl_miss:
-        rt_appl_miss = filter_out_local_interfaces(rt_appl_miss)
+        rt_appl_miss = filter_out_local_interfaces(appl_db, rt_appl_miss)
 
     if rt_appl_miss:
-        rt_appl_miss = filter_out_voq_neigh_routes(rt_appl_miss)
+        rt_appl_miss = filter_out_voq_neigh_routes(appl_db, rt_appl_miss)
 
-    if rt_appl_miss or rt_asic_miss:
-        # Look for subscribe updates for a second
-        adds, deletes = get_subscribe_updates(selector, subs)
+    return rt_appl_miss, rt_asic_miss
 
-        # Drop all those for which SET received
-        rt_appl_miss, _ = diff_sorted_lists(rt_appl_miss, adds)
 
-        # Drop all those for which DEL received
-        rt_asic_miss, _ = diff_sorted_lists(rt_asic_miss, deletes)
+def report_results(rt_appl_miss, intf_appl_miss, rt_asic_miss, adds=None, deletes=None):
+    """
+    helper to report the outstanding mismatches.
+    :param adds: subscribe SET messages checked, if any
+    :param deletes: subscribe DEL messages checked, if any
+    :return (0, None) on sucess, else (-1, results)
+    """
+    results = {}
 
     if rt_appl_miss:
         results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
@@ -602,19 +714,181 @@ def check_routes():
     if results:
         print_message(syslog.LOG_WARNING, "Failure results: {",  json.dumps(results, indent=4), "}")
         print_message(syslog.LOG_WARNING, "Failed. Look at reported mismatches above")
-        print_message(syslog.LOG_WARNING, "add: ", json.dumps(adds, indent=4))
-        print_message(syslog.LOG_WARNING, "del: ", json.dumps(deletes, indent=4))
+        if adds is not None:
+            print_message(syslog.LOG_WARNING, "add: ", json.dumps(adds, indent=4))
+        if deletes is not None:
+            print_message(syslog.LOG_WARNING, "del: ", json.dumps(deletes, indent=4))
         return -1, results
     else:
         print_message(syslog.LOG_INFO, "All good!")
         return 0, None
 
 
+class SubscriptionLost(Exception):
+    pass
+
+
+class RouteTableMirror(object):
+    """
+    In-memory copy of the routes of a table, kept current from a
+    subscription to the table. The subscription starts with the entries
+    present in the table.
+    """
+
+    def __init__(self, db, table_name, get_prefix):
+        self.subs = swsscommon.SubscriberStateTable(db, table_name)
+        self.get_prefix = get_prefix
+        self.entries = {}
+        self.routes = RouteSet()
+
+    def apply_updates(self):
+        """
+        Apply the pending subscribe messages.
+        :return set of the route keys changed
+        """
+        changed = set()
+        while True:
+            k, op, _ = self.subs.pop()
+            if not k:
+                break
+            if op == "SET":
+                if k in self.entries:
+                    # Attributes update
+                    continue
+                prefix = self.get_prefix(k)
+                if not prefix:
+                    continue
+                key = route_key(prefix)
+                if self.routes.add_key(key):
+                    self.entries[k] = key
+                    changed.add(key)
+            elif op == "DEL":
+                key = self.entries.pop(k, None)
+                if key is not None:
+                    self.routes.remove_key(key)
+                    changed.add(key)
+        return changed
+
+
+class RouteCheckDaemon(object):
+    """
+    Long running route check. After a full baseline, APPL-DB & ASIC-DB
+    routes are kept in memory from keyspace subscriptions and only the
+    routes that change are checked again. Mismatches that last longer
+    than the grace period are reported. The baseline is only taken again
+    when a subscription is lost.
+    """
+
+    APPL_MISS = "missed_ROUTE_TABLE_routes"
+    INTF_MISS = "missed_INTF_TABLE_entries"
+    ASIC_MISS = "Unaccounted_ROUTE_ENTRY_TABLE_entries"
+
+    def __init__(self, grace_period):
+        self.grace_period = grace_period
+        self.appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0)
+        self.asic_db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
+        self.config_db = swsscommon.ConfigDBConnector()
+        self.config_db.connect()
+        self.selector = None
+        self.mirrors = []
+        # mismatch -> {route key: time first seen}
+        self.pending = {self.APPL_MISS: {}, self.INTF_MISS: {}, self.ASIC_MISS: {}}
+
+    def resync(self):
+        """
+        Take a full baseline by subscribing again to the route tables.
+        """
+        timer = PhaseTimer()
+        self.selector = swsscommon.Select()
+        self.appl_routes = RouteTableMirror(self.appl_db, 'ROUTE_TABLE', route_prefix)
+        self.appl_intfs = RouteTableMirror(self.appl_db, 'INTF_TABLE', intf_prefix)
+        self.asic_routes = RouteTableMirror(self.asic_db, ASIC_TABLE_NAME, rt_entry_prefix)
+        self.mirrors = [self.appl_routes, self.appl_intfs, self.asic_routes]
+        for mirror in self.mirrors:
+            self.selector.addSelectable(mirror.subs)
+
+        # Mismatches still there keep the time they were first seen
+        since = self.pending
+        self.pending = {mismatch: {} for mismatch in since}
+        self.update_pending(self.apply_updates(), since)
+        timer.mark("resync")
+        timer.report()
+
+    def apply_updates(self):
+        changed = set()
+        for mirror in self.mirrors:
+            changed.update(mirror.apply_updates())
+        return changed
+
+    def mismatch_counts(self, key):
+        appl = self.appl_routes.routes.keys[key]
+        intf = self.appl_intfs.routes.keys[key]
+        asic = self.asic_routes.routes.keys[key]
+        return {self.APPL_MISS: appl - asic,
+                self.INTF_MISS: intf - asic,
+                self.ASIC_MISS: asic - appl - intf}
+
+    def update_pending(self, keys, since=None):
+        now = time.time()
+        for key in keys:
+            for mismatch, count in self.mismatch_counts(key).items():
+                pending = self.pending[mismatch]
+                if count <= 0:
+                    pending.pop(key, None)
+                elif key not in pending:
+                    pending[key] = since[mismatch].get(key, now) if since else now
+
+    def wait_for_updates(self):
+        state, _ = self.selector.select(SELECT_TIMEOUT_MSECS)
+        if state == swsscommon.Select.ERROR:
+            raise SubscriptionLost("select failed")
+        self.update_pending(self.apply_updates())
+
+    def get_mismatches(self, mismatch):
+        """
+        :return sorted list of the mismatches older than the grace period
+        """
+        t_end = time.time() - self.grace_period
+        lst = []
+        for key, t_seen in self.pending[mismatch].items():
+            if t_seen <= t_end:
+                lst.extend([key_prefix(key)] * self.mismatch_counts(key)[mismatch])
+        return sorted(lst)
+
+    def check(self):
+        rt_appl_miss, rt_asic_miss = filter_mismatches(self.appl_db, self.config_db,
+                                                       self.get_mismatches(self.APPL_MISS),
+                                                       self.get_mismatches(self.ASIC_MISS))
+        return report_results(rt_appl_miss, self.get_mismatches(self.INTF_MISS), rt_asic_miss)
+
+    def run(self, interval):
+        """
+        Check the routes every interval seconds, forever. The first check
+        is done as soon as the baseline is taken.
+        """
+        t_check = time.time()
+        while True:
+            try:
+                if self.selector is None:
+                    self.resync()
+                self.wait_for_updates()
+            except (SubscriptionLost, RuntimeError) as e:
+                print_message(syslog.LOG_ERR, "Route subscriptions lost ({}), taking a new baseline".format(e))
+                self.selector = None
+                time.sleep(SUBSCRIBE_WAIT_SECS)
+                continue
+
+            if time.time() >= t_check:
+                self.check()
+                t_check = time.time() + interval
+
+
 def main():
     """
     main entry point, which mainly parses the args and call check_routes
     In case of single run, it returns on one call or stays in forever loop
     with given interval in-between calls to check_route
+    In daemon mode, it stays in forever loop checking the routes as they change
     :return Same return value as returned by check_route.
     """
     interval = 0
@@ -622,6 +896,10 @@ def main():
     parser.add_argument('-m', "--mode", type=Level, choices=list(Level), default='ERR')
     parser.add_argument("-i", "--interval", type=int, default=0, help="Scan interval in seconds")
     parser.add_argument("-s", "--log_to_syslog", action="store_true", default=True, help="Write message to syslog")
+    parser.add_argument("-d", "--daemon", action="store_true", default=False,
+                        help="Keep running and check the routes as they change")
+    parser.add_argument("-g", "--grace_period", type=int, default=DEFAULT_GRACE_SECS,
+                        help="Daemon mode: seconds a mismatch may last before it is reported")
     args = parser.parse_args()
 
     set_level(args.mode, args.log_to_syslog)
@@ -636,6 +914,9 @@ def main():
         if UNIT_TESTING:
             interval = 1
 
+    if args.daemon:
+        return RouteCheckDaemon(args.grace_period).run(interval or MIN_SCAN_INTERVAL)
+
     signal.signal(signal.SIGALRM, handler)
 
     while True:
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 
+import argparse
 import os
 import sys
 import json
 import syslog
+import time
+from collections import OrderedDict
 from swsscommon import swsscommon
 
 ''' vnet_route_check.py: tool that verifies VNET routes consistancy between SONiC and vendor SDK DBs.
@@ -13,6 +16,9 @@ Logically VNET route verification logic consists of 3 parts:
 2. Get VNET routes entries that are missed in APP_DB but present in ASIC_DB.
 3. Get VNET routes entries that are missed in SDK but present in ASIC_DB.
 
+The routes are compared as per VNET sets of prefixes, so the check takes linear time in the number of routes.
+The check can be limited to some VNETs with --vnet, the time spent in each phase is reported with --mode INFO.
+
 Returns 0 if there is no inconsistancy found and all VNET routes are aligned in all DBs.
 Returns -1 if there is incosistancy found and prints differences between DBs in JSON format to standart output.
 
@@ -49,6 +55,10 @@ RC_OK = 0
 RC_ERR = -1
 default_vrf_oid = ""
 
+ASIC_ROUTE_ENTRY_TABLE = 'ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY'
+
+LOG_LEVELS = OrderedDict([('ERR', syslog.LOG_ERR), ('INFO', syslog.LOG_INFO), ('DEBUG', syslog.LOG_DEBUG)])
+
 report_level = syslog.LOG_ERR
 write_to_syslog = True
 
@@ -71,6 +81,23 @@ def print_message(lvl, *args):
             syslog.syslog(lvl, msg)
 
 
+class PhaseTimer(object):
+    ''' Collects the time spent in each phase of the check
+    '''
+
+    def __init__(self):
+        self.timings = OrderedDict()
+        self.start = time.time()
+
+    def mark(self, phase):
+        now = time.time()
+        self.timings[phase] = round(now - self.start, 3)
+        self.start = now
+
+    def report(self):
+        print_message(syslog.LOG_INFO, "Timings in seconds:", json.dumps(self.timings))
+
+
 def check_vnet_cfg():
     ''' Returns True if VNET is configured in APP_DB or False if no VNET configuration.
     '''
@@ -117,103 +144,92 @@ def get_all_rifs_oids():
     return rif_name_oid_map
 
 
-def get_vnet_rifs_oids():
+def get_vnet_rifs_oids(vnet_intfs):
     ''' Returns dictionary of VNET interfaces and their OIDs.
     Format: { <vnet_rif_name>: <vnet_rif_oid> }
     '''
-    vnet_intfs = get_vnet_intfs()
     intfs_oids = get_all_rifs_oids()
 
-    vnet_intfs = [vnet_intfs[k] for k in vnet_intfs]
-    vnet_intfs = [val for sublist in vnet_intfs for val in sublist]
+    vnet_rifs = set(val for sublist in vnet_intfs.values() for val in sublist)
 
     vnet_rifs_oids_map = {}
 
     for intf_name in intfs_oids or {}:
-        if intf_name in vnet_intfs:
+        if intf_name in vnet_rifs:
             vnet_rifs_oids_map[intf_name] = intfs_oids[intf_name]
 
     return vnet_rifs_oids_map
 
 
-def get_vrf_entries():
+def get_vrf_entries(vnet_intfs):
     ''' Returns dictionary of VNET interfaces and corresponding VRF OIDs.
     Format: { <vnet_rif_name>: <vrf_oid> }
     '''
     db = swsscommon.DBConnector('ASIC_DB', 0)
     rif_table = swsscommon.Table(db, 'ASIC_STATE')
 
-    vnet_rifs_oids = get_vnet_rifs_oids()
+    vnet_rifs_oids = get_vnet_rifs_oids(vnet_intfs)
 
     rif_vrf_map = {}
-    for vnet_rif_name in vnet_rifs_oids:
-
-        db_keys = rif_table.getKeys()
-
-        for db_key in db_keys:
-            if (db_key == f'SAI_OBJECT_TYPE_ROUTER_INTERFACE:{vnet_rifs_oids[vnet_rif_name]}'):
-                rif_attrs = dict(rif_table.get(db_key)[1])
-                rif_vrf_map[vnet_rif_name] = rif_attrs['SAI_ROUTER_INTERFACE_ATTR_VIRTUAL_ROUTER_ID']
+    for vnet_rif_name, vnet_rif_oid in vnet_rifs_oids.items():
+        status, rif_attrs = rif_table.get(f'SAI_OBJECT_TYPE_ROUTER_INTERFACE:{vnet_rif_oid}')
+        vrf_oid = dict(rif_attrs).get('SAI_ROUTER_INTERFACE_ATTR_VIRTUAL_ROUTER_ID') if status else None
+        if vrf_oid:
+            rif_vrf_map[vnet_rif_name] = vrf_oid
 
     return rif_vrf_map
 
 
-def filter_out_vnet_ip2me_routes(vnet_routes):
+def filter_out_vnet_ip2me_routes(vnet_routes, vnet_intfs):
     ''' Filters out IP2ME routes from the provided dictionary with VNET routes
     Format: { <vnet_name>: { 'routes': [ <pfx/pfx_len> ], 'vrf_oid': <oid> } }
     '''
     db = swsscommon.DBConnector('APPL_DB', 0)
 
     all_rifs_db_keys = swsscommon.Table(db, 'INTF_TABLE').getKeys()
-    vnet_intfs = get_vnet_intfs()
 
-    vnet_intfs = [vnet_intfs[k] for k in vnet_intfs]
-    vnet_intfs = [val for sublist in vnet_intfs for val in sublist]
+    vnet_rifs = set(val for sublist in vnet_intfs.values() for val in sublist)
 
-    vnet_ip2me_routes = []
+    vnet_ip2me_routes = set()
     for rif in all_rifs_db_keys:
-        rif_attrs = rif.split(':')
         # Skip RIF entries without IP prefix and prefix length (they have only one attribute - RIF name)
-        if len(rif_attrs) == 1:
+        rif_name, _, rif_prefix = rif.partition(':')
+        if not rif_prefix:
             continue
 
-        # rif_attrs[0] - RIF name
-        # rif_attrs[1] - IP prefix and prefix legth
-        # IP2ME routes have '/32' prefix length so replace it and add to the list
-        if rif_attrs[0] in vnet_intfs:
-            rif_ip, _ = rif_attrs[1].split('/')
-            ip2me_route = rif_ip + '/32'
-            vnet_ip2me_routes.append(ip2me_route)
+        # IP2ME routes are host routes, so replace the prefix length and add to the set
+        if rif_name in vnet_rifs:
+            rif_ip = rif_prefix.split('/')[0]
+            vnet_ip2me_routes.add(rif_ip + ('/128' if ':' in rif_ip else '/32'))
 
-    for vnet, vnet_attrs in vnet_routes.items():
-        for route in vnet_attrs['routes']:
-            if route in vnet_ip2me_routes:
-                vnet_attrs['routes'].remove(route)
-
-        if not vnet_attrs['routes']:
+    for vnet in list(vnet_routes):
+        routes = [route for route in vnet_routes[vnet]['routes'] if route not in vnet_ip2me_routes]
+        if routes:
+            vnet_routes[vnet]['routes'] = routes
+        else:
             vnet_routes.pop(vnet)
 
 
-def get_vnet_routes_from_app_db():
+def get_vnet_routes_from_app_db(vnet_intfs, vnet_vrfs, vnets=None):
     ''' Returns dictionary of VNET routes configured per each VNET in APP_DB.
+    Only the VNETs in vnets are returned if vnets is given.
     Format: { <vnet_name>: { 'routes': [ <pfx/pfx_len> ], 'vrf_oid': <oid> } }
     '''
     db = swsscommon.DBConnector('APPL_DB', 0)
 
-    vnet_intfs = get_vnet_intfs()
-    vnet_vrfs = get_vrf_entries()
-
     vnet_route_table = swsscommon.Table(db, 'VNET_ROUTE_TABLE')
     vnet_route_tunnel_table = swsscommon.Table(db, 'VNET_ROUTE_TUNNEL_TABLE')
+    vnet_table = swsscommon.Table(db, 'VNET_TABLE')
 
     vnet_routes_db_keys = vnet_route_table.getKeys() + vnet_route_tunnel_table.getKeys()
 
     vnet_routes = {}
 
     for vnet_route_db_key in vnet_routes_db_keys:
-        vnet_route_list = vnet_route_db_key.split(':',1)
-        vnet_name = vnet_route_list[0]
-        vnet_route = vnet_route_list[1]
+        vnet_name, vnet_route = vnet_route_db_key.split(':', 1)
+
+        if vnets is not None and vnet_name not in vnets:
+            continue
 
         if vnet_name not in vnet_routes:
             vnet_routes[vnet_name] = {}
@@ -221,17 +237,13 @@ def get_vnet_routes_from_app_db():
 
             if vnet_name not in vnet_intfs:
                 # this route has no vnet_intf and may be part of default VRF.
-                vnet_table = swsscommon.Table(db, 'VNET_TABLE')
-                scope_value = ""
                 # "Vnet_v4_in_v4-0": [("vxlan_tunnel", "tunnel_v4"), ("scope", "default"), ("vni", "10000"), ("peer_list", "")]
-                for key,value in vnet_table.get(vnet_name)[1]:
-                    if key == "scope":
-                        scope_value = value
-                        break
-                if scope_value == 'default':
+                _, vnet_attrs = vnet_table.get(vnet_name)
+                if dict(vnet_attrs).get('scope') == 'default':
                     vnet_routes[vnet_name]['vrf_oid'] = default_vrf_oid
                 else:
-                    assert "Non-default VRF route present without vnet interface."
+                    print_message(syslog.LOG_WARNING, "Non-default VRF route present without vnet interface:", vnet_name)
+                    vnet_routes[vnet_name]['vrf_oid'] = 'None'
             else:
                 intf = vnet_intfs[vnet_name][0]
                 vnet_routes[vnet_name]['vrf_oid'] = vnet_vrfs.get(intf, 'None')
@@ -241,95 +253,73 @@ def get_vnet_routes_from_app_db():
     return vnet_routes
 
 
-def get_vnet_routes_from_asic_db():
+def get_vnet_routes_from_asic_db(vnet_intfs, vnet_vrfs, vnets=None):
     ''' Returns dictionary of VNET routes configured per each VNET in ASIC_DB.
+    Only the VNETs in vnets, and the default VRF, are returned if vnets is given.
     Format: { <vnet_name>: { 'routes': [ <pfx/pfx_len> ], 'vrf_oid': <oid> } }
     '''
     db = swsscommon.DBConnector('ASIC_DB', 0)
 
-    tbl = swsscommon.Table(db, 'ASIC_STATE')
-
-    vnet_vrfs = get_vrf_entries()
-    vnet_vrfs_oids = [vnet_vrfs[k] for k in vnet_vrfs]
-    vnet_vrfs_oids.append(default_vrf_oid) 
-
-    vnet_intfs = get_vnet_intfs()
+    # Only the route entries are read
+    tbl = swsscommon.Table(db, ASIC_ROUTE_ENTRY_TABLE)
 
     vrf_oid_to_vnet_map = {}
     vrf_oid_to_vnet_map[default_vrf_oid] = 'default_VRF'
 
     for vnet_name, vnet_rifs in vnet_intfs.items():
-        for vnet_rif, vrf_oid in vnet_vrfs.items():
-            if vnet_rif in vnet_rifs:
-                vrf_oid_to_vnet_map[vrf_oid] = vnet_name
-
-    routes_db_keys = tbl.getKeys()
+        if vnets is not None and vnet_name not in vnets:
+            continue
+        for vnet_rif in vnet_rifs:
+            if vnet_rif in vnet_vrfs:
+                vrf_oid_to_vnet_map[vnet_vrfs[vnet_rif]] = vnet_name
 
     vnet_routes = {}
 
-    for route_db_key in routes_db_keys:
+    for route_db_key in tbl.getKeys():
+        # {"dest":"<pfx/pfx_len>","switch_id":"<oid>","vr":"<oid>"}
         route_attrs = route_db_key.lower().split('\"', -1)
 
-        if 'sai_object_type_route_entry' not in route_attrs[0]:
-            continue
-
         # route_attrs[11] - VRF OID for the VNET route
         # route_attrs[3] - VNET route IP subnet
-        vrf_oid = route_attrs[11]
-        ip_addr = route_attrs[3]
+        vnet_name = vrf_oid_to_vnet_map.get(route_attrs[11]) if len(route_attrs) > 11 else None
+        if vnet_name is None:
+            continue
 
-        if vrf_oid in vnet_vrfs_oids:
-            vnet_name = vrf_oid_to_vnet_map[vrf_oid]
-            if vrf_oid_to_vnet_map[vrf_oid] not in vnet_routes:
-                vnet_routes[vnet_name] = {}
-                vnet_routes[vnet_name]['routes'] = []
-                vnet_routes[vnet_name]['vrf_oid'] = vrf_oid
+        if vnet_name not in vnet_routes:
+            vnet_routes[vnet_name] = {}
+            vnet_routes[vnet_name]['routes'] = []
+            vnet_routes[vnet_name]['vrf_oid'] = route_attrs[11]
 
-            vnet_routes[vnet_name]['routes'].append(ip_addr)
+        vnet_routes[vnet_name]['routes'].append(route_attrs[3])
 
-    filter_out_vnet_ip2me_routes(vnet_routes)
+    filter_out_vnet_ip2me_routes(vnet_routes, vnet_intfs)
 
     return vnet_routes
 
 
-def check_routes_with_default_vrf(vnet_name, vnet_attrs, routes_1, routes):
-    for vnet_route in vnet_attrs['routes']:
-        ispresent = False
-        for vnet_name_other, vnet_attrs_other in routes_1.items():
-            if vnet_route in vnet_attrs_other['routes']:
-                ispresent = True
-        if not ispresent:
-            if vnet_name not in routes:
-                routes[vnet_name] = {}
-                routes[vnet_name]['routes'] = []
-            routes[vnet_name]['routes'].append(vnet_route)
-
-    return
-
-
 def get_vnet_routes_diff(routes_1, routes_2, verify_default_vrf_routes = False):
     ''' Returns all routes present in routes_2 dictionary but missed in routes_1
+    The routes of the default VRF are looked up in all the VNETs of routes_1.
     Format: { <vnet_name>: { 'routes': [ <pfx/pfx_len> ] } }
     '''
 
     routes = {}
+    all_routes_1 = None
 
     for vnet_name, vnet_attrs in routes_2.items():
         if vnet_attrs['vrf_oid'] == default_vrf_oid:
-            if verify_default_vrf_routes:
-                check_routes_with_default_vrf(vnet_name, vnet_attrs, routes_1, routes)
-            else:
+            if not verify_default_vrf_routes:
                 continue
+            if all_routes_1 is None:
+                all_routes_1 = set(route for attrs in routes_1.values() for route in attrs['routes'])
+            present_routes = all_routes_1
         else:
-            if vnet_name not in routes_1:
-                routes[vnet_name] =  vnet_attrs['routes'].copy()
-            else:
-                for vnet_route in vnet_attrs['routes']:
-                    if vnet_route not in routes_1[vnet_name]['routes']:
-                        if vnet_name not in routes:
-                            routes[vnet_name] = {}
-                            routes[vnet_name]['routes'] = []
-                        routes[vnet_name]['routes'].append(vnet_route)
+            present_routes = set(routes_1[vnet_name]['routes']) if vnet_name in routes_1 else set()
+
+        missed_routes = [vnet_route for vnet_route in vnet_attrs['routes'] if vnet_route not in present_routes]
+        if missed_routes:
+            routes[vnet_name] = {}
+            routes[vnet_name]['routes'] = missed_routes
 
     return routes
 
@@ -357,6 +347,15 @@ def get_sdk_vnet_routes_diff(routes):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Verify VNET routes between APPL-DB, ASIC-DB and SDK are in sync")
+    parser.add_argument('-m', '--mode', choices=list(LOG_LEVELS), default='ERR',
+                        help="Report level, INFO reports the time spent in each phase")
+    parser.add_argument('-v', '--vnet', action='append',
+                        help="Only check the routes of this VNET, can be repeated")
+    args = parser.parse_args()
+
+    set_level(LOG_LEVELS[args.mode], write_to_syslog)
+    vnets = set(args.vnet) if args.vnet else None
 
     rc = RC_OK
 
@@ -365,16 +364,27 @@ def main():
         return rc
     asic_db = swsscommon.DBConnector('ASIC_DB', 0)
     virtual_router = swsscommon.Table(asic_db, 'ASIC_STATE:SAI_OBJECT_TYPE_VIRTUAL_ROUTER')
-    if virtual_router.getKeys() != []:
+    virtual_router_keys = virtual_router.getKeys()
+    if virtual_router_keys != []:
         global default_vrf_oid
-        default_vrf_oid = virtual_router.getKeys()[0]
+        default_vrf_oid = virtual_router_keys[0]
+
+    timer = PhaseTimer()
+    vnet_intfs = get_vnet_intfs()
+    vnet_vrfs = get_vrf_entries(vnet_intfs)
+    timer.mark("vnet_intfs")
 
-    app_db_vnet_routes = get_vnet_routes_from_app_db()
-    asic_db_vnet_routes = get_vnet_routes_from_asic_db()
+    app_db_vnet_routes = get_vnet_routes_from_app_db(vnet_intfs, vnet_vrfs, vnets)
+    timer.mark("app_db")
+    asic_db_vnet_routes = get_vnet_routes_from_asic_db(vnet_intfs, vnet_vrfs, vnets)
+    timer.mark("asic_db")
 
     missed_in_asic_db_routes = get_vnet_routes_diff(asic_db_vnet_routes, app_db_vnet_routes,True)
     missed_in_app_db_routes = get_vnet_routes_diff(app_db_vnet_routes, asic_db_vnet_routes)
+    timer.mark("diff")
     missed_in_sdk_routes = get_sdk_vnet_routes_diff(asic_db_vnet_routes)
+    timer.mark("sdk")
+    timer.report()
 
     res = {}
     res['results'] = {}
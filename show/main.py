@@ -14,6 +14,7 @@ from natsort import natsorted
 from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
 from tabulate import tabulate
+from utilities_common import script_runner
 from utilities_common import util_base
 from utilities_common.db import Db
 from datetime import datetime
@@ -114,6 +115,18 @@ def run_command(command, display_cmd=False, return_cmd=False):
         clicommon.run_command_in_alias_mode(command)
         raise sys.exit(0)
 
+    result = script_runner.run_command(command)
+    if result is not None:
+        output, rc = result
+        if return_cmd:
+            return output
+        # the lines of the output as they are echoed when read from a process
+        if output:
+            click.echo(output[:-1] if output.endswith('\n') else output)
+        if rc != 0:
+            sys.exit(rc)
+        return
+
     proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
 
     while True:
@@ -0,0 +1,120 @@
+"""
+Benchmark of the acl-loader rule loading, the fast openconfig ACL parser against pyangbind.
+
+Run from the repository root:
+    python -m tests.acl_loader_benchmark [--rules 20000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+sys.path.insert(0, modules_path)
+
+
+def generate_acl(num_rules):
+    """
+    Generate an ACL file content with num_rules rules, spread over the L3 table
+    DATAACL and the L3V6 table DATAACL_2 of the mock config DB
+    :param num_rules: number of rules
+    :return: dict in openconfig ACL JSON format
+    """
+    v4_entries = {}
+    v6_entries = {}
+    for i in range(num_rules):
+        seq = i // 2 + 1
+        if i % 2 == 0:
+            ip_config = {
+                "protocol": ["IP_TCP", "IP_UDP", "17"][seq % 3],
+                "source-ip-address": "10.{}.{}.0/24".format(seq // 256 % 256, seq % 256),
+                "destination-ip-address": "20.0.{}.{}/32".format(seq // 256 % 256, seq % 256),
+            }
+            entry = {
+                "config": {"sequence-id": seq},
+                "actions": {"config": {"forwarding-action": "ACCEPT"}},
+                "ip": {"config": ip_config},
+                "transport": {"config": {
+                    "source-port": "{}..{}".format(1024 + seq % 1000, 2048 + seq % 1000),
+                    "destination-port": str(seq % 65535 + 1),
+                }},
+            }
+            if ip_config["protocol"] == "IP_TCP":
+                entry["transport"]["config"]["tcp-flags"] = ["TCP_SYN", "TCP_ACK"]
+            if seq % 5 == 0:
+                entry["l2"] = {"config": {"vlan-id": str(seq % 4094 + 1)}}
+            v4_entries[str(seq)] = entry
+        else:
+            entry = {
+                "config": {"sequence-id": seq},
+                "actions": {"config": {"forwarding-action": "ACCEPT"}},
+                "ip": {"config": {
+                    "protocol": "IP_ICMP",
+                    "source-ip-address": "2001:db8:{:x}::/64".format(seq),
+                    "destination-ip-address": "2001:db8::{:x}/128".format(seq),
+                }},
+                "icmp": {"config": {"type": str(seq % 256), "code": "0"}},
+            }
+            v6_entries[str(seq)] = entry
+
+    return {
+        "acl": {
+            "acl-sets": {
+                "acl-set": {
+                    "DATAACL": {"acl-entries": {"acl-entry": v4_entries}},
+                    "DATAACL_2": {"acl-entries": {"acl-entry": v6_entries}},
+                }
+            }
+        }
+    }
+
+
+def load_rules(acl_loader, filename, fast):
+    acl_loader.rules_info = {}
+    if fast:
+        acl_loader.load_rules_from_file(filename)
+    else:
+        with mock.patch("acl_loader.openconfig_json.parse", return_value=None):
+            acl_loader.load_rules_from_file(filename)
+    return acl_loader.rules_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark acl-loader rule loading")
+    parser.add_argument("--rules", type=int, default=20000, help="number of generated rules")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs, the best one is reported")
+    args = parser.parse_args()
+
+    from .mock_tables import dbconnector
+    from acl_loader.main import AclLoader
+
+    acl_loader = AclLoader()
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(generate_acl(args.rules), f)
+    try:
+        results = {}
+        for fast in (True, False):
+            times = []
+            for _ in range(args.repeat):
+                start = time.time()
+                rules_info = load_rules(acl_loader, f.name, fast)
+                times.append(time.time() - start)
+            results[fast] = (min(times), rules_info)
+    finally:
+        os.unlink(f.name)
+
+    fast_time, fast_rules = results[True]
+    pyangbind_time, pyangbind_rules = results[False]
+    print("rules: {}".format(len(fast_rules)))
+    print("pyangbind: {:.3f}s".format(pyangbind_time))
+    print("fast parser: {:.3f}s ({:.1f}x)".format(fast_time, pyangbind_time / fast_time))
+    print("same rules: {}".format(fast_rules == pyangbind_rules))
+
+
+if __name__ == "__main__":
+    main()
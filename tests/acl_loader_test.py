@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import pytest
 from unittest import mock
 
@@ -8,7 +9,9 @@ modules_path = os.path.dirname(test_path)
 sys.path.insert(0, modules_path)
 
 from acl_loader import *
+from acl_loader import openconfig_json
 from acl_loader.main import *
+from .acl_loader_benchmark import generate_acl, load_rules
 
 class TestAclLoader(object):
     @pytest.fixture(scope="class")
@@ -27,6 +30,29 @@ class TestAclLoader(object):
         with pytest.raises(AclLoaderException):
             yang_acl = AclLoader.parse_acl_json(os.path.join(test_path, 'acl_input/acl2.json'))
 
+    def test_fast_parser(self):
+        for filename in ['acl1.json', 'acl_egress.json', 'empty_acl.json', 'incremental_1.json']:
+            with open(os.path.join(test_path, 'acl_input', filename)) as f:
+                assert openconfig_json.parse(json.load(f)) is not None
+
+        # left to pyangbind to report the errors
+        for filename in ['acl2.json', 'illegal_vlan_0.json', 'illegal_vlan_nan.json', 'illegal_icmp_type_300.json']:
+            with open(os.path.join(test_path, 'acl_input', filename)) as f:
+                assert openconfig_json.parse(json.load(f)) is None
+
+        assert set(openconfig_json.ETHERTYPES) == set(AclLoader.ethertype_map)
+        assert set(openconfig_json.IP_PROTOCOLS) == set(AclLoader.ip_protocol_map)
+
+    def test_fast_parser_same_rules(self, acl_loader, tmp_path):
+        filename = str(tmp_path / 'acl.json')
+        with open(filename, 'w') as f:
+            json.dump(generate_acl(200), f)
+
+        for acl_file in [filename, os.path.join(test_path, 'acl_input/acl1.json')]:
+            rules_info = load_rules(acl_loader, acl_file, True)
+            assert rules_info
+            assert rules_info == load_rules(acl_loader, acl_file, False)
+
     def test_validate_mirror_action(self, acl_loader):
         ingress_mirror_rule_props = {
             "MIRROR_INGRESS_ACTION": "everflow0"
@@ -217,3 +243,40 @@ class TestAclLoader(object):
         acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/incremental_2.json'))
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
+
+    def test_dataplane_incremental_update(self, acl_loader):
+        acl_loader.current_table = None
+        acl_loader.per_npu_configdb = None
+        acl_loader.rules_db_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.1/32'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.2/32'},
+            ('DATAACL', 'RULE_3'): {'PRIORITY': '9997', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.3/32'},
+        }
+        acl_loader.rules_info = {
+            ('DATAACL', 'RULE_1'): {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.1/32'},
+            ('DATAACL', 'RULE_2'): {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'},
+            ('DATAACL', 'RULE_4'): {'PRIORITY': '9996', 'PACKET_ACTION': 'DROP'},
+        }
+
+        acl_loader.set_dataplane_incremental(True)
+        with mock.patch('utilities_common.bulk_db.run_transactions') as mock_run_transactions:
+            acl_loader.incremental_update()
+        mock_run_transactions.assert_called_once_with(acl_loader.configdb, acl_loader.configdb.CONFIG_DB, [
+            [('delete', ('ACL_RULE|DATAACL|RULE_3',))],
+            [('hset', ('ACL_RULE|DATAACL|RULE_2',), {'mapping': {'PACKET_ACTION': 'DROP'}}),
+             ('hdel', ('ACL_RULE|DATAACL|RULE_2', 'SRC_IP'))],
+            [('hset', ('ACL_RULE|DATAACL|RULE_4',), {'mapping': {'PRIORITY': '9996', 'PACKET_ACTION': 'DROP'}})],
+        ])
+
+        acl_loader.set_dataplane_incremental(False)
+        with mock.patch('utilities_common.bulk_db.run_transactions') as mock_run_transactions:
+            acl_loader.full_update()
+        transactions = mock_run_transactions.call_args[0][2]
+        assert transactions[0] == [('delete', ('ACL_RULE|DATAACL|RULE_3',))]
+        # the kept rules are removed and written again in one transaction each
+        assert transactions[1] == [
+            ('delete', ('ACL_RULE|DATAACL|RULE_1',)),
+            ('hset', ('ACL_RULE|DATAACL|RULE_1',),
+             {'mapping': {'PRIORITY': '9999', 'PACKET_ACTION': 'FORWARD', 'SRC_IP': '10.0.0.1/32'}}),
+        ]
+        assert [len(transaction) for transaction in transactions] == [1, 2, 2, 1]
@@ -0,0 +1,166 @@
+import threading
+
+from utilities_common import bulk_db
+
+from .mock_redis_client import MockConnector, MockRedisClient, MockPipelineRedisClient, MockScanRedisClient
+
+
+class TestBulkDb(object):
+    data = {
+        'COUNTERS:oid:1': {'SAI_PORT_STAT_IF_IN_ERRORS': '1'},
+        'COUNTERS:oid:2': {'SAI_PORT_STAT_IF_IN_ERRORS': '2'},
+        'COUNTERS:oid:3': {'SAI_PORT_STAT_IF_IN_ERRORS': '3'},
+    }
+    keys = ['COUNTERS:oid:3', 'COUNTERS:oid:missing', 'COUNTERS:oid:1', 'COUNTERS:oid:2']
+    expected = [{'SAI_PORT_STAT_IF_IN_ERRORS': '3'}, {},
+                {'SAI_PORT_STAT_IF_IN_ERRORS': '1'}, {'SAI_PORT_STAT_IF_IN_ERRORS': '2'}]
+
+    def test_hgetall_bulk_pipelined(self):
+        client = MockPipelineRedisClient(self.data)
+        result = bulk_db.hgetall_bulk(MockConnector(client), MockConnector.COUNTERS_DB, self.keys)
+        assert result == self.expected
+        assert client.round_trips == 1
+
+    def test_hgetall_bulk_batches(self):
+        client = MockPipelineRedisClient(self.data)
+        result = bulk_db.hgetall_bulk(MockConnector(client), MockConnector.COUNTERS_DB, self.keys, batch_size=3)
+        assert result == self.expected
+        assert client.round_trips == 2
+
+    def test_hgetall_bulk_without_pipeline(self, monkeypatch):
+        client = MockRedisClient(self.data)
+        monkeypatch.setattr(bulk_db, 'get_pipeline_client', lambda db, db_name: None)
+        result = bulk_db.hgetall_bulk(MockConnector(client), MockConnector.COUNTERS_DB, self.keys)
+        assert result == self.expected
+        assert client.round_trips == len(self.keys)
+
+    def test_hgetall_bulk_no_keys(self):
+        client = MockPipelineRedisClient(self.data)
+        assert bulk_db.hgetall_bulk(MockConnector(client), MockConnector.COUNTERS_DB, []) == []
+        assert client.round_trips == 0
+
+    def test_hget_bulk(self):
+        client = MockPipelineRedisClient(self.data)
+        result = bulk_db.hget_bulk(MockConnector(client), MockConnector.COUNTERS_DB, self.keys, 'SAI_PORT_STAT_IF_IN_ERRORS')
+        assert result == ['3', None, '1', '2']
+        assert client.round_trips == 1
+
+    def test_hget_bulk_without_pipeline(self, monkeypatch):
+        client = MockRedisClient(self.data)
+        monkeypatch.setattr(bulk_db, 'get_pipeline_client', lambda db, db_name: None)
+        result = bulk_db.hget_bulk(MockConnector(client), MockConnector.COUNTERS_DB, self.keys, 'SAI_PORT_STAT_IF_IN_ERRORS')
+        assert result == ['3', None, '1', '2']
+        assert client.round_trips == len(self.keys)
+
+    def test_hmget(self):
+        client = MockPipelineRedisClient({'VIDTORID': {'oid:1': 'oid:0x1', 'oid:2': 'oid:0x2'}})
+        assert bulk_db.hmget(MockConnector(client), 'ASIC_DB', 'VIDTORID', ['oid:2', 'oid:3', 'oid:1'], batch_size=2) == \
+            ['oid:0x2', None, 'oid:0x1']
+        assert client.round_trips == 2
+        assert bulk_db.hmget(MockConnector(client), 'ASIC_DB', 'VIDTORID', []) == []
+        assert client.round_trips == 2
+
+    def test_run_commands(self):
+        client = MockPipelineRedisClient({'ACL_RULE|DATAACL|RULE_1': {'PRIORITY': '9999'}})
+        commands = [('delete', ('ACL_RULE|DATAACL|RULE_1',)),
+                    ('hset', ('ACL_RULE|DATAACL|RULE_2', 'PRIORITY', '9998')),
+                    ('hset', ('ACL_RULE|DATAACL|RULE_2', 'PACKET_ACTION', 'DROP'))]
+        assert bulk_db.run_commands(MockConnector(client), 'CONFIG_DB', commands, batch_size=2) == [1, 1, 1]
+        assert client.data == {'ACL_RULE|DATAACL|RULE_2': {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'}}
+        assert client.round_trips == 2
+        assert bulk_db.run_commands(MockConnector(client), 'CONFIG_DB', []) == []
+        assert client.round_trips == 2
+
+    def test_run_transactions(self):
+        client = MockPipelineRedisClient({'ACL_RULE|DATAACL|RULE_1': {'PRIORITY': '9999'},
+                                          'ACL_RULE|DATAACL|RULE_2': {'PRIORITY': '9998', 'SRC_IP': '10.0.0.2/32'}})
+        transactions = [[('delete', ('ACL_RULE|DATAACL|RULE_1',))],
+                        [('hset', ('ACL_RULE|DATAACL|RULE_2',), {'mapping': {'PACKET_ACTION': 'DROP'}}),
+                         ('hdel', ('ACL_RULE|DATAACL|RULE_2', 'SRC_IP'))],
+                        [('hset', ('ACL_RULE|DATAACL|RULE_3',), {'mapping': {'PRIORITY': '9997'}})],
+                        [('hset', ('ACL_RULE|DATAACL|RULE_4',), {'mapping': {'PRIORITY': '9996'}})]]
+        assert bulk_db.run_transactions(MockConnector(client), 'CONFIG_DB', transactions, batch_size=3) == \
+            [[1], [1, 1], [1], [1]]
+        assert client.data == {'ACL_RULE|DATAACL|RULE_2': {'PRIORITY': '9998', 'PACKET_ACTION': 'DROP'},
+                               'ACL_RULE|DATAACL|RULE_3': {'PRIORITY': '9997'},
+                               'ACL_RULE|DATAACL|RULE_4': {'PRIORITY': '9996'}}
+        # a transaction is never split over two MULTI/EXEC blocks
+        assert client.transactions == [
+            [('delete', ('ACL_RULE|DATAACL|RULE_1',)),
+             ('hset', ('ACL_RULE|DATAACL|RULE_2',)),
+             ('hdel', ('ACL_RULE|DATAACL|RULE_2', 'SRC_IP'))],
+            [('hset', ('ACL_RULE|DATAACL|RULE_3',)),
+             ('hset', ('ACL_RULE|DATAACL|RULE_4',))],
+        ]
+        assert client.round_trips == 2
+        assert bulk_db.run_transactions(MockConnector(client), 'CONFIG_DB', []) == []
+        assert client.round_trips == 2
+
+    def test_run_transactions_rewrite(self):
+        keys = ['ACL_RULE|DATAACL|RULE_{}'.format(i) for i in range(2500)]
+        client = MockPipelineRedisClient({key: {'PRIORITY': '1'} for key in keys})
+        transactions = [[('delete', (key,)), ('hset', (key,), {'mapping': {'PRIORITY': '2'}})] for key in keys]
+        bulk_db.run_transactions(MockConnector(client), 'CONFIG_DB', transactions)
+        assert client.data == {key: {'PRIORITY': '2'} for key in keys}
+        # 500 rules of 2 commands per MULTI/EXEC block of 1000 commands
+        assert client.round_trips == 5
+        assert [len(transaction) for transaction in client.transactions] == [1000] * 5
+
+    def test_run_commands_without_pipeline(self, monkeypatch):
+        client = MockRedisClient({'ACL_RULE|DATAACL|RULE_1': {'PRIORITY': '9999'}})
+        monkeypatch.setattr(bulk_db, 'get_pipeline_client', lambda db, db_name: None)
+        commands = [('delete', ('ACL_RULE|DATAACL|RULE_1',)),
+                    ('hset', ('ACL_RULE|DATAACL|RULE_2', 'PRIORITY', '9998'))]
+        assert bulk_db.run_commands(MockConnector(client), 'CONFIG_DB', commands) == [1, 1]
+        assert client.data == {'ACL_RULE|DATAACL|RULE_2': {'PRIORITY': '9998'}}
+        assert client.round_trips == 2
+
+    def test_run_for_namespaces_keeps_order(self):
+        ns_list = ['asic{}'.format(i) for i in range(10)]
+        assert bulk_db.run_for_namespaces(lambda ns: ns.upper(), ns_list) == [ns.upper() for ns in ns_list]
+        assert bulk_db.run_for_namespaces(lambda ns: ns, ['']) == ['']
+
+    def test_iter_for_namespaces_yields_when_done(self):
+        asic0_received = threading.Event()
+
+        def func(ns):
+            if ns == 'asic1':
+                # asic1 is done only once asic0 was yielded, the wait is bounded to fail instead of blocking
+                return 'asic1' if asic0_received.wait(5) else 'asic0 not yielded before asic1 was done'
+            return ns
+
+        results = []
+        for result in bulk_db.iter_for_namespaces(func, ['asic0', 'asic1']):
+            results.append(result)
+            asic0_received.set()
+        assert results == ['asic0', 'asic1']
+
+    def test_scan_keys(self):
+        client = MockScanRedisClient(self.data, forbidden=('keys',))
+        assert sorted(bulk_db.scan_keys(MockConnector(client), MockConnector.COUNTERS_DB, 'COUNTERS:oid:[12]')) == \
+            ['COUNTERS:oid:1', 'COUNTERS:oid:2']
+        assert client.scans == 1
+
+    def test_scan_keys_without_scan(self):
+        client = MockPipelineRedisClient(self.data)
+        assert sorted(bulk_db.scan_keys(MockConnector(client), MockConnector.COUNTERS_DB, 'COUNTERS:*')) == sorted(self.data)
+
+    def test_cached_db(self):
+        client = MockPipelineRedisClient(self.data)
+        db = bulk_db.CachedDb(MockConnector(client))
+        db.prefetch(db.COUNTERS_DB, self.keys[:2])
+        assert client.round_trips == 1
+
+        assert db.get(db.COUNTERS_DB, 'COUNTERS:oid:3', 'SAI_PORT_STAT_IF_IN_ERRORS') == '3'
+        assert db.get_all(db.COUNTERS_DB, 'COUNTERS:oid:3') == self.expected[0]
+        assert db.get(db.COUNTERS_DB, 'COUNTERS:oid:missing', 'SAI_PORT_STAT_IF_IN_ERRORS') is None
+        assert db.get_all(db.COUNTERS_DB, 'COUNTERS:oid:missing') == {}
+        assert client.round_trips == 1
+
+        # keys not prefetched are read from the connector
+        assert db.get(db.COUNTERS_DB, 'COUNTERS:oid:1', 'SAI_PORT_STAT_IF_IN_ERRORS') == '1'
+        assert client.round_trips == 2
+
+        # prefetched keys are not read again
+        db.prefetch(db.COUNTERS_DB, self.keys[:2])
+        assert client.round_trips == 2
@@ -0,0 +1,104 @@
+import json
+import os
+from collections import OrderedDict
+
+from natsort import natsorted
+
+from utilities_common import config_db_file
+
+from .mock_redis_client import MockConnector, MockPipelineRedisClient
+
+CONFIG = {
+    'PORT': {
+        'Ethernet10': {'mtu': '9100', 'admin_status': 'up'},
+        'Ethernet2': {'mtu': '9100', 'admin_status': 'down'},
+    },
+    'ACL_TABLE': {
+        'DATAACL': {'type': 'L3', 'ports': ['Ethernet2', 'Ethernet10'], 'policy_desc': 'DATAACL'},
+    },
+    'VLAN_MEMBER': {
+        'Vlan1000|Ethernet10': {'tagging_mode': 'untagged'},
+        'Vlan1000|Ethernet2': {'tagging_mode': 'untagged'},
+    },
+}
+
+
+# sorting of the file by the former 'config save'
+def sort_dict(data):
+    for table in data:
+        if type(data[table]) is dict:
+            data[table] = OrderedDict(natsorted(data[table].items()))
+    return OrderedDict(natsorted(data.items()))
+
+
+class TestConfigDbFile(object):
+    def test_read_config_entries(self):
+        data = {
+            'PORT|Ethernet0': {'mtu': '9100'},
+            'ACL_TABLE|DATAACL': {'ports@': 'Ethernet0,Ethernet4'},
+            'VLAN_MEMBER|Vlan1000|Ethernet0': {'NULL': 'NULL'},
+            'CONFIG_DB_INITIALIZED': {'1': '1'},
+        }
+
+        assert config_db_file.read_config_entries(MockConnector(MockPipelineRedisClient(data)), list(data)) == {
+            'PORT': {'Ethernet0': {'mtu': '9100'}},
+            'ACL_TABLE': {'DATAACL': {'ports': ['Ethernet0', 'Ethernet4']}},
+            'VLAN_MEMBER': {'Vlan1000|Ethernet0': {}},
+        }
+
+    def test_config_to_entries(self):
+        config_db = MockConnector(MockPipelineRedisClient({}))
+        entries = config_db_file.config_to_entries(config_db, CONFIG)
+
+        assert entries['ACL_TABLE|DATAACL'] == {'type': 'L3', 'ports@': 'Ethernet2,Ethernet10', 'policy_desc': 'DATAACL'}
+        assert entries['VLAN_MEMBER|Vlan1000|Ethernet2'] == {'tagging_mode': 'untagged'}
+        assert len(entries) == 5
+        assert config_db_file.entries_to_config(config_db, entries) == CONFIG
+
+    def test_dump_config(self):
+        # same output as 'sonic-cfggen -d --print-data' sorted again by 'config save'
+        expected = json.dumps(sort_dict(json.loads(json.dumps(CONFIG, sort_keys=True))), indent=4)
+
+        assert config_db_file.dump_config(CONFIG) == expected
+
+    def test_write_file_atomic(self, tmp_path):
+        filename = str(tmp_path / 'config_db.json')
+        with open(filename, 'w') as f:
+            f.write('{}')
+        os.chmod(filename, 0o640)
+
+        assert config_db_file.write_file_atomic(filename, '{"PORT": {}}')
+        with open(filename) as f:
+            assert f.read() == '{"PORT": {}}'
+        assert os.stat(filename).st_mode & 0o777 == 0o640
+        assert os.listdir(str(tmp_path)) == ['config_db.json']
+
+    def test_write_file_atomic_unchanged(self, tmp_path):
+        filename = str(tmp_path / 'config_db.json')
+        assert config_db_file.write_file_atomic(filename, '{}')
+        inode = os.stat(filename).st_ino
+
+        assert not config_db_file.write_file_atomic(filename, '{}')
+        assert os.stat(filename).st_ino == inode
+
+    def test_write_file_atomic_symlink(self, tmp_path):
+        filename = str(tmp_path / 'config_db.json')
+        link = str(tmp_path / 'link.json')
+        os.symlink(filename, link)
+
+        assert config_db_file.write_file_atomic(link, '{}')
+        assert os.path.islink(link)
+        with open(filename) as f:
+            assert f.read() == '{}'
+
+    def test_save_config(self, tmp_path, monkeypatch):
+        configs = {None: CONFIG, 'asic0': {'PORT': {}}}
+        monkeypatch.setattr(config_db_file, 'get_config', lambda namespace: configs[namespace])
+        host_file = str(tmp_path / 'config_db.json')
+        asic_file = str(tmp_path / 'config_db0.json')
+        with open(asic_file, 'w') as f:
+            f.write(config_db_file.dump_config(configs['asic0']))
+
+        assert config_db_file.save_config([(None, host_file), ('asic0', asic_file)]) == [host_file]
+        with open(host_file) as f:
+            assert json.load(f) == CONFIG
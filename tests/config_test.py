@@ -118,6 +118,17 @@ reload_config_with_untriggered_timer_output="""\
 Relevant services are not up. Retry later or use -f to avoid system checks
 """
 
+def mock_systemctl_show(command, unit_properties):
+    """Output of 'systemctl show <units> --property=<properties>', one block per unit"""
+    args = command.split()[2:]
+    units = [arg for arg in args if not arg.startswith('--')]
+    properties = [arg.split('=', 1)[1].split(',') for arg in args if arg.startswith('--property=')][0]
+    blocks = []
+    for unit in units:
+        values = dict(unit_properties.get(unit, {}), Id=unit)
+        blocks.append('\n'.join('{}={}'.format(prop, values[prop]) for prop in properties if prop in values))
+    return '\n\n'.join(blocks) + '\n'
+
 def mock_run_command_side_effect(*args, **kwargs):
     command = args[0]
 
@@ -147,10 +158,9 @@ def mock_run_command_side_effect_disabled_timer(*args, **kwargs):
             return 'swss', 0
         elif command == "systemctl is-enabled snmp.timer":
             return 'masked', 0
-        elif command == "systemctl show swss.service --property ActiveState --value":
-            return 'active', 0
-        elif command == "systemctl show swss.service --property ActiveEnterTimestampMonotonic --value":
-            return '0', 0
+        elif command.startswith("systemctl show "):
+            return mock_systemctl_show(command, {'swss.service': {'ActiveState': 'active',
+                                                                  'ActiveEnterTimestampMonotonic': '0'}}), 0
         else:
             return '', 0
 
@@ -167,8 +177,8 @@ def mock_run_command_side_effect_untriggered_timer(*args, **kwargs):
             return 'swss', 0
         elif command == "systemctl is-enabled snmp.timer":
             return 'enabled', 0
-        elif command == "systemctl show snmp.timer --property=LastTriggerUSecMonotonic --value":
-            return '0', 0
+        elif command.startswith("systemctl show "):
+            return mock_systemctl_show(command, {'snmp.timer': {'LastTriggerUSecMonotonic': '0'}}), 0
         else:
             return '', 0
 
@@ -272,6 +282,76 @@ class TestConfigReload(object):
         dbconnector.load_namespace_config()
 
 
+class TestConfigSave(object):
+    @classmethod
+    def setup_class(cls):
+        print("SETUP")
+        import config.main
+        importlib.reload(config.main)
+
+    def test_config_save(self, get_cmd_module, setup_single_broadcom_asic, tmp_path):
+        (config, show) = get_cmd_module
+        cfg_file = str(tmp_path / "config_db.json")
+        running_config = {
+            'PORT': {
+                'Ethernet10': {'mtu': '9100', 'admin_status': 'up'},
+                'Ethernet2': {'mtu': '9100', 'admin_status': 'down'},
+            },
+            'ACL_TABLE': {
+                'DATAACL': {'type': 'L3', 'ports': ['Ethernet2', 'Ethernet10']},
+            },
+        }
+        expected_file = """\
+{
+    "ACL_TABLE": {
+        "DATAACL": {
+            "ports": [
+                "Ethernet2",
+                "Ethernet10"
+            ],
+            "type": "L3"
+        }
+    },
+    "PORT": {
+        "Ethernet2": {
+            "admin_status": "down",
+            "mtu": "9100"
+        },
+        "Ethernet10": {
+            "admin_status": "up",
+            "mtu": "9100"
+        }
+    }
+}"""
+
+        runner = CliRunner()
+        with mock.patch("utilities_common.config_db_file.get_config",
+                        mock.MagicMock(return_value=running_config)) as mock_get_config:
+            result = runner.invoke(config.config.commands["save"], ["-y", cfg_file])
+
+            print(result.exit_code)
+            print(result.output)
+            traceback.print_tb(result.exc_info[2])
+
+            assert result.exit_code == 0
+            assert result.output == "Saved host config to {}\n".format(cfg_file)
+            mock_get_config.assert_called_once_with(None)
+            with open(cfg_file) as f:
+                assert f.read() == expected_file
+
+            # unchanged config, the file is not written again
+            mtime = os.stat(cfg_file).st_mtime_ns
+            result = runner.invoke(config.config.commands["save"], ["-y", cfg_file])
+
+            assert result.exit_code == 0
+            assert result.output == "{} is up to date\n".format(cfg_file)
+            assert os.stat(cfg_file).st_mtime_ns == mtime
+
+    @classmethod
+    def teardown_class(cls):
+        print("TEARDOWN")
+
+
 class TestLoadMinigraph(object):
     @classmethod
     def setup_class(cls):
@@ -291,10 +371,9 @@ class TestLoadMinigraph(object):
             assert result.exit_code == 0
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) == load_minigraph_command_output
             # Verify "systemctl reset-failed" is called for services under sonic.target
-            mock_run_command.assert_any_call('systemctl reset-failed swss')
-            # Verify "systemctl reset-failed" is called for services under sonic-delayed.target
-            mock_run_command.assert_any_call('systemctl reset-failed snmp')
-            assert mock_run_command.call_count == 11
+            # and for services under sonic-delayed.target with one command
+            mock_run_command.assert_any_call('systemctl reset-failed swss snmp')
+            assert mock_run_command.call_count == 10
 
     def test_load_minigraph_with_gnmi_timer(self, get_cmd_module, setup_single_broadcom_asic):
         with mock.patch("utilities_common.cli.run_command", mock.MagicMock(side_effect=mock_run_command_side_effect_gnmi)) as mock_run_command:
@@ -307,10 +386,9 @@ class TestLoadMinigraph(object):
             assert result.exit_code == 0
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) == load_minigraph_command_output
             # Verify "systemctl reset-failed" is called for services under sonic.target
-            mock_run_command.assert_any_call('systemctl reset-failed swss')
-            # Verify "systemctl reset-failed" is called for services under sonic-delayed.target
-            mock_run_command.assert_any_call('systemctl reset-failed gnmi')
-            assert mock_run_command.call_count == 11
+            # and for services under sonic-delayed.target with one command
+            mock_run_command.assert_any_call('systemctl reset-failed swss gnmi')
+            assert mock_run_command.call_count == 10
 
     def test_load_minigraph_with_port_config_bad_format(self, get_cmd_module, setup_single_broadcom_asic):
         with mock.patch(
@@ -549,6 +627,37 @@ class TestReloadConfig(object):
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) \
                 == RELOAD_MASIC_CONFIG_DB_OUTPUT
 
+    def test_reload_config_masic_namespace_failure(self, get_cmd_module, setup_multi_broadcom_masic):
+        def run_command_side_effect(command, **kwargs):
+            if '-n asic0' in command:
+                return 'asic0 error', 3
+            if '-n asic1' in command and '--write-to-db' in command:
+                return 'asic1 error', 4
+            return mock_run_command_side_effect(command, **kwargs)
+
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=run_command_side_effect)
+        ) as mock_run_command:
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+            cfg_files = "{},{},{}".format(
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file)
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [cfg_files, '-y', '-f', '-n'])
+
+            print(result.exit_code)
+            print(result.output)
+            # the other namespaces are loaded before exiting with the code of the first failure
+            assert result.exit_code == 3
+            assert "-n asic1  --write-to-db" in result.output
+            assert "Failed to reload asic0" in result.output
+            assert "Failed to reload asic1" in result.output
+            assert result.output.index("Failed to reload asic0") < result.output.index("Failed to reload asic1")
+
     def test_reload_yang_config(self, get_cmd_module,
                                         setup_single_broadcom_asic):
         with mock.patch(
@@ -889,7 +998,7 @@ class TestGenericUpdateCommands(unittest.TestCase):
         # Arrange
         expected_exit_code = 0
         expected_output = "Patch applied successfully"
-        expected_call_with_default_values = mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, False, ())
+        expected_call_with_default_values = mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, False, (), False)
         mock_generic_updater = mock.Mock()
         with mock.patch('config.main.GenericUpdater', return_value=mock_generic_updater):
             with mock.patch('builtins.open', mock.mock_open(read_data=self.any_patch_as_text)):
@@ -909,7 +1018,7 @@ class TestGenericUpdateCommands(unittest.TestCase):
         expected_output = "Patch applied successfully"
         expected_ignore_path_tuple = ('/ANY_TABLE', '/ANY_OTHER_TABLE/ANY_FIELD', '')
         expected_call_with_non_default_values = \
-            mock.call(self.any_patch, ConfigFormat.SONICYANG, True, True, True, expected_ignore_path_tuple)
+            mock.call(self.any_patch, ConfigFormat.SONICYANG, True, True, True, expected_ignore_path_tuple, True)
         mock_generic_updater = mock.Mock()
         with mock.patch('config.main.GenericUpdater', return_value=mock_generic_updater):
             with mock.patch('builtins.open', mock.mock_open(read_data=self.any_patch_as_text)):
@@ -923,6 +1032,7 @@ class TestGenericUpdateCommands(unittest.TestCase):
                                              "--ignore-path", "/ANY_TABLE",
                                              "--ignore-path", "/ANY_OTHER_TABLE/ANY_FIELD",
                                              "--ignore-path", "",
+                                             "--parallel",
                                              "--verbose"],
                                             catch_exceptions=False)
 
@@ -953,19 +1063,22 @@ class TestGenericUpdateCommands(unittest.TestCase):
     def test_apply_patch__optional_parameters_passed_correctly(self):
         self.validate_apply_patch_optional_parameter(
             ["--format", ConfigFormat.SONICYANG.name],
-            mock.call(self.any_patch, ConfigFormat.SONICYANG, False, False, False, ()))
+            mock.call(self.any_patch, ConfigFormat.SONICYANG, False, False, False, (), False))
         self.validate_apply_patch_optional_parameter(
             ["--verbose"],
-            mock.call(self.any_patch, ConfigFormat.CONFIGDB, True, False, False, ()))
+            mock.call(self.any_patch, ConfigFormat.CONFIGDB, True, False, False, (), False))
         self.validate_apply_patch_optional_parameter(
             ["--dry-run"],
-            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, True, False, ()))
+            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, True, False, (), False))
         self.validate_apply_patch_optional_parameter(
             ["--ignore-non-yang-tables"],
-            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, True, ()))
+            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, True, (), False))
         self.validate_apply_patch_optional_parameter(
             ["--ignore-path", "/ANY_TABLE"],
-            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, False, ("/ANY_TABLE",)))
+            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, False, ("/ANY_TABLE",), False))
+        self.validate_apply_patch_optional_parameter(
+            ["--parallel"],
+            mock.call(self.any_patch, ConfigFormat.CONFIGDB, False, False, False, (), True))
 
     def validate_apply_patch_optional_parameter(self, param_args, expected_call):
         # Arrange
@@ -0,0 +1,83 @@
+import _pickle as pickle
+import datetime
+import os
+from collections import OrderedDict, namedtuple
+
+from utilities_common.counters import (CounterFamily, RATES_TABLE_PREFIX, RATE_TYPECODE, SNAPSHOT_MAGIC,
+                                       load_snapshot, save_snapshot)
+from utilities_common.netstat import ns_diff, STATUS_NA
+
+from .mock_redis_client import MockConnector, MockPipelineRedisClient
+
+QStats = namedtuple("QStats", "packets, bytes")
+counter_names = ['SAI_QUEUE_STAT_PACKETS', 'SAI_QUEUE_STAT_BYTES']
+
+
+class TestCounterFamily(object):
+    data = {
+        'COUNTERS:oid:1': {'SAI_QUEUE_STAT_PACKETS': '10', 'SAI_QUEUE_STAT_BYTES': '1000'},
+        'COUNTERS:oid:2': {'SAI_QUEUE_STAT_PACKETS': '20'},
+        'RATES:oid:1': {'RX_BPS': '1.5', 'RX_PPS': '0.25'},
+    }
+
+    def test_load(self):
+        client = MockPipelineRedisClient(self.data)
+        family = CounterFamily.load(MockConnector(client), [('Ethernet0:0', 'oid:1'), ('Ethernet0:1', 'oid:2')], counter_names)
+        assert client.round_trips == 1
+        assert family.names == ['Ethernet0:0', 'Ethernet0:1']
+        assert family.values('Ethernet0:0') == [10, 1000]
+        assert family.values('Ethernet0:1') == [20, None]
+        assert family.get('Ethernet0:1', 'SAI_QUEUE_STAT_PACKETS') == 20
+        assert family.stats('Ethernet0:1', QStats) == QStats('20', STATUS_NA)
+        assert family.format('Ethernet0:0') == ['10', '1,000']
+
+    def test_load_rates(self):
+        client = MockPipelineRedisClient(self.data)
+        family = CounterFamily.load(MockConnector(client), [('Ethernet0', 'oid:1')], ['RX_BPS', 'RX_PPS', 'TX_BPS'],
+                                    RATES_TABLE_PREFIX, RATE_TYPECODE)
+        assert family.values('Ethernet0') == [1.5, 0.25, None]
+
+    def test_diff_matches_ns_diff(self):
+        new = OrderedDict([('time', None),
+                           ('q0', QStats('1500', '9000000')),
+                           ('q1', QStats(STATUS_NA, '5')),
+                           ('q2', QStats('3', '4')),
+                           ('q3', QStats('7', '8'))])
+        old = OrderedDict([('time', None),
+                           ('q0', QStats('500', '1')),
+                           ('q1', QStats('1', STATUS_NA)),
+                           ('q2', QStats('10', '4'))])
+        diff = CounterFamily.from_stats(new, QStats._fields).diff(CounterFamily.from_stats(old, QStats._fields))
+        for name in ('q0', 'q1', 'q2'):
+            assert diff.format(name) == [ns_diff(getattr(new[name], field), getattr(old[name], field))
+                                         for field in QStats._fields]
+        assert diff.format('q3') == ['7', '8']
+        assert 'time' not in diff
+
+
+class TestCounterSnapshot(object):
+    stats = OrderedDict([('time', datetime.datetime(2023, 5, 4, 3, 2, 1, 123456)),
+                         ('Ethernet0:0', QStats('10', '18446744073709551615')),
+                         ('Ethernet0:1', QStats(STATUS_NA, '7'))])
+
+    def test_roundtrip(self, tmp_path):
+        path = os.path.join(str(tmp_path), 'snapshot')
+        save_snapshot(path, self.stats, QStats._fields)
+        with open(path, 'rb') as f:
+            assert f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+        snapshot = load_snapshot(path, QStats)
+        assert str(snapshot.get('time')) == str(self.stats['time'])
+        assert snapshot.names == ['Ethernet0:0', 'Ethernet0:1']
+        assert 'Ethernet0:1' in snapshot and 'Ethernet0:2' not in snapshot
+        assert OrderedDict(snapshot.items()) == self.stats
+        assert snapshot.family.values('Ethernet0:1') == [None, 7]
+
+    def test_legacy_pickle(self, tmp_path):
+        path = os.path.join(str(tmp_path), 'snapshot')
+        with open(path, 'wb') as f:
+            pickle.dump(self.stats, f)
+
+        snapshot = load_snapshot(path, QStats)
+        assert snapshot.get('time') == self.stats['time']
+        assert OrderedDict(snapshot.items()) == self.stats
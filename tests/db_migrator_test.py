@@ -1,6 +1,8 @@
+import json
 import os
 import pytest
 import sys
+from unittest import mock
 
 from deepdiff import DeepDiff
 
@@ -518,3 +520,82 @@ class Test_Migrate_Loopback(object):
             expected_keys = expected_appl_db.get_all(expected_appl_db.APPL_DB, key)
             diff = DeepDiff(resulting_keys, expected_keys, ignore_order=True)
             assert not diff
+
+
+class TestConfigFileMigrator(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "2"
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "0"
+
+    def test_config_file_migration(self, tmp_path):
+        config = {
+            'DEVICE_METADATA': {'localhost': {'hwsku': 'vs', 'synchronous_mode': 'enable'}},
+            'VERSIONS': {'DATABASE': {'VERSION': 'version_3_0_0'}},
+            'PORT': {'Ethernet0': {'autoneg': '1', 'speed': '100000'}},
+            'PORTCHANNEL': {'PortChannel0001': {'admin_status': 'up', 'members': ['Ethernet0']}},
+        }
+        input_file = str(tmp_path / 'config_db.json')
+        output_file = str(tmp_path / 'migrated_config_db.json')
+        with open(input_file, 'w') as f:
+            json.dump(config, f)
+
+        import db_migrator
+        with mock.patch.object(device_info, 'get_sonic_version_info', return_value={'asic_type': 'vs'}):
+            dbmgtr = db_migrator.DBMigrator(None, config_file=input_file, output_file=output_file)
+            dbmgtr.migrate()
+
+            with open(output_file) as f:
+                migrated = json.load(f)
+            assert migrated['VERSIONS'] == {'DATABASE': {'VERSION': dbmgtr.CURRENT_VERSION}}
+            assert migrated['PORT'] == {'Ethernet0': {'adv_speeds': '100000', 'autoneg': 'on', 'speed': '100000'}}
+            assert migrated['PORTCHANNEL'] == {
+                'PortChannel0001': {'admin_status': 'up', 'lacp_key': 'auto', 'members': ['Ethernet0']}}
+            assert dbmgtr.hwsku == 'vs'
+            with open(input_file) as f:
+                assert json.load(f) == config
+
+            # the version is now current, nothing more to migrate
+            dbmgtr = db_migrator.DBMigrator(None, config_file=output_file, dry_run=True)
+            dbmgtr.migrate()
+            assert dbmgtr.commit() == {}
+
+    def test_config_file_cold_boot(self, tmp_path):
+        config = {
+            'DEVICE_METADATA': {'localhost': {'hwsku': 'Force10-S6100'}},
+            'VERSIONS': {'DATABASE': {'VERSION': 'version_4_0_0'}},
+        }
+        input_file = str(tmp_path / 'config_db.json')
+        with open(input_file, 'w') as f:
+            json.dump(config, f)
+
+        import db_migrator
+        # the running system is not read, except for the asic type of the image
+        with mock.patch.object(device_info, 'get_sonic_version_info', return_value={'asic_type': 'broadcom'}), \
+                mock.patch.object(device_info, 'get_hwsku', side_effect=AssertionError('hwsku read from CONFIG_DB')), \
+                mock.patch.object(device_info, 'is_warm_restart_enabled', side_effect=AssertionError('STATE_DB read')):
+            dbmgtr = db_migrator.DBMigrator(None, config_file=input_file, dry_run=True)
+            dbmgtr.migrate()
+
+        assert dbmgtr.hwsku == 'Force10-S6100'
+        assert dbmgtr.configDB.get_entry('PORT', 'Ethernet64') == {}
+
+    def test_config_file_get_version(self, tmp_path, capsys):
+        content = json.dumps({'VERSIONS': {'DATABASE': {'VERSION': 'version_3_0_0'}}})
+        input_file = str(tmp_path / 'config_db.json')
+        with open(input_file, 'w') as f:
+            f.write(content)
+
+        import db_migrator
+        with mock.patch.object(device_info, 'get_sonic_version_info', return_value={'asic_type': 'vs'}), \
+                mock.patch.object(db_migrator, 'SonicDBConfig'), \
+                mock.patch.object(sys, 'argv', ['db_migrator.py', '-o', 'get_version', '-c', input_file]):
+            db_migrator.main()
+
+        assert capsys.readouterr().out == 'version_3_0_0\n'
+        # the file is not written in the 'config save' format
+        with open(input_file) as f:
+            assert f.read() == content
@@ -0,0 +1,95 @@
+from utilities_common.db_snapshot import DbSnapshot
+
+from .mock_redis_client import MockConnector, MockScanRedisClient
+
+
+def get_db(data):
+    return MockConnector(MockScanRedisClient(data))
+
+
+def get_data():
+    return {
+        'PORT|Ethernet0': {'mtu': '9100', 'autoneg': '1'},
+        'PORT|Ethernet4': {'mtu': '9100'},
+        'VLAN_MEMBER|Vlan1000|Ethernet0': {'tagging_mode': 'untagged'},
+        'PFC_WD_TABLE|Ethernet0': {'action': 'drop'},
+        'VERSIONS|DATABASE': {'VERSION': 'version_3_0_0'},
+    }
+
+
+class TestDbSnapshot(object):
+    def test_read(self):
+        db = get_db(get_data())
+        snapshot = DbSnapshot(db, db.CONFIG_DB)
+
+        assert snapshot.get_table('PORT') == {'Ethernet0': {'mtu': '9100', 'autoneg': '1'},
+                                              'Ethernet4': {'mtu': '9100'}}
+        assert snapshot.get_keys('VLAN_MEMBER') == [('Vlan1000', 'Ethernet0')]
+        assert snapshot.get_entry('VERSIONS', 'DATABASE') == {'VERSION': 'version_3_0_0'}
+        assert snapshot.get_entry('VERSIONS', 'MISSING') == {}
+        assert snapshot.get(db.CONFIG_DB, 'PORT|Ethernet4', 'mtu') == '9100'
+        assert snapshot.hexists(db.CONFIG_DB, 'PORT|Ethernet4', 'mtu')
+        assert sorted(snapshot.keys(db.CONFIG_DB, 'P*')) == ['PFC_WD_TABLE|Ethernet0', 'PORT|Ethernet0', 'PORT|Ethernet4']
+        assert snapshot.get_diff() == {}
+
+    def test_write(self):
+        db = get_db(get_data())
+        snapshot = DbSnapshot(db, db.CONFIG_DB)
+
+        snapshot.set(db.CONFIG_DB, 'PORT|Ethernet0', 'autoneg', 'on')
+        snapshot.set_entry('PORT', 'Ethernet4', {'mtu': '1500'})
+        snapshot.mod_entry('VLAN_MEMBER', ('Vlan1000', 'Ethernet0'), {'tagging_mode': 'untagged'})
+        snapshot.delete_table('PFC_WD_TABLE')
+        snapshot.set_entry('PFC_WD', 'Ethernet0', {'action': 'drop'})
+        snapshot.set_entry('VERSIONS', 'DATABASE', {'VERSION': 'version_3_0_1'})
+
+        assert db.client.data == get_data()
+        assert snapshot.get_entry('PORT', 'Ethernet0') == {'mtu': '9100', 'autoneg': 'on'}
+        assert snapshot.get_table('PFC_WD_TABLE') == {}
+        assert snapshot.get_diff() == {
+            'PORT|Ethernet0': {'set': {'autoneg': 'on'}, 'del': []},
+            'PORT|Ethernet4': {'set': {'mtu': '1500'}, 'del': []},
+            'PFC_WD_TABLE|Ethernet0': None,
+            'PFC_WD|Ethernet0': {'set': {'action': 'drop'}, 'del': []},
+            'VERSIONS|DATABASE': {'set': {'VERSION': 'version_3_0_1'}, 'del': []},
+        }
+
+    def test_commit(self):
+        db = get_db(get_data())
+        snapshot = DbSnapshot(db, db.CONFIG_DB)
+        snapshot.load()
+
+        snapshot.set_entry('PORT', 'Ethernet0', {'mtu': '9100', 'fec': 'rs'})
+        snapshot.delete(db.CONFIG_DB, 'PFC_WD_TABLE|Ethernet0')
+        snapshot.set_entry('VERSIONS', 'DATABASE', {'VERSION': 'version_3_0_1'})
+        snapshot.set_entry('VERSIONS', 'DATABASE', {'VERSION': 'version_3_0_0'})
+        diff = snapshot.commit()
+
+        assert diff == {
+            'PORT|Ethernet0': {'set': {'fec': 'rs'}, 'del': ['autoneg']},
+            'PFC_WD_TABLE|Ethernet0': None,
+        }
+        assert db.client.transactions == [[
+            ('delete', ('PFC_WD_TABLE|Ethernet0',)),
+            ('hdel', ('PORT|Ethernet0', 'autoneg')),
+            ('hset', ('PORT|Ethernet0', 'fec', 'rs')),
+        ]]
+        assert db.client.data['PORT|Ethernet0'] == {'mtu': '9100', 'fec': 'rs'}
+        assert 'PFC_WD_TABLE|Ethernet0' not in db.client.data
+
+        assert snapshot.get_diff() == {}
+        assert snapshot.commit() == {}
+        assert len(db.client.transactions) == 1
+
+    def test_offline(self):
+        db = get_db({})
+        snapshot = DbSnapshot(db, db.CONFIG_DB, get_data())
+
+        snapshot.set_entry('VERSIONS', 'DATABASE', {'VERSION': 'version_3_0_1'})
+        assert snapshot.get_keys('PORT') == ['Ethernet0', 'Ethernet4']
+        assert snapshot.get_diff() == {'VERSIONS|DATABASE': {'set': {'VERSION': 'version_3_0_1'}, 'del': []}}
+        assert snapshot.commit() == {'VERSIONS|DATABASE': {'set': {'VERSION': 'version_3_0_1'}, 'del': []}}
+        assert snapshot.get_diff() == {}
+        assert snapshot.get_data()['VERSIONS|DATABASE'] == {'VERSION': 'version_3_0_1'}
+        assert db.client.data == {}
+        assert db.client.transactions == []
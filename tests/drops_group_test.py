@@ -12,6 +12,7 @@ sys.path.insert(0, modules_path)
 
 import show.main as show
 import clear.main as clear
+from utilities_common.cli import UserCache
 
 expected_counter_capabilities = """\
 Counter Type           Total
@@ -82,7 +83,7 @@ Ethernet8      N/A         0           0         0           0          0
 sonic_drops_test               0                    0
 """
 
-dropstat_path = "/tmp/dropstat-27"
+dropstat_path = os.path.join(UserCache.CACHE_DIR, "dropstat")
 
 class TestDropCounters(object):
     @classmethod
@@ -218,6 +218,24 @@ class TestDumpState:
         ddiff = DeepDiff(set(expected_entries), set(rec_json.keys()))
         assert not ddiff, "Expected Entries were not recieved when passing all keyword"
 
+    def test_option_dump_dir(self, match_engine, tmp_path):
+        dump_port_input = os.path.join(os.path.dirname(__file__), "../dump_input/dump/default")
+        for db_name in ["CONFIG_DB", "APPL_DB", "STATE_DB", "ASIC_DB"]:
+            with open(os.path.join(dump_port_input, db_name.lower() + ".json")) as f:
+                db_data = json.load(f)
+            # Format of sonic-db-dump -y
+            db_dump = {key: {"expireat": 0, "ttl": -0.001, "type": "hash", "value": fvs} for key, fvs in db_data.items()}
+            db_dump["SOME_SET"] = {"expireat": 0, "ttl": -0.001, "type": "set", "value": ["member"]}
+            with open(str(tmp_path / (db_name + ".json")), "w") as f:
+                json.dump(db_dump, f)
+
+        runner = CliRunner()
+        expected = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4"], obj=match_engine)
+        result = runner.invoke(dump.state, ["port", "Ethernet0,Ethernet4", "--dump-dir", str(tmp_path)], obj=match_engine)
+        assert result.exit_code == 0, "exit code: {}, Exception: {}, Traceback: {}".format(result.exit_code, result.exception, result.exc_info)
+        ddiff = compare_json_output(json.loads(expected.output), result.output)
+        assert not ddiff, ddiff
+
     def test_namespace_single_asic(self, match_engine):
         runner = CliRunner()
         result = runner.invoke(dump.state, ["port", "Ethernet0", "--table", "--key-map", "--namespace", "asic0"], obj=match_engine)
@@ -1,8 +1,9 @@
 import os
+import json
 import sys
 import unittest
 import pytest
-from dump.match_infra import MatchEngine, EXCEP_DICT, MatchRequest, MatchRequestOptimizer, ConnectionPool, CONN
+from dump.match_infra import MatchEngine, EXCEP_DICT, MatchRequest, MatchRequestOptimizer, ConnectionPool, CONN, TableCache, TableIndex, DbDump
 from utilities_common.constants import DEFAULT_NAMESPACE
 from dump.helper import populate_mock
 from unittest.mock import MagicMock
@@ -303,3 +304,73 @@ class TestMatchEngineOptimizer:
         # missing filed should not cause an excpetion in the optimizer
         assert "whatever" in ret["return_values"]["COPP_GROUP|queue4_group2"]
         assert not  ret["return_values"]["COPP_GROUP|queue4_group2"]["whatever"]
+
+
+class TestTableCache:
+
+    def test_table_index(self):
+        entries = {
+            'ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:{"dest":"10.1.0.32/32","switch_id":"oid:0x21"}': {},
+            'ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:{"dest":"10.1.0.0/24","switch_id":"oid:0x21"}': {},
+        }
+        index = TableIndex("ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:", entries)
+        assert index.match('*"dest":"10.1.0.32/32"*') == [list(entries)[0]]
+        assert index.match('*"dest":"10.1.0.3*"*') == [list(entries)[0]]
+        assert sorted(index.match("*")) == sorted(entries)
+        assert index.match('{"dest":"10.1.0.0/24","switch_id":"oid:0x21"}') == [list(entries)[1]]
+        assert index.match("oid:0x22") == []
+
+    def test_table_index_fields(self):
+        entries = {
+            "VLAN_MEMBER|Vlan4|Ethernet0": {"tagging_mode": "untagged"},
+            "VLAN_MEMBER|Vlan4|Ethernet4": {"tagging_mode": "tagged"},
+            "ACL_TABLE|DATAACL": {"ports": "Ethernet0,Ethernet4"},
+        }
+        index = TableIndex("", entries)
+        assert index.get_field_index("tagging_mode")["tagged"] == {"VLAN_MEMBER|Vlan4|Ethernet4"}
+        assert index.get_field_index("ports")["Ethernet4"] == {"ACL_TABLE|DATAACL"}
+        assert "Ethernet4" not in index.get_field_index("ports", match_entire_list=True)
+        assert index.get_field_index("missing") == {}
+
+    def test_cached_fetch(self, match_engine):
+        table_cache = TableCache()
+        cached_engine = MatchEngine(match_engine.conn_pool, table_cache)
+        reqs = [
+            MatchRequest(db="CONFIG_DB", table="ACL_RULE", key_pattern="EVERFLOW*"),
+            MatchRequest(db="STATE_DB", table="VXLAN_TUNNEL_TABLE", key_pattern="EVPN_25.25.25.2*",
+                         field="operstatus", value="down", return_fields=["src_ip"]),
+            MatchRequest(db="APPL_DB", table="PORT_TABLE", field="lanes", value="202"),
+            MatchRequest(db="ASIC_DB", table="ASIC_STATE:SAI_OBJECT_TYPE_SWITCH", key_pattern="oid:0x22*"),
+            MatchRequest(db="CONFIG_DB", table="PORT", key_pattern="*", ns="asic0", return_fields=["alias"]),
+        ]
+        for req in reqs:
+            ret = cached_engine.fetch(req)
+            expected = match_engine.fetch(req)
+            assert ret["error"] == expected["error"]
+            assert sorted(ret["keys"]) == sorted(expected["keys"])
+            assert ret["return_values"] == expected["return_values"]
+        assert (DEFAULT_NAMESPACE, "CONFIG_DB", "ACL_RULE") in table_cache.tables
+        assert ("asic0", "CONFIG_DB", "PORT") in table_cache.tables
+
+
+class TestDbDump:
+
+    def test_get_table(self, tmp_path):
+        db_dump = {
+            "PORT_TABLE:Ethernet0": {"type": "hash", "value": {"lanes": "0"}},
+            "PORT_TABLE:Ethernet4": {"type": "hash", "value": {"lanes": "4"}},
+            "PORT_TABLE_EXT:Ethernet0": {"type": "hash", "value": {}},
+            "PORT_TABLE;Ethernet8": {"type": "hash", "value": {}},
+            "PORT_TABLE:Ethernet8:set": {"type": "set", "value": ["Ethernet8"]},
+        }
+        file_name = str(tmp_path / "APPL_DB.json")
+        with open(file_name, "w") as f:
+            json.dump(db_dump, f)
+
+        db = DbDump(file_name)
+        assert sorted(db.get_table("PORT_TABLE:").match("*")) == ["PORT_TABLE:Ethernet0", "PORT_TABLE:Ethernet4"]
+        assert db.get_table("PORT_TABLE:").match("Ethernet4") == ["PORT_TABLE:Ethernet4"]
+        assert db.get_table("PORT_TABLE:") is db.get_table("PORT_TABLE:")
+        assert db.get_table("LAG_TABLE:").match("*") == []
+        assert db.entries["PORT_TABLE:Ethernet0"] == {"lanes": "0"}
+        assert "PORT_TABLE:Ethernet8:set" not in db.entries
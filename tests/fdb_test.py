@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from utilities_common import fdb
+
+from .mock_redis_client import MockConnector, MockScanRedisClient
+
+BR_PORT_1 = "oid:0x3a000000000001"
+BR_PORT_2 = "oid:0x3a000000000002"
+BR_PORT_NO_NAME = "oid:0x3a000000000003"
+BVID_2 = "oid:0x26000000000002"
+BVID_3 = "oid:0x26000000000003"
+BVID_DEFAULT = "oid:0x26000000000001"
+
+
+def fdb_key(mac, bvid=None, vlan=None):
+    key = {"mac": mac, "switch_id": "oid:0x21000000000000"}
+    if bvid is not None:
+        key["bvid"] = bvid
+    if vlan is not None:
+        key["vlan"] = vlan
+    return fdb.FDB_ENTRY_PREFIX + json.dumps(key, sort_keys=True, separators=(',', ':'))
+
+
+def fdb_value(br_port, entry_type="SAI_FDB_ENTRY_TYPE_DYNAMIC"):
+    return {"SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID": br_port, "SAI_FDB_ENTRY_ATTR_TYPE": entry_type}
+
+
+ASIC_DB = {
+    fdb.BRIDGE_PORT_PREFIX + BR_PORT_1: {"SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1000000000001"},
+    fdb.BRIDGE_PORT_PREFIX + BR_PORT_2: {"SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1000000000002"},
+    fdb.BRIDGE_PORT_PREFIX + BR_PORT_NO_NAME: {"SAI_BRIDGE_PORT_ATTR_PORT_ID": "oid:0x1000000000003"},
+    fdb.BRIDGE_PORT_PREFIX + "oid:0x3a000000000004": {"SAI_BRIDGE_PORT_ATTR_TYPE": "SAI_BRIDGE_PORT_TYPE_1Q_ROUTER"},
+    fdb.VLAN_PREFIX + BVID_2: {"SAI_VLAN_ATTR_VLAN_ID": "2"},
+    fdb.VLAN_PREFIX + BVID_3: {"SAI_VLAN_ATTR_VLAN_ID": "3"},
+    fdb.VLAN_PREFIX + BVID_DEFAULT: {"NULL": "NULL"},
+    fdb_key("11:22:33:44:55:66", bvid=BVID_2): fdb_value(BR_PORT_1),
+    fdb_key("11:22:33:44:55:77", bvid=BVID_3): fdb_value(BR_PORT_2, "SAI_FDB_ENTRY_TYPE_STATIC"),
+    fdb_key("11:22:33:44:55:88", vlan="3"): fdb_value(BR_PORT_1),
+    fdb_key("11:22:33:44:55:99", bvid=BVID_3): fdb_value(BR_PORT_NO_NAME),
+    fdb_key("11:22:33:44:55:AA", bvid=BVID_3): fdb_value("oid:0x3a0000000000ff"),
+    fdb_key("11:22:33:44:55:BB", bvid=BVID_DEFAULT): fdb_value(BR_PORT_1),
+}
+
+IF_OID_MAP = {"1000000000001": "Ethernet0", "1000000000002": "PortChannel0001"}
+
+
+def get_db(data):
+    # the hashes must be read in pipelines
+    return MockConnector(MockScanRedisClient(data, forbidden=('hgetall',)))
+
+
+class TestFdb(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.db = get_db(dict(ASIC_DB))
+        self.bridge_port_names = fdb.get_bridge_port_names(fdb.get_bridge_port_map(self.db), IF_OID_MAP)
+
+    def get_resolver(self):
+        return fdb.FdbResolver(self.db, self.bridge_port_names)
+
+    def test_get_bridge_port_map(self):
+        assert fdb.get_bridge_port_map(self.db) == {
+            "3a000000000001": "1000000000001",
+            "3a000000000002": "1000000000002",
+            "3a000000000003": "1000000000003",
+        }
+        assert fdb.get_bridge_port_map(get_db({})) is None
+
+    def test_get_bridge_port_names(self):
+        assert self.bridge_port_names == {
+            BR_PORT_1: "Ethernet0",
+            BR_PORT_2: "PortChannel0001",
+            BR_PORT_NO_NAME: "1000000000003",
+        }
+        assert fdb.get_bridge_port_names(None, IF_OID_MAP) == {}
+
+    def test_get_entries(self):
+        entries = self.get_resolver().get_entries()
+
+        assert entries == [
+            fdb.FdbEntry(2, "11:22:33:44:55:66", "Ethernet0", "Dynamic"),
+            fdb.FdbEntry(3, "11:22:33:44:55:77", "PortChannel0001", "Static"),
+            fdb.FdbEntry(3, "11:22:33:44:55:88", "Ethernet0", "Dynamic"),
+            fdb.FdbEntry(3, "11:22:33:44:55:99", "1000000000003", "Dynamic"),
+        ]
+        # bridge ports, vlans, FDB entries
+        assert self.db.client.round_trips == 3
+
+    def test_get_entries_filtered(self):
+        resolver = self.get_resolver()
+
+        assert [entry.mac for entry in resolver.get_entries(vlan_id=3)] == \
+            ["11:22:33:44:55:77", "11:22:33:44:55:99", "11:22:33:44:55:88"]
+        assert resolver.get_entries(vlan_id=4) == []
+        assert [entry.mac for entry in resolver.get_entries(port="Ethernet0")] == \
+            ["11:22:33:44:55:66", "11:22:33:44:55:88"]
+        assert [entry.mac for entry in resolver.get_entries(vlan_id=3, entry_type="Static")] == \
+            ["11:22:33:44:55:77"]
+        assert resolver.get_entries(mac="11:22:33:44:55:66") == \
+            [fdb.FdbEntry(2, "11:22:33:44:55:66", "Ethernet0", "Dynamic")]
+        assert resolver.get_entries(vlan_id=3, mac="11:22:33:44:55:66") == []
+
+    def test_filters_pushed_down(self):
+        resolver = self.get_resolver()
+        resolver.get_entries(vlan_id=2)
+        resolver.get_entries(mac="11:22:33:44:55:66")
+
+        fdb_patterns = [pattern for pattern in self.db.client.patterns if pattern.startswith(fdb.FDB_ENTRY_PREFIX)]
+        assert fdb_patterns == [
+            fdb.FDB_ENTRY_PREFIX + '*"bvid":"{}"*'.format(BVID_2),
+            fdb.FDB_ENTRY_PREFIX + '*"vlan":"2"*',
+            fdb.FDB_ENTRY_PREFIX + '*"mac":"11:22:33:44:55:66"*',
+        ]
+        # the VLAN objects are read once
+        assert self.db.client.patterns.count(fdb.VLAN_PREFIX + "*") == 1
+
+    def test_get_entries_unknown_port(self):
+        entries = self.get_resolver().get_entries(vlan_id=3, skip_unknown_port=False)
+
+        assert fdb.FdbEntry(3, "11:22:33:44:55:AA", None, "Dynamic") in entries
+
+    def test_get_entries_unknown_bvid(self):
+        self.db.client.data[fdb_key("11:22:33:44:55:CC", bvid="oid:0x260000000000ff")] = fdb_value(BR_PORT_1)
+        resolver = self.get_resolver()
+
+        with pytest.raises(ValueError, match="Failed to get Vlan id for bvid oid:0x260000000000ff"):
+            resolver.get_entries()
+        assert len(resolver.get_entries(skip_unknown_bvid=True)) == 4
+
+    def test_get_entries_paged(self, monkeypatch):
+        monkeypatch.setattr(fdb.bulk_db, 'PIPELINE_BATCH_SIZE', 2)
+        for i in range(5):
+            self.db.client.data[fdb_key("11:22:33:44:66:{:02X}".format(i), bvid=BVID_2)] = fdb_value(BR_PORT_1)
+
+        assert len(self.get_resolver().get_entries(vlan_id=2)) == 6
+
+    def test_get_bvids(self):
+        resolver = self.get_resolver()
+
+        assert resolver.get_bvids(3) == [BVID_3]
+        assert resolver.get_bvids(1) == []
@@ -3,12 +3,23 @@ from click.testing import CliRunner
 import pytest
 
 import show.main as show
+from .mock_tables import dbconnector
 from .utils import get_result_and_return_code
 import subprocess
 
 root_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(root_path)
 scripts_path = os.path.join(modules_path, "scripts")
+mock_db_path = os.path.join(root_path, "fdbshow_input")
+
+# ASIC_DB of the FDBSHOW_MOCK variants, as fdbshow loads them in a new process
+mock_variants = {"1": 'asic_db',
+                 "2": 'asic_db_def_vlan',
+                 "3": 'asic_db_no_fdb',
+                 "4": 'asic_db_no_bridge',
+                 "5": 'asic_db_fetch_except',
+                 "6": 'asic_db_no_static',
+                 "7": 'asic_db_mac_case'}
 
 show_mac_output_with_def_vlan = """\
   No.    Vlan  MacAddress         Port       Type
@@ -158,9 +169,14 @@ class TestFdbshow():
         self.runner = CliRunner()
         yield
         del os.environ["FDBSHOW_MOCK"]
+        dbconnector.dedicated_dbs['ASIC_DB'] = None
+        dbconnector.dedicated_dbs['COUNTERS_DB'] = None
 
     def set_mock_variant(self, variant: str):
         os.environ["FDBSHOW_MOCK"] = variant
+        # show runs fdbshow in-process, with the mock DBs of the tests
+        dbconnector.dedicated_dbs['ASIC_DB'] = os.path.join(mock_db_path, mock_variants[variant])
+        dbconnector.dedicated_dbs['COUNTERS_DB'] = os.path.join(mock_db_path, 'counters_db')
 
     def test_show_mac_def_vlan(self):
         self.set_mock_variant("2")
@@ -179,7 +195,6 @@ class TestFdbshow():
 
     def test_show_mac_aging_time(self):
         self.set_mock_variant("1")
-        from .mock_tables import dbconnector
         modules_path = os.path.join(os.path.dirname(__file__), "..")
         test_path = os.path.join(modules_path, "tests")
         mock_db_path = os.path.join(test_path, "fdbshow_input")
@@ -194,7 +209,6 @@ class TestFdbshow():
 
     def test_show_mac_no_aging_time(self):
         self.set_mock_variant("1")
-        from .mock_tables import dbconnector
         modules_path = os.path.join(os.path.dirname(__file__), "..")
         test_path = os.path.join(modules_path, "tests")
         mock_db_path = os.path.join(test_path, "fdbshow_input")
@@ -6,6 +6,7 @@ from click.testing import CliRunner
 
 from utilities_common import multi_asic
 from utilities_common import constants
+from utilities_common.general import load_module_from_source
 from .utils import get_result_and_return_code
 import show.main as show
 
@@ -33,10 +34,41 @@ show_ip_fib_v6 = """\
 Total number of entries 3
 """
 
+show_ip_fib_v4_limit = """\
+  No.  Vrf    Route               Nexthop                                  Ifname
+-----  -----  ------------------  ---------------------------------------  -----------------------------------------------------------
+    1         192.168.104.0/25    10.0.0.57,10.0.0.59,10.0.0.61,10.0.0.63  PortChannel101,PortChannel102,PortChannel103,PortChannel104
+    2         192.168.104.128/25                                           PortChannel101,PortChannel102,PortChannel103,PortChannel104
+Total number of entries 2
+"""
+
+show_ip_fib_v4_lpm = """\
+  No.  Vrf    Route               Nexthop    Ifname
+-----  -----  ------------------  ---------  -----------------------------------------------------------
+    1         192.168.104.128/25             PortChannel101,PortChannel102,PortChannel103,PortChannel104
+Total number of entries 1
+"""
+
+show_ip_fib_v4_lpm_vrf = """\
+  No.  Vrf    Route               Nexthop                                  Ifname
+-----  -----  ------------------  ---------------------------------------  -----------------------------------------------------------
+    1  Red    192.168.112.128/25  10.0.0.57,10.0.0.59,10.0.0.61,10.0.0.63  PortChannel101,PortChannel102,PortChannel103,PortChannel104
+Total number of entries 1
+"""
+
+show_ip_fib_v6_lpm = """\
+  No.  Vrf    Route                Nexthop                              Ifname
+-----  -----  -------------------  -----------------------------------  -----------------------------------------------------------
+    1         20c0:fe28:0:80::/64  fc00::72,fc00::76,fc00::7a,fc00::7e  PortChannel101,PortChannel102,PortChannel103,PortChannel104
+Total number of entries 1
+"""
+
 root_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(root_path)
 scripts_path = os.path.join(modules_path, "scripts")
 
+fibshow_path = os.path.join(scripts_path, 'fibshow')
+
 
 class TestFibshow():
     @pytest.fixture(scope="class", autouse=True)
@@ -90,3 +122,66 @@ class TestFibshow():
         assert result.exit_code == 0
         assert result.output == show_ip_fib_v6
 
+
+    def test_fibshow_count(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -4 --count')
+        assert return_code == 0
+        assert result == "Total number of entries 5\n"
+
+    def test_fibshow_limit(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -4 --limit 2')
+        assert return_code == 0
+        assert result == show_ip_fib_v4_limit
+
+    def test_fibshow_longest_prefix_match(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -4 -ip 192.168.104.130')
+        assert return_code == 0
+        assert result == show_ip_fib_v4_lpm
+
+    def test_fibshow_longest_prefix_match_vrf(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -4 -ip VRF-Red:192.168.112.130')
+        assert return_code == 0
+        assert result == show_ip_fib_v4_lpm_vrf
+
+    def test_fibshow_longest_prefix_match_v6(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -6 -ip 20c0:fe28:0:80::1')
+        assert return_code == 0
+        assert result == show_ip_fib_v6_lpm
+
+    def test_fibshow_no_match(self):
+        self.set_mock_variant("1")
+        return_code, result = get_result_and_return_code('fibshow -4 -ip 10.1.1.1')
+        assert return_code == 0
+        assert result.endswith("Total number of entries 0\n")
+
+
+class TestFibshowInProcess():
+    @pytest.fixture(autouse=True)
+    def fibshow(self):
+        from .mock_tables import dbconnector
+        fibshow = load_module_from_source('fibshow', fibshow_path)
+        dbconnector.dedicated_dbs['APPL_DB'] = os.path.join(root_path, "fibshow_input", "appl_db")
+        # SCAN may return a key more than once
+        scan_keys = fibshow.bulk_db.scan_keys
+        with patch.object(fibshow.bulk_db, "scan_keys", side_effect=lambda *args: list(scan_keys(*args)) * 2):
+            yield fibshow
+        dbconnector.dedicated_dbs['APPL_DB'] = None
+
+    def test_duplicate_keys(self, fibshow, capsys):
+        fibshow.FibBase().display("-4", None)
+        assert capsys.readouterr().out == show_ip_fib_v4
+        fibshow.FibBase().display("-4", None, limit=2)
+        assert capsys.readouterr().out == show_ip_fib_v4_limit
+        fibshow.FibBase().display("-4", None, count=True)
+        assert capsys.readouterr().out == "Total number of entries 5\n"
+
+    def test_pages(self, fibshow, capsys):
+        with patch.object(fibshow.FibBase, "PAGE_SIZE", 2):
+            fibshow.FibBase().display("-4", None)
+            fibshow.FibBase().display("-6", None)
+        assert capsys.readouterr().out == show_ip_fib_v4 + show_ip_fib_v6
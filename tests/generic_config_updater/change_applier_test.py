@@ -9,6 +9,7 @@ from unittest.mock import patch, Mock, call
 import generic_config_updater.change_applier
 import generic_config_updater.services_validator
 import generic_config_updater.gu_common
+from ..mock_redis_client import MockConnector, MockPipelineRedisClient
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 DATA_FILE =  os.path.join(SCRIPT_DIR, "files", "change_applier_test.data.json")
@@ -73,17 +74,12 @@ def debug_print(msg):
     print(msg)
 
 
-# Mimics os.system call for sonic-cfggen -d --print-data > filename
+# Mimics ConfigDbSnapshot.get_config, which returns the same as sonic-cfggen -d --print-data
 #
-def os_system_cfggen(cmd):
-    global running_config
-
-    fname = cmd.split(">")[-1].strip()
-    with open(fname, "w") as s:
-        s.write(json.dumps(running_config, indent=4))
-    debug_print("File created {} type={} cfg={}".format(fname,
+def get_config_snapshot():
+    debug_print("Config read type={} cfg={}".format(
         type(running_config), json.dumps(running_config)[1:40]))
-    return 0
+    return copy.deepcopy(running_config)
 
 
 # mimics config_db.set_entry
@@ -213,14 +209,15 @@ def vlan_validate(old_cfg, new_cfg, keys):
 
 class TestChangeApplier(unittest.TestCase):
 
-    @patch("generic_config_updater.change_applier.os.system")
+    @patch("generic_config_updater.gu_common.ConfigDbSnapshot.refresh")
+    @patch("generic_config_updater.gu_common.ConfigDbSnapshot.get_config")
     @patch("generic_config_updater.change_applier.get_config_db")
     @patch("generic_config_updater.change_applier.set_config")
-    def test_change_apply(self, mock_set, mock_db, mock_os_sys):
+    def test_change_apply(self, mock_set, mock_db, mock_get_config, mock_refresh):
         global read_data, running_config, json_changes, json_change_index
         global start_running_config
 
-        mock_os_sys.side_effect = os_system_cfggen
+        mock_get_config.side_effect = get_config_snapshot
         mock_db.return_value = DB_HANDLE
         mock_set.side_effect = set_entry
 
@@ -272,6 +269,35 @@ class TestChangeApplier(unittest.TestCase):
         debug_print("all good for applier")
 
 
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_apply__config_db_written_by_others__read_again(self, mock_set, mock_db):
+        data = {"PORT|Ethernet0": {"mtu": "9100"}}
+        mock_db.return_value = MockConnector(MockPipelineRedisClient(data))
+        mock_set.side_effect = lambda config_db, tbl, key, value: data.update({f"{tbl}|{key}": value})
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+        applier = generic_config_updater.change_applier.ChangeApplier()
+
+        def set_mtu(config):
+            config["PORT"]["Ethernet0"]["mtu"] = "1500"
+            return config
+
+        def add_vlan(config):
+            config["VLAN"] = {"Vlan1000": {"vlanid": "1000"}}
+            return config
+
+        self.assertEqual(0, applier.apply(Mock(apply=Mock(side_effect=set_mtu))))
+        # Written by another ConfigDb client between the changes
+        data["PORT|Ethernet4"] = {"mtu": "9100"}
+        change = Mock(apply=Mock(side_effect=add_vlan))
+        self.assertEqual(0, applier.apply(change))
+
+        self.assertDictEqual({"Ethernet0": {"mtu": "1500"}, "Ethernet4": {"mtu": "9100"}},
+                             change.apply.call_args.args[0]["PORT"])
+        self.assertListEqual([("PORT", "Ethernet0", {"mtu": "1500"}), ("VLAN", "Vlan1000", {"vlanid": "1000"})],
+                             [set_call.args[1:] for set_call in mock_set.call_args_list])
+
+
 class TestDryRunChangeApplier(unittest.TestCase):
     def test_apply__calls_apply_change_to_config_db(self):
         # Arrange
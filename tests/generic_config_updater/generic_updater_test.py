@@ -343,6 +343,7 @@ class TestGenericUpdateFactory(unittest.TestCase):
             },
             {"ignore_non_yang_tables": {True: None, False: None}},
             {"ignore_paths": {(): None, ("", "/ACL_TABLE"): None}},
+            {"parallel": {True: None, False: None}},
         ]
 
         # Act and assert
@@ -412,7 +413,8 @@ class TestGenericUpdateFactory(unittest.TestCase):
                                                      params["verbose"],
                                                      params["dry_run"],
                                                      params["ignore_non_yang_tables"],
-                                                     params["ignore_paths"])
+                                                     params["ignore_paths"],
+                                                     params["parallel"])
         for decorator_type in expected_decorators:
             self.assertIsInstance(patch_applier, decorator_type)
 
@@ -439,6 +441,9 @@ class TestGenericUpdateFactory(unittest.TestCase):
         else:
             self.assertIsInstance(patch_applier.patchsorter, ps.StrictPatchSorter)
 
+        expected_inner_patch_sorter = ps.PartitionedPatchSorter if params["parallel"] else ps.PatchSorter
+        self.assertIs(expected_inner_patch_sorter, type(patch_applier.patchsorter.inner_patch_sorter))
+
     def validate_create_config_replacer(self, params, expected_decorators):
         factory = gu.GenericUpdateFactory()
         config_replacer = factory.create_config_replacer(params["config_format"],
@@ -522,6 +527,7 @@ class TestGenericUpdater(unittest.TestCase):
         self.any_dry_run = True
         self.any_ignore_non_yang_tables = True
         self.any_ignore_paths = ["", "/ACL_TABLE"]
+        self.any_parallel = True
 
     def test_apply_patch__creates_applier_and_apply(self):
         # Arrange
@@ -535,7 +541,8 @@ class TestGenericUpdater(unittest.TestCase):
                   str(self.any_verbose),
                   str(self.any_dry_run),
                   str(self.any_ignore_non_yang_tables),
-                  str(self.any_ignore_paths)): patch_applier})
+                  str(self.any_ignore_paths),
+                  str(self.any_parallel)): patch_applier})
 
         generic_updater = gu.GenericUpdater(factory)
 
@@ -545,7 +552,8 @@ class TestGenericUpdater(unittest.TestCase):
                                     self.any_verbose,
                                     self.any_dry_run,
                                     self.any_ignore_non_yang_tables,
-                                    self.any_ignore_paths)
+                                    self.any_ignore_paths,
+                                    self.any_parallel)
 
         # Assert
         patch_applier.apply.assert_has_calls([call(Files.SINGLE_OPERATION_SONIC_YANG_PATCH)])
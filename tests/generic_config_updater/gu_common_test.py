@@ -6,19 +6,76 @@ import unittest
 from unittest.mock import MagicMock, Mock, patch
 
 from .gutest_helpers import create_side_effect_dict, Files
+from ..mock_redis_client import MockConnector, MockPipelineRedisClient
 import generic_config_updater.gu_common as gu_common
 
+def get_config_db(data):
+    return MockConnector(MockPipelineRedisClient(data))
+
+class TestConfigDbSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "CONFIG_DB_INITIALIZED": {"1": "1"},
+            "PORT|Ethernet8": {"mtu": "9100"},
+            "PORT|Ethernet10": {"mtu": "9100"},
+            "PORT|Ethernet0": {"mtu": "9100"},
+            "VLAN|Vlan1000": {"vlanid": "1000", "members@": "Ethernet0,Ethernet8"},
+            "VLAN_MEMBER|Vlan1000|Ethernet0": {"NULL": "NULL"},
+        }
+        self.config_db = get_config_db(self.data)
+
+    def test_get_config__same_as_sonic_cfggen(self):
+        # Arrange
+        snapshot = gu_common.ConfigDbSnapshot(self.config_db)
+        expected = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet8": {"mtu": "9100"}, "Ethernet10": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000", "members": ["Ethernet0", "Ethernet8"]}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}},
+        }
+
+        # Act
+        actual = snapshot.get_config()
+
+        # Assert
+        self.assertDictEqual(expected, actual)
+        self.assertListEqual(list(expected["PORT"]), list(actual["PORT"]))
+
+    def test_get_config__returns_copies(self):
+        # Arrange
+        snapshot = gu_common.ConfigDbSnapshot(self.config_db)
+
+        # Act
+        snapshot.get_config()["PORT"].pop("Ethernet0")
+
+        # Assert
+        self.assertIn("Ethernet0", snapshot.get_config()["PORT"])
+        self.assertListEqual(["*"], self.config_db.client.patterns)
+
+    def test_refresh__tables__only_given_tables_read_again(self):
+        # Arrange
+        snapshot = gu_common.ConfigDbSnapshot(self.config_db)
+        snapshot.get_config()
+        self.data.pop("PORT|Ethernet8")
+        self.data.pop("VLAN_MEMBER|Vlan1000|Ethernet0")
+        self.data["VLAN|Vlan1000"]["vlanid"] = "2000"
+
+        # Act
+        snapshot.refresh(["PORT", "VLAN_MEMBER"])
+        actual = snapshot.get_config()
+
+        # Assert
+        self.assertListEqual(["Ethernet0", "Ethernet10"], list(actual["PORT"]))
+        self.assertNotIn("VLAN_MEMBER", actual)
+        self.assertEqual("1000", actual["VLAN"]["Vlan1000"]["vlanid"])
+        self.assertListEqual(["*", "PORT|*", "VLAN_MEMBER|*"], self.config_db.client.patterns)
+
 class TestDryRunConfigWrapper(unittest.TestCase):
-    @patch('generic_config_updater.gu_common.subprocess.Popen')
-    def test_get_config_db_as_json(self, mock_popen):
+    def test_get_config_db_as_json(self):
+        config_db_snapshot = gu_common.ConfigDbSnapshot(get_config_db({"PORT|Ethernet0": {"mtu": "9100"}}))
         config_wrapper = gu_common.DryRunConfigWrapper()
-        mock_proc = MagicMock()
-        mock_proc.communicate = MagicMock(
-            return_value=('{"PORT": {}, "bgpraw": ""}', None))
-        mock_proc.returncode = 0
-        mock_popen.return_value = mock_proc
+        config_wrapper.config_db_snapshot = config_db_snapshot
         actual = config_wrapper.get_config_db_as_json()
-        expected = {"PORT": {}}
+        expected = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
         self.assertDictEqual(actual, expected)
 
     def test_get_config_db_as_json__returns_imitated_config_db(self):
@@ -246,6 +303,19 @@ class TestConfigWrapper(unittest.TestCase):
         self.assertEqual(expected, actual)
         self.assertIsNotNone(error)
 
+    def test_validate_config_db_config_as_sonic_yang__same_as_validate_config_db_config(self):
+        config_wrapper = gu_common.ConfigWrapper()
+        for config in [Files.CONFIG_DB_AS_JSON, Files.CONFIG_DB_AS_JSON_INVALID]:
+            # Arrange
+            expected, _ = config_wrapper.validate_config_db_config(config)
+            sonic_yang_as_json = config_wrapper.convert_config_db_to_sonic_yang(config)
+
+            # Act
+            actual, _ = config_wrapper.validate_config_db_config_as_sonic_yang(config, sonic_yang_as_json)
+
+            # Assert
+            self.assertEqual(expected, actual)
+
     def test_validate_bgp_peer_group__valid_non_intersecting_ip_ranges__returns_true(self):
         # Arrange
         config_wrapper = gu_common.ConfigWrapper()
@@ -1,3 +1,4 @@
+import copy
 from collections import OrderedDict
 import jsonpatch
 import unittest
@@ -108,6 +109,46 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(diff, other_diff)
         self.assertTrue(diff == other_diff)
 
+    def test_apply_move__hash_derived_from_parent__same_as_full_hash(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}, "Ethernet4": {"mtu": "9100"}},
+                          "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+                          "DEVICE_METADATA": {"localhost": {"hostname": "host"}}}
+        target_config = {"PORT": {"Ethernet0": {"mtu": "1500"}}, "ACL_TABLE": {}}
+        patches = [[{"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"}],
+                   [{"op": "remove", "path": "/PORT/Ethernet4"}],
+                   [{"op": "add", "path": "/PORT/Ethernet8", "value": {"mtu": "9100"}}],
+                   [{"op": "remove", "path": "/VLAN"}],
+                   [{"op": "add", "path": "/ACL_TABLE", "value": {}}],
+                   [{"op": "replace", "path": "", "value": target_config}]]
+        diff = ps.Diff(current_config, target_config)
+        hash(diff)
+
+        for patch in patches:
+            # Act
+            diff = diff.apply_move(ps.JsonMove.from_patch(jsonpatch.JsonPatch(patch)))
+
+            # Assert
+            self.assertEqual(hash(ps.Diff(diff.current_config, diff.target_config)), hash(diff))
+
+        self.assertTrue(diff.has_no_diff())
+
+    def test_apply_move__current_config_not_updated(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}, "VLAN": {"Vlan1000": {"vlanid": "1000"}}}
+        expected_current_config = copy.deepcopy(current_config)
+        diff = ps.Diff(current_config, {})
+        move = ps.JsonMove.from_patch(
+            jsonpatch.JsonPatch([{"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "1500"}]))
+
+        # Act
+        actual = diff.apply_move(move)
+
+        # Assert
+        self.assertEqual(expected_current_config, current_config)
+        self.assertEqual("1500", actual.current_config["PORT"]["Ethernet0"]["mtu"])
+        self.assertIs(current_config["VLAN"], actual.current_config["VLAN"])
+
 class TestJsonMove(unittest.TestCase):
     def setUp(self):
         self.operation_wrapper = OperationWrapper()
@@ -905,19 +946,27 @@ class TestDeleteWholeConfigMoveValidator(unittest.TestCase):
 
 class TestFullConfigMoveValidator(unittest.TestCase):
     def setUp(self):
-        self.any_current_config = Mock()
-        self.any_target_config = Mock()
-        self.any_simulated_config = Mock()
+        self.any_current_config = {"PORT": {}}
+        self.any_target_config = {"PORT": {}, "VLAN": {}}
+        self.any_simulated_config = {"ACL_TABLE": {}}
+        self.any_simulated_config_as_sonic_yang = {"sonic-acl:sonic-acl": {"sonic-acl:ACL_TABLE": {}}}
         self.any_diff = ps.Diff(self.any_current_config, self.any_target_config)
         self.any_move = Mock()
         self.any_move.apply.side_effect = \
             create_side_effect_dict({(str(self.any_current_config),): self.any_simulated_config})
 
+    def create_config_wrapper(self, is_valid):
+        config_wrapper = Mock()
+        config_wrapper.convert_config_db_to_sonic_yang.side_effect = \
+            create_side_effect_dict({(str(self.any_simulated_config),): self.any_simulated_config_as_sonic_yang})
+        config_wrapper.validate_config_db_config_as_sonic_yang.side_effect = \
+            create_side_effect_dict({(str(self.any_simulated_config), str(self.any_simulated_config_as_sonic_yang)):
+                                     (is_valid, None)})
+        return config_wrapper
+
     def test_validate__invalid_config_db_after_applying_move__failure(self):
         # Arrange
-        config_wrapper = Mock()
-        config_wrapper.validate_config_db_config.side_effect = \
-            create_side_effect_dict({(str(self.any_simulated_config),): (False, None)})
+        config_wrapper = self.create_config_wrapper(False)
         validator = ps.FullConfigMoveValidator(config_wrapper)
 
         # Act and assert
@@ -925,14 +974,89 @@ class TestFullConfigMoveValidator(unittest.TestCase):
 
     def test_validate__valid_config_db_after_applying_move__success(self):
         # Arrange
-        config_wrapper = Mock()
-        config_wrapper.validate_config_db_config.side_effect = \
-            create_side_effect_dict({(str(self.any_simulated_config),): (True, None)})
+        config_wrapper = self.create_config_wrapper(True)
         validator = ps.FullConfigMoveValidator(config_wrapper)
 
         # Act and assert
         self.assertTrue(validator.validate(self.any_move, self.any_diff))
 
+    def test_validate__same_config_db_after_applying_move__validated_once(self):
+        # Arrange
+        config_wrapper = self.create_config_wrapper(True)
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        other_diff = ps.Diff(self.any_current_config, self.any_target_config)
+
+        # Act and assert
+        self.assertTrue(validator.validate(self.any_move, self.any_diff))
+        self.assertTrue(validator.validate(self.any_move, other_diff))
+        config_wrapper.validate_config_db_config_as_sonic_yang.assert_called_once()
+
+    def test_validate__more_configs_than_kept__least_recently_used_validated_again(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}}}
+        config_wrapper = Mock()
+        config_wrapper.convert_config_db_to_sonic_yang.side_effect = lambda config: config
+        config_wrapper.validate_config_db_config_as_sonic_yang.return_value = (True, None)
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        validator.MAX_VALIDATED_CONFIGS = 2
+
+        def validate(mtu):
+            diff = ps.Diff(current_config, {"PORT": {"Ethernet0": {"mtu": mtu}}})
+            move = ps.JsonMove(diff, OperationType.REPLACE, ["PORT", "Ethernet0", "mtu"], ["PORT", "Ethernet0", "mtu"])
+            self.assertTrue(validator.validate(move, diff))
+
+        # Act
+        for mtu in ["1500", "3000", "1500", "4500", "1500", "3000"]:
+            validate(mtu)
+
+        # Assert
+        self.assertEqual(2, len(validator.validated_configs))
+        validated = [call.args[0]["PORT"]["Ethernet0"]["mtu"]
+                     for call in config_wrapper.validate_config_db_config_as_sonic_yang.call_args_list]
+        self.assertListEqual(["1500", "3000", "4500", "3000"], validated)
+
+    def test_validate__table_cannot_be_converted__failure(self):
+        # Arrange
+        config_wrapper = self.create_config_wrapper(True)
+        config_wrapper.convert_config_db_to_sonic_yang.side_effect = ValueError("no list key")
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+
+        # Act and assert
+        self.assertFalse(validator.validate(self.any_move, self.any_diff))
+        config_wrapper.validate_config_db_config_as_sonic_yang.assert_not_called()
+
+    def test_validate__tables_untouched_by_move__not_converted_again(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"mtu": "9100"}},
+                          "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+                          "VLAN_MEMBER": {}}
+        target_config = {"PORT": {"Ethernet0": {"mtu": "1500"}},
+                         "VLAN": {"Vlan1000": {"vlanid": "1000", "mtu": "1500"}},
+                         "VLAN_MEMBER": {}}
+        config_wrapper = Mock()
+        config_wrapper.convert_config_db_to_sonic_yang.side_effect = \
+            lambda config: {f"sonic-{table.lower()}:sonic-{table.lower()}": {table: value}
+                            for table, value in config.items()}
+        config_wrapper.validate_config_db_config_as_sonic_yang.return_value = (True, None)
+        validator = ps.FullConfigMoveValidator(config_wrapper)
+        diff = ps.Diff(current_config, target_config)
+        port_move = ps.JsonMove(diff, OperationType.REPLACE, ["PORT", "Ethernet0", "mtu"], ["PORT", "Ethernet0", "mtu"])
+        vlan_move = ps.JsonMove(diff, OperationType.ADD, ["VLAN", "Vlan1000", "mtu"], ["VLAN", "Vlan1000", "mtu"])
+
+        # Act
+        self.assertTrue(validator.validate(port_move, diff))
+        self.assertTrue(validator.validate(vlan_move, diff.apply_move(port_move)))
+
+        # Assert
+        converted_tables = [list(call.args[0])[0] for call in config_wrapper.convert_config_db_to_sonic_yang.call_args_list]
+        self.assertListEqual(["PORT", "VLAN", "VLAN_MEMBER", "VLAN"], converted_tables)
+        config, sonic_yang = config_wrapper.validate_config_db_config_as_sonic_yang.call_args.args
+        self.assertDictEqual({"PORT": {"Ethernet0": {"mtu": "1500"}},
+                              "VLAN": {"Vlan1000": {"vlanid": "1000", "mtu": "1500"}},
+                              "VLAN_MEMBER": {}}, config)
+        self.assertDictEqual({f"sonic-{table.lower()}:sonic-{table.lower()}": {table: value}
+                              for table, value in config.items()}, sonic_yang)
+
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
         self.validator = ps.CreateOnlyMoveValidator(ps.PathAddressing())
@@ -3379,6 +3503,82 @@ class TestPatchSorter(unittest.TestCase):
 
         return ps.PatchSorter(config_wrapper, patch_wrapper, sort_algorithm_factory)
 
+class AnySortAlgorithmFactory:
+    def create(self, algorithm):
+        move_wrapper = ps.MoveWrapper([ps.LowLevelMoveGenerator(PathAddressing())], [ps.KeyLevelMoveGenerator()], [], [])
+        return ps.DfsSorter(move_wrapper)
+
+class TestPartitionedPatchSorter(unittest.TestCase):
+    def setUp(self):
+        self.current_config = {
+            "PORT": {"Ethernet0": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "DEVICE_METADATA": {"localhost": {"hostname": "any-host"}}
+        }
+        self.target_config = {
+            "PORT": {"Ethernet0": {"mtu": "1500"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "DEVICE_METADATA": {"localhost": {"hostname": "any-other-host"}}
+        }
+        self.patch = jsonpatch.make_patch(self.current_config, self.target_config)
+
+    def find_ref_paths(self, path, config):
+        if path == "/PORT" and "VLAN_MEMBER" in config:
+            return ["/VLAN_MEMBER/Vlan1000|Ethernet0"]
+        return []
+
+    def create_sorter(self, sort_algorithm_factory, max_workers=1):
+        config_wrapper = Mock()
+        config_wrapper.get_config_db_as_json.return_value = self.current_config
+        sorter = ps.PartitionedPatchSorter(config_wrapper, PatchWrapper(config_wrapper), sort_algorithm_factory,
+                                           max_workers=max_workers)
+        sorter.path_addressing.find_ref_paths = Mock(side_effect=self.find_ref_paths)
+        return sorter
+
+    def test_get_table_groups__referring_tables__same_group(self):
+        # Arrange
+        sorter = self.create_sorter(AnySortAlgorithmFactory())
+
+        # Act
+        actual = sorter.get_table_groups(self.current_config, self.target_config)
+
+        # Assert
+        self.assertListEqual([["DEVICE_METADATA"], ["PORT", "VLAN_MEMBER"]], actual)
+
+    def test_sort__independent_tables__groups_sorted_one_after_the_other(self):
+        for max_workers in [1, 2]:
+            with self.subTest(max_workers=max_workers):
+                # Arrange
+                sorter = self.create_sorter(AnySortAlgorithmFactory(), max_workers)
+
+                # Act
+                actual = sorter.sort(self.patch)
+
+                # Assert
+                self.assertEqual(3, len(actual))
+                self.assertEqual("/DEVICE_METADATA/localhost/hostname", list(actual[0].patch)[0]["path"])
+                simulated_config = self.current_config
+                for change in actual:
+                    simulated_config = change.apply(simulated_config)
+                self.assertEqual(self.target_config, simulated_config)
+
+    def test_sort__group_cannot_be_sorted__whole_patch_sorted(self):
+        # Arrange
+        any_move = ps.JsonMove.from_patch(jsonpatch.JsonPatch([{"op": "replace", "path": "", "value": self.target_config}]))
+        sort_algorithm = Mock()
+        sort_algorithm.sort.side_effect = \
+            lambda diff: [any_move] if diff == ps.Diff(self.current_config, self.target_config) else None
+        sort_algorithm_factory = Mock()
+        sort_algorithm_factory.create.return_value = sort_algorithm
+        sorter = self.create_sorter(sort_algorithm_factory)
+
+        # Act
+        actual = sorter.sort(self.patch)
+
+        # Assert
+        self.assertListEqual([JsonChange(any_move.patch)], actual)
+
 class TestChangeWrapper(unittest.TestCase):
     def setUp(self):
         config_splitter = ps.ConfigSplitter(ConfigWrapper(), [])
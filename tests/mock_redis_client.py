@@ -0,0 +1,190 @@
+""" In-memory redis clients and connector for the tests of bulk redis access """
+
+import fnmatch
+
+
+class MockRedisPipeline(object):
+    """
+    Queues the commands and runs them on the client at execute(), in one round trip.
+    The commands of a transaction are recorded in the client's transactions.
+    """
+
+    def __init__(self, client, transaction):
+        self.client = client
+        self.transaction = transaction
+        self.commands = []
+
+    def __getattr__(self, name):
+        if name not in MockRedisClient.COMMANDS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.client.round_trips += 1
+        if self.transaction:
+            self.client.transactions.append([(name, args) for name, args, _ in self.commands])
+        return [self.client.run_command(name, args, kwargs) for name, args, kwargs in self.commands]
+
+
+class MockRedisClient(object):
+    """
+    Redis client over data, {key: {field: value}}, holding hashes only.
+    Every call is a round trip. The commands in forbidden raise AssertionError
+    when called outside of a pipeline.
+    """
+
+    COMMANDS = ('hgetall', 'hget', 'hmget', 'hset', 'hdel', 'delete', 'exists', 'keys')
+
+    def __init__(self, data, forbidden=()):
+        self.data = data
+        self.forbidden = forbidden
+        self.round_trips = 0
+        self.patterns = []
+        self.transactions = []
+
+    def run_command(self, name, args, kwargs):
+        return getattr(self, '_' + name)(*args, **kwargs)
+
+    def _call(self, name, *args, **kwargs):
+        if name in self.forbidden:
+            raise AssertionError("{} must not be called directly".format(name.upper()))
+        self.round_trips += 1
+        return self.run_command(name, args, kwargs)
+
+    def _hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def _hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def _hmget(self, key, fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def _hset(self, key, field=None, value=None, mapping=None):
+        fvs = dict(mapping or {})
+        if field is not None:
+            fvs[field] = value
+        hash_value = self.data.setdefault(key, {})
+        added = len([field for field in fvs if field not in hash_value])
+        hash_value.update(fvs)
+        return added
+
+    def _hdel(self, key, *fields):
+        hash_value = self.data.get(key, {})
+        deleted = len([hash_value.pop(field) for field in fields if field in hash_value])
+        if key in self.data and not hash_value:
+            del self.data[key]
+        return deleted
+
+    def _delete(self, *keys):
+        return len([self.data.pop(key) for key in keys if key in self.data])
+
+    def _exists(self, key):
+        return int(key in self.data)
+
+    def _keys(self, pattern='*'):
+        self.patterns.append(pattern)
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def hgetall(self, key):
+        return self._call('hgetall', key)
+
+    def hget(self, key, field):
+        return self._call('hget', key, field)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        return self._call('hset', key, field, value, mapping=mapping)
+
+    def hdel(self, key, *fields):
+        return self._call('hdel', key, *fields)
+
+    def delete(self, *keys):
+        return self._call('delete', *keys)
+
+    def exists(self, key):
+        return self._call('exists', key)
+
+    def keys(self, pattern='*'):
+        return self._call('keys', pattern)
+
+
+class MockPipelineRedisClient(MockRedisClient):
+    """ Client supporting pipelines and HMGET """
+
+    def pipeline(self, transaction=True):
+        return MockRedisPipeline(self, transaction)
+
+    def hmget(self, key, fields):
+        return self._call('hmget', key, fields)
+
+
+class MockScanRedisClient(MockPipelineRedisClient):
+    """ Client supporting pipelines and SCAN, the number of SCAN iterations is counted in scans """
+
+    def __init__(self, data, forbidden=()):
+        super(MockScanRedisClient, self).__init__(data, forbidden)
+        self.scans = 0
+
+    def scan_iter(self, match='*', count=None):
+        self.scans += 1
+        self.patterns.append(match)
+        return iter([key for key in list(self.data) if fnmatch.fnmatchcase(key, match)])
+
+
+class MockConnector(object):
+    """
+    SonicV2Connector/ConfigDBConnector reading and writing every database
+    through the same client
+    """
+
+    ASIC_DB = 'ASIC_DB'
+    COUNTERS_DB = 'COUNTERS_DB'
+    CONFIG_DB = 'CONFIG_DB'
+    KEY_SEPARATOR = '|'
+    TABLE_NAME_SEPARATOR = '|'
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def get_db_separator(self, db_name):
+        return self.KEY_SEPARATOR
+
+    def get(self, db_name, key, field):
+        return self.client.hgetall(key).get(field)
+
+    def get_all(self, db_name, key):
+        return self.client.hgetall(key)
+
+    def serialize_key(self, key):
+        return self.KEY_SEPARATOR.join(key) if isinstance(key, tuple) else key
+
+    def deserialize_key(self, key):
+        tokens = key.split(self.KEY_SEPARATOR)
+        return tuple(tokens) if len(tokens) > 1 else key
+
+    def raw_to_typed(self, raw_data):
+        typed_data = {}
+        for key, value in raw_data.items():
+            if key == 'NULL':
+                continue
+            if key.endswith('@'):
+                typed_data[key[:-1]] = value.split(',')
+            else:
+                typed_data[key] = value
+        return typed_data
+
+    def typed_to_raw(self, typed_data):
+        if typed_data is None:
+            return None
+        if not typed_data:
+            return {'NULL': 'NULL'}
+        raw_data = {}
+        for key, value in typed_data.items():
+            if isinstance(value, list):
+                raw_data[key + '@'] = ','.join(value)
+            else:
+                raw_data[key] = str(value)
+        return raw_data
@@ -193,6 +193,11 @@ class TestMultiAsicPfcstat(object):
         os.environ["PATH"] += os.pathsep + scripts_path
         os.environ["UTILITIES_UNIT_TESTING"] = "2"
         os.environ["UTILITIES_UNIT_TESTING_TOPOLOGY"] = "multi_asic"
+        # show runs pfcstat in-process, in the multi ASIC topology of the tests
+        from .mock_tables import dbconnector
+        from .mock_tables import mock_multi_asic
+        importlib.reload(mock_multi_asic)
+        dbconnector.load_namespace_config()
         del_cached_stats()
 
     def test_pfc_counters_all(self):
@@ -239,5 +244,7 @@ class TestMultiAsicPfcstat(object):
         del_cached_stats()
         import mock_tables.mock_single_asic
         importlib.reload(mock_tables.mock_single_asic)
+        from .mock_tables import dbconnector
+        dbconnector.load_namespace_config()
         import pfcwd.main
         importlib.reload(pfcwd.main)
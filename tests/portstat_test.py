@@ -1,5 +1,6 @@
 import os
 import shutil
+from unittest import mock
 
 from click.testing import CliRunner
 
@@ -7,6 +8,7 @@ import clear.main as clear
 import show.main as show
 from .utils import get_result_and_return_code
 from utilities_common.cli import UserCache
+from utilities_common.general import load_module_from_source
 
 root_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(root_path)
@@ -398,6 +400,21 @@ class TestPortStat(object):
         assert return_code == 0
         verify_after_clear(result, intf_counter_after_clear)
 
+    def test_has_gearbox(self):
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        db = mock.MagicMock()
+        db.get_db_list.return_value = ['APPL_DB', 'COUNTERS_DB', 'GB_COUNTERS_DB']
+        db.exists.return_value = 1
+        with mock.patch.object(portstat, '_gearbox_namespaces', {}):
+            assert portstat.has_gearbox(db, 'asic0')
+            assert portstat.has_gearbox(db, 'asic0')
+            db.exists.assert_called_once_with('GB_COUNTERS_DB', 'COUNTERS_PORT_NAME_MAP')
+            # no scan of APPL_DB
+            db.keys.assert_not_called()
+
+            db.get_db_list.return_value = ['APPL_DB', 'COUNTERS_DB']
+            assert not portstat.has_gearbox(db, 'asic1')
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -7,7 +7,7 @@ import syslog
 import time
 from sonic_py_common import device_info
 from unittest.mock import MagicMock, patch
-from tests.route_check_test_data import APPL_DB, ARGS, ASIC_DB, CONFIG_DB, DEFAULT_CONFIG_DB, DESCR, OP_DEL, OP_SET, PRE, RESULT, RET, TEST_DATA, UPD
+from tests.route_check_test_data import APPL_DB, ARGS, ASIC_DB, CONFIG_DB, DEFAULT_CONFIG_DB, DESCR, INTF_TABLE, OP_DEL, OP_SET, PRE, RESULT, RET, ROUTE_TABLE, RT_ENTRY_KEY_PREFIX, RT_ENTRY_KEY_SUFFIX, RT_ENTRY_TABLE, TEST_DATA, UPD
 
 import pytest
 
@@ -233,6 +233,102 @@ def set_mock(mock_table, mock_conn, mock_sel, mock_subs, mock_config_db):
     mock_subs.side_effect = subscriber_side_effect
     mock_config_db.get_table = MagicMock(side_effect=config_db_side_effect)
 
+class StopDaemon(Exception):
+    pass
+
+
+def run_daemon(run, steps=()):
+    """
+    Call run, which runs the route check daemon, and do the next of steps
+    after each of its checks. The daemon is stopped after the last step.
+    :return results of the checks
+    """
+    results = []
+    check = route_check.RouteCheckDaemon.check
+
+    def check_and_step(daemon):
+        results.append(check(daemon))
+        if len(results) > len(steps):
+            raise StopDaemon()
+        steps[len(results) - 1]()
+        return results[-1]
+
+    with patch.object(route_check.RouteCheckDaemon, "check", autospec=True, side_effect=check_and_step):
+        with pytest.raises(StopDaemon):
+            run()
+    return results
+
+
+class mock_clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.now += secs
+
+
+class feed_subscriber:
+    """
+    Subscriber of a table, starting with the keys of the table, then
+    popping the messages fed by the test
+    """
+    def __init__(self, db, tbl):
+        self.db = db
+        self.tbl = tbl
+        self.msgs = [(k, OP_SET, v) for k, v in table_side_effect(db, tbl).data.items()]
+
+    def pop(self):
+        return self.msgs.pop(0) if self.msgs else ("", "", None)
+
+
+class route_feed:
+    """
+    Subscriptions & selector of the daemon. Selects return the states
+    queued in states, OBJECT once they are all returned.
+    """
+    def __init__(self):
+        self.subscribers = []
+        self.states = []
+
+    def subscriber(self, db, tbl):
+        subs = feed_subscriber(db, tbl)
+        self.subscribers.append(subs)
+        return subs
+
+    def selector(self):
+        return self
+
+    def addSelectable(self, subs):
+        return 0
+
+    def select(self, timeout):
+        state = self.states.pop(0) if self.states else route_check.swsscommon.Select.OBJECT
+        return (state, None)
+
+    def feed(self, db, tbl, key, op):
+        data = table_side_effect(db, tbl).data
+        if op == OP_SET:
+            data[key] = {}
+        else:
+            data.pop(key, None)
+        for subs in self.subscribers:
+            if (subs.db, subs.tbl) == (db, tbl):
+                subs.msgs.append((key, op, {}))
+
+    def set(self, db, tbl, key):
+        self.feed(db, tbl, key, OP_SET)
+
+    def delete(self, db, tbl, key):
+        self.feed(db, tbl, key, OP_DEL)
+
+
+def asic_key(prefix):
+    return RT_ENTRY_KEY_PREFIX + prefix + RT_ENTRY_KEY_SUFFIX
+
+
 class TestRouteCheck(object):
     def setup(self):
         pass
@@ -310,3 +406,189 @@ class TestRouteCheck(object):
         assert len(msg) == 5
         msg = route_check.print_message(syslog.LOG_ERR, "a", "b", "c", "d", "e", "f")
         assert len(msg) == 5
+
+    @pytest.mark.parametrize("test_num", TEST_DATA.keys())
+    def test_route_check_daemon(self, mock_dbs, test_num):
+        self.init()
+
+        ct_data = TEST_DATA[test_num]
+        set_test_case_data(ct_data)
+        logger.info("Running daemon test case {}: {}".format(test_num, ct_data[DESCR]))
+
+        with patch('sys.argv', ct_data[ARGS].split() + ["-d", "-g", "0"]):
+            [(ret, res)] = run_daemon(route_check.main)
+            assert ret == (ct_data[RET] if RET in ct_data else 0)
+            assert res == (ct_data[RESULT] if RESULT in ct_data else None)
+
+
+class TestRouteCheckDaemon(object):
+    @pytest.fixture
+    def feed(self):
+        feed = route_feed()
+        with patch("route_check.swsscommon.DBConnector", side_effect=conn_side_effect), \
+             patch("route_check.swsscommon.Table", side_effect=table_side_effect), \
+             patch("route_check.swsscommon.Select", side_effect=feed.selector), \
+             patch("route_check.swsscommon.SubscriberStateTable", side_effect=feed.subscriber), \
+             patch("route_check.swsscommon.ConfigDBConnector") as mock_config_db, \
+             patch("route_check.time", mock_clock()):
+            mock_config_db.return_value.get_table = MagicMock(side_effect=config_db_side_effect)
+            yield feed
+
+    def set_routes(self, appl_routes, asic_routes):
+        set_test_case_data({PRE: {
+            APPL_DB: {ROUTE_TABLE: {prefix: {} for prefix in appl_routes}, INTF_TABLE: {}},
+            ASIC_DB: {RT_ENTRY_TABLE: {asic_key(prefix): {} for prefix in asic_routes}}
+        }})
+
+    def test_grace_period(self, feed):
+        self.set_routes(["10.0.0.0/24", "10.1.0.0/24"], ["10.0.0.0/24"])
+        clock = route_check.time
+
+        def add_route():
+            clock.sleep(5)
+            feed.set(APPL_DB, ROUTE_TABLE, "10.2.0.0/24")
+
+        def add_route_entry():
+            clock.sleep(4)
+            feed.set(ASIC_DB, RT_ENTRY_TABLE, asic_key("10.2.0.0/24"))
+
+        results = run_daemon(lambda: route_check.RouteCheckDaemon(10).run(0),
+                             [add_route, add_route_entry, lambda: clock.sleep(1)])
+        # 10.1.0.0/24 is reported once missing for 10 seconds, 10.2.0.0/24
+        # reached ASIC-DB within the grace period
+        assert results == [(0, None), (0, None), (0, None),
+                           (-1, {"missed_ROUTE_TABLE_routes": ["10.1.0.0/24"]})]
+
+    def test_incremental_updates(self, feed):
+        self.set_routes(["10.0.0.0/24", "fc00::/64"], ["10.0.0.0/24", "fc00::/64"])
+
+        steps = [
+            lambda: feed.set(APPL_DB, ROUTE_TABLE, "10.1.0.0/24"),
+            lambda: feed.set(ASIC_DB, RT_ENTRY_TABLE, asic_key("10.1.0.0/24")),
+            # attributes update of a present route
+            lambda: feed.set(APPL_DB, ROUTE_TABLE, "10.1.0.0/24"),
+            lambda: feed.delete(APPL_DB, ROUTE_TABLE, "FC00::/64"),
+            lambda: feed.delete(APPL_DB, ROUTE_TABLE, "fc00::/64"),
+            lambda: feed.delete(ASIC_DB, RT_ENTRY_TABLE, asic_key("fc00::/64")),
+            lambda: feed.set(APPL_DB, INTF_TABLE, "Ethernet0:10.2.0.1/31"),
+            lambda: feed.set(ASIC_DB, RT_ENTRY_TABLE, asic_key("10.2.0.1/32")),
+        ]
+        results = run_daemon(lambda: route_check.RouteCheckDaemon(0).run(0), steps)
+        assert results == [
+            (0, None),
+            (-1, {"missed_ROUTE_TABLE_routes": ["10.1.0.0/24"]}),
+            (0, None),
+            (0, None),
+            # the DEL of a key never set is ignored
+            (0, None),
+            (-1, {"Unaccounted_ROUTE_ENTRY_TABLE_entries": ["fc00::/64"]}),
+            (0, None),
+            (-1, {"missed_INTF_TABLE_entries": ["10.2.0.1/32"]}),
+            (0, None),
+        ]
+        # all the updates came from the first subscriptions
+        assert len(feed.subscribers) == 3
+
+    def test_resync_on_subscription_lost(self, feed):
+        self.set_routes(["10.0.0.0/24", "10.1.0.0/24"], ["10.0.0.0/24"])
+        clock = route_check.time
+
+        def lose_subscription():
+            clock.sleep(4)
+            feed.states.append(route_check.swsscommon.Select.ERROR)
+            # changes made while the subscriptions are lost are only seen
+            # in the new baseline
+            table_side_effect(APPL_DB, ROUTE_TABLE).data["10.2.0.0/24"] = {}
+            table_side_effect(ASIC_DB, RT_ENTRY_TABLE).data.pop(asic_key("10.0.0.0/24"))
+
+        results = run_daemon(lambda: route_check.RouteCheckDaemon(10).run(0),
+                             [lose_subscription, lambda: clock.sleep(5), lambda: clock.sleep(10)])
+        assert len(feed.subscribers) == 6
+        # 10.1.0.0/24 keeps the time it was first seen across the resync
+        assert results == [
+            (0, None),
+            (0, None),
+            (-1, {"missed_ROUTE_TABLE_routes": ["10.1.0.0/24"]}),
+            (-1, {"missed_ROUTE_TABLE_routes": ["10.0.0.0/24", "10.1.0.0/24", "10.2.0.0/24"]}),
+        ]
+
+
+class TestRouteKey(object):
+    def test_ipv4_canonical(self):
+        assert route_check.route_key("10.1.0.32") == route_check.route_key("10.1.0.32/32")
+        assert route_check.route_key("10.1.0.0/24") != route_check.route_key("10.1.0.0/25")
+        assert route_check.route_key("10.1.0.0/24") != route_check.route_key("10.1.1.0/24")
+        assert route_check.key_prefix(route_check.route_key("10.1.0.32")) == "10.1.0.32/32"
+        assert route_check.key_prefix(route_check.route_key("0.0.0.0/0")) == "0.0.0.0/0"
+
+    def test_ipv6_canonical(self):
+        key = route_check.route_key("fc00:1::32/128")
+        assert route_check.route_key("fc00:1:0:0:0:0:0:32/128") == key
+        assert route_check.route_key("FC00:1::32") == key
+        assert route_check.route_key("fc00:0001::0032") == key
+        assert route_check.key_prefix(key) == "fc00:1::32/128"
+        assert route_check.key_prefix(route_check.route_key("::/0")) == "::/0"
+
+    def test_ipv4_ipv6_distinct(self):
+        # ::a01:20/32 has the same address bits and length as 10.1.0.32/32
+        assert route_check.route_key("::a01:20/32") != route_check.route_key("10.1.0.32/32")
+        assert route_check.route_key("::/0") != route_check.route_key("0.0.0.0/0")
+
+    def test_vrf_prefixed_keys(self):
+        assert route_check.route_prefix("Vrf_red:10.10.196.12/31") == "10.10.196.12/31"
+        assert route_check.route_prefix("Vrf-blue:FC00:1::32") == "fc00:1::32/128"
+        assert route_check.route_prefix("10.10.196.12/31") == "10.10.196.12/31"
+        routes = route_check.RouteSet(map(route_check.route_prefix, ["Vrf_red:10.10.196.12/31", "10.10.196.12/31"]))
+        assert routes.to_list() == ["10.10.196.12/31", "10.10.196.12/31"]
+
+    def test_is_local_key(self):
+        assert route_check.is_local_key(route_check.route_key("169.254.0.1/32"))
+        assert route_check.is_local_key(route_check.route_key("169.254.255.0/24"))
+        assert not route_check.is_local_key(route_check.route_key("169.253.0.1/32"))
+        assert not route_check.is_local_key(route_check.route_key("10.169.254.0/24"))
+        assert route_check.is_local_key(route_check.route_key("fe80::/64"))
+        assert route_check.is_local_key(route_check.route_key("febf:ffff::1/128"))
+        assert not route_check.is_local_key(route_check.route_key("fec0::/64"))
+        assert not route_check.is_local_key(route_check.route_key("fc00::a9fe:1/128"))
+
+
+class TestRouteSet(object):
+    def test_link_local_left_out(self):
+        routes = route_check.RouteSet(["10.0.0.0/24", "169.254.0.0/16", "fe80::1/128"])
+        assert len(routes) == 1
+        assert "169.254.0.0/16" not in routes
+        assert not routes.add_key(route_check.route_key("fe80::/10"))
+        assert routes.add_key(route_check.route_key("fc00::/64"))
+        assert routes.to_list() == ["10.0.0.0/24", "fc00::/64"]
+
+    def test_contains_any_spelling(self):
+        routes = route_check.RouteSet(["fc00:1::32", "10.1.0.32"])
+        assert "FC00:1:0:0::32/128" in routes
+        assert "10.1.0.32/32" in routes
+        assert "10.1.0.32/31" not in routes
+
+    def test_duplicate_keys(self):
+        routes = route_check.RouteSet(["10.0.0.0/24", "10.0.0.0/24", "fc00::/64"])
+        assert len(routes) == 3
+        assert routes.to_list() == ["10.0.0.0/24", "10.0.0.0/24", "fc00::/64"]
+
+        key = route_check.route_key("10.0.0.0/24")
+        routes.remove_key(key)
+        assert len(routes) == 2
+        assert "10.0.0.0/24" in routes
+        routes.remove_key(key)
+        assert "10.0.0.0/24" not in routes
+        routes.remove_key(key)
+        assert len(routes) == 1
+        assert key not in routes.keys
+
+    def test_missing_from(self):
+        routes = route_check.RouteSet(["10.0.0.0/24", "10.0.0.0/24", "10.1.0.0/24", "fc00::/64"])
+        once = route_check.RouteSet(["10.0.0.0/24"])
+        others = route_check.RouteSet(["fc00:0::/64", "10.2.0.0/24"])
+        # each route of the others covers one duplicate only
+        assert routes.missing_from(once, others) == ["10.0.0.0/24", "10.1.0.0/24"]
+        assert routes.missing_from(once, once, others) == ["10.1.0.0/24"]
+        assert routes.missing_from(others) == ["10.0.0.0/24", "10.0.0.0/24", "10.1.0.0/24"]
+        assert routes.missing_from() == routes.to_list()
+        assert once.missing_from(routes) == []
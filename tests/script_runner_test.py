@@ -0,0 +1,184 @@
+import errno
+import json
+import os
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+import show.main as show
+import utilities_common.cli as clicommon
+from utilities_common import script_runner
+from utilities_common.cli import UserCache
+
+from .portstat_test import intf_counters_before_clear
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+
+PORTSTAT = '''#!/usr/bin/env python3
+import json
+import sys
+from tabulate import tabulate
+
+def main(argv=None, name_to_alias=None):
+    name_to_alias = name_to_alias or (lambda name: name)
+    if '-x' in argv:
+        raise ValueError('bad counters')
+    table = [[name_to_alias('Ethernet0'), 'U', '10'], [name_to_alias('Ethernet4'), 'D', '0']]
+    if '-j' in argv:
+        print('Last cached time was 2022-01-01')
+        print(json.dumps({row[0]: {'STATE': row[1], 'RX_OK': row[2]} for row in table}, indent=4, sort_keys=True))
+        return
+    print(tabulate(table, ['IFACE', 'STATE', 'RX_OK']))
+    print('args: {}'.format(' '.join(argv)))
+    if '-e' in argv:
+        sys.exit(3)
+
+if __name__ == "__main__":
+    main()
+'''
+
+intf_counters_alias = """\
+  IFACE    STATE    RX_OK        RX_BPS    RX_UTIL    RX_ERR    RX_DRP    RX_OVR    TX_OK        TX_BPS    TX_UTIL    TX_ERR    TX_DRP    TX_OVR
+-------  -------  -------  ------------  ---------  --------  --------  --------  -------  ------------  ---------  --------  --------  --------
+   etp1        D        8  2000.00 MB/s     64.00%        10       100       N/A       10  1500.00 MB/s     48.00%       N/A       N/A       N/A
+   etp2      N/A        4   204.80 KB/s        N/A         0     1,000       N/A       40   204.85 KB/s        N/A       N/A       N/A       N/A
+   etp3      N/A        6  1350.00 KB/s        N/A       100        10       N/A       60    13.37 MB/s        N/A       N/A       N/A       N/A
+"""
+
+
+def name_to_alias(name):
+    return {'Ethernet0': 'etp1', 'Ethernet4': 'etp2', 'Ethernet100': 'fortyGigE0/100'}.get(name, name)
+
+
+class TestScriptRunner(object):
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.path = str(tmp_path / 'portstat')
+        with open(self.path, 'w') as f:
+            f.write(PORTSTAT)
+        os.chmod(self.path, 0o755)
+        monkeypatch.setenv('PATH', str(tmp_path) + os.pathsep + os.environ.get('PATH', ''))
+        monkeypatch.setattr(script_runner, '_loaded_scripts', {})
+
+    def test_get_script_argv(self):
+        assert script_runner.get_script_argv('portstat -c') == ['portstat', '-c']
+        assert script_runner.get_script_argv('portstat -c | grep Ethernet0') is None
+        assert script_runner.get_script_argv('portstat > /tmp/out') is None
+        assert script_runner.get_script_argv('sudo portstat') is None
+        assert script_runner.get_script_argv('show interfaces status') is None
+
+    def test_run_command(self):
+        output, returncode = script_runner.run_command('portstat -c')
+
+        assert returncode == 0
+        assert output.splitlines() == [
+            'IFACE      STATE      RX_OK',
+            '---------  -------  -------',
+            'Ethernet0  U             10',
+            'Ethernet4  D              0',
+            'args: -c',
+        ]
+
+    def test_run_command_exit_code(self):
+        output, returncode = script_runner.run_command('portstat -e')
+        assert returncode == 3
+        assert output.endswith('args: -e\n')
+
+        output, returncode = script_runner.run_command('portstat -x')
+        assert returncode == 1
+        assert output == ''
+
+    def test_run_command_alias_mode(self):
+        output, returncode = script_runner.run_command('portstat', name_to_alias)
+
+        assert returncode == 0
+        assert output.splitlines()[:4] == [
+            'IFACE    STATE      RX_OK',
+            '-------  -------  -------',
+            'etp1     U             10',
+            'etp2     D              0',
+        ]
+        # only the scripts displaying the aliases themselves run in alias mode
+        assert script_runner.run_command('dropstat -c show', name_to_alias) is None
+
+    def test_run_command_alias_mode_json(self):
+        output, returncode = script_runner.run_command('portstat -j', name_to_alias)
+
+        assert returncode == 0
+        lines = output.splitlines()
+        assert lines[0] == 'Last cached time was 2022-01-01'
+        assert lines[1:3] == ['{', '    "etp1": {']
+        assert json.loads('\n'.join(lines[1:])) == {
+            'etp1': {'RX_OK': '10', 'STATE': 'U'},
+            'etp2': {'RX_OK': '0', 'STATE': 'D'},
+        }
+
+    def test_script_loaded_once(self):
+        script_runner.run_command('portstat')
+        module = script_runner._loaded_scripts[self.path][1]
+        script_runner.run_command('portstat -c')
+        assert script_runner._loaded_scripts[self.path][1] is module
+
+        with open(self.path, 'a') as f:
+            f.write('\n')
+        os.utime(self.path, ns=(0, 0))
+        script_runner.run_command('portstat')
+        assert script_runner._loaded_scripts[self.path][1] is not module
+
+    def test_not_python_script(self):
+        with open(self.path, 'w') as f:
+            f.write('#!/bin/bash\necho portstat\n')
+
+        assert script_runner.run_command('portstat') is None
+
+
+class TestScriptsInProcess(object):
+    """ show runs the scripts in-process, against the mock DBs of the tests """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setenv('PATH', os.environ['PATH'] + os.pathsep + scripts_path)
+        monkeypatch.setenv('UTILITIES_UNIT_TESTING', '2')
+        UserCache('portstat').remove_all()
+        with mock.patch('subprocess.Popen', side_effect=AssertionError('script run in a new process')):
+            yield
+        UserCache('portstat').remove_all()
+
+    def test_show_intf_counters(self):
+        result = CliRunner().invoke(show.cli.commands["interfaces"].commands["counters"], [])
+
+        assert result.exit_code == 0
+        assert result.output == intf_counters_before_clear
+
+    def test_show_intf_counters_alias_mode(self, monkeypatch):
+        monkeypatch.setenv('SONIC_CLI_IFACE_MODE', 'alias')
+
+        result = CliRunner().invoke(show.cli.commands["interfaces"].commands["counters"], [])
+
+        assert result.exit_code == 0
+        assert result.output == intf_counters_alias
+
+    def test_portstat_json_alias_mode(self):
+        output, returncode = script_runner.run_command('portstat -j')
+        alias_output, alias_returncode = script_runner.run_command(
+            'portstat -j', clicommon.InterfaceAliasConverter().name_to_alias)
+
+        assert returncode == alias_returncode == 0
+        counters = json.loads(output)
+        assert json.loads(alias_output) == {
+            'etp1': counters['Ethernet0'],
+            'etp2': counters['Ethernet4'],
+            'etp3': counters['Ethernet8'],
+        }
+
+    def test_clear_write_failure(self):
+        module = script_runner.load_script('portstat')
+        with mock.patch.object(module, 'save_snapshot', side_effect=IOError(errno.EACCES, 'Permission denied')):
+            output, returncode = script_runner.run_command('portstat -c')
+
+        # as for a new process, nothing is printed and the exit code is the errno
+        assert output == ''
+        assert returncode == errno.EACCES
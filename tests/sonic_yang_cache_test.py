@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from utilities_common import sonic_yang_cache
+
+
+class MockSonicYang(object):
+    model_loads = 0
+
+    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0):
+        self.yang_dir = yang_dir
+        self.DEBUG = debug
+        self.ctx = object()
+        self.root = None
+        self.jIn = dict()
+        self.xlateJson = dict()
+        self.schema_modules = []
+
+    def _load_schema_module(self, yang_file):
+        self.schema_modules.append(os.path.basename(yang_file))
+        return yang_file
+
+    def loadYangModel(self):
+        MockSonicYang.model_loads += 1
+        for yang_file in sorted(os.listdir(self.yang_dir)):
+            self._load_schema_module(yang_file)
+        self.yangFiles = [name.split('.')[0] for name in self.schema_modules]
+        self.yJson = [{'module': {'@name': name}} for name in self.yangFiles]
+        self.confDbYangMap = {name.upper(): module for name, module in zip(self.yangFiles, self.yJson)}
+
+    def loadData(self, config):
+        self.jIn = config
+        self.xlateJson = dict(config)
+        self.root = object()
+
+
+class TestSonicYangCache(object):
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.yang_dir = str(tmp_path / 'yang-models')
+        os.mkdir(self.yang_dir)
+        for name in ('sonic-port', 'sonic-vlan'):
+            self.write_model(name)
+        MockSonicYang.model_loads = 0
+        monkeypatch.setattr(sonic_yang_cache.sonic_yang, 'SonicYang', MockSonicYang, raising=False)
+        monkeypatch.setattr(sonic_yang_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+        monkeypatch.setattr(sonic_yang_cache, '_loaded_models', {})
+
+    def write_model(self, name):
+        with open(os.path.join(self.yang_dir, name + '.yang'), 'w') as f:
+            f.write('module {} {{}}'.format(name))
+
+    def test_models_loaded_once_per_process(self):
+        sy1 = sonic_yang_cache.get_sonic_yang(self.yang_dir)
+        sy1.loadData({'PORT': {}})
+        sy2 = sonic_yang_cache.get_sonic_yang(self.yang_dir)
+
+        assert MockSonicYang.model_loads == 1
+        assert sy1 is not sy2
+        assert sy1.ctx is sy2.ctx
+        assert sy1.yJson is sy2.yJson
+        assert sy1.root is not None and sy2.root is None
+        assert sy2.jIn == {} and sy2.xlateJson == {}
+
+    def test_models_read_from_file_cache(self):
+        sy1 = sonic_yang_cache.get_sonic_yang(self.yang_dir)
+        # new process
+        sonic_yang_cache._loaded_models.clear()
+        sy2 = sonic_yang_cache.get_sonic_yang(self.yang_dir)
+
+        assert MockSonicYang.model_loads == 1
+        assert sy2.schema_modules == ['sonic-port.yang', 'sonic-vlan.yang']
+        assert sy2.yangFiles == sy1.yangFiles
+        assert sy2.confDbYangMap == sy1.confDbYangMap
+        assert sy2.confDbYangMap['SONIC-PORT'] is sy2.yJson[0]
+
+    def test_models_loaded_again_after_change(self):
+        sonic_yang_cache.get_sonic_yang(self.yang_dir)
+        self.write_model('sonic-acl')
+        sy = sonic_yang_cache.get_sonic_yang(self.yang_dir)
+
+        assert MockSonicYang.model_loads == 2
+        assert sy.yangFiles == ['sonic-acl', 'sonic-port', 'sonic-vlan']
+
+    def test_untrusted_file_cache_ignored(self):
+        sonic_yang_cache.get_sonic_yang(self.yang_dir)
+        for name in os.listdir(sonic_yang_cache.CACHE_DIR):
+            os.chmod(os.path.join(sonic_yang_cache.CACHE_DIR, name), 0o666)
+        sonic_yang_cache._loaded_models.clear()
+        sonic_yang_cache.get_sonic_yang(self.yang_dir)
+
+        assert MockSonicYang.model_loads == 2
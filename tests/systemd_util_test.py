@@ -0,0 +1,64 @@
+from unittest import mock
+
+from utilities_common import systemd_util
+
+SHOW_OUTPUT = """\
+Id=snmp.timer
+LastTriggerUSecMonotonic=0
+
+Id=swss.service
+ActiveState=active
+ActiveEnterTimestampMonotonic=12000000
+"""
+
+
+def run_command_side_effect(command, **kwargs):
+    if command == "systemctl list-dependencies --plain sonic-delayed.target | sed '1d'":
+        return 'snmp.timer\nmgmt-framework.timer\n', 0
+    if command == "systemctl is-enabled snmp.timer mgmt-framework.timer":
+        return 'enabled\ndisabled\n', 0
+    if command.startswith("systemctl show "):
+        return SHOW_OUTPUT, 0
+    return '', 0
+
+
+class TestSystemdUtil(object):
+    def test_parse_show_output(self):
+        assert systemd_util.parse_show_output(SHOW_OUTPUT) == [
+            {'Id': 'snmp.timer', 'LastTriggerUSecMonotonic': '0'},
+            {'Id': 'swss.service', 'ActiveState': 'active', 'ActiveEnterTimestampMonotonic': '12000000'},
+        ]
+
+    def test_get_enabled_units(self):
+        with mock.patch("utilities_common.cli.run_command",
+                        mock.MagicMock(side_effect=run_command_side_effect)) as mock_run_command:
+            systemd_units = systemd_util.SystemdUnits()
+            timers = systemd_units.get_dependencies("sonic-delayed.target")
+
+            assert systemd_units.get_enabled_units(timers) == ['snmp.timer']
+            assert systemd_units.get_enabled_units(timers) == ['snmp.timer']
+            assert mock_run_command.call_count == 2
+
+    def test_prefetch(self):
+        with mock.patch("utilities_common.cli.run_command",
+                        mock.MagicMock(side_effect=run_command_side_effect)) as mock_run_command:
+            systemd_units = systemd_util.SystemdUnits()
+            systemd_units.prefetch(['snmp.timer', 'swss.service'],
+                                   ['LastTriggerUSecMonotonic', 'ActiveState', 'ActiveEnterTimestampMonotonic'])
+
+            mock_run_command.assert_called_once_with(
+                "systemctl show snmp.timer swss.service "
+                "--property=Id,LastTriggerUSecMonotonic,ActiveState,ActiveEnterTimestampMonotonic",
+                return_cmd=True)
+            assert systemd_units.get_property('snmp.timer', 'LastTriggerUSecMonotonic') == '0'
+            assert systemd_units.get_property('snmp.timer', 'ActiveState') == ''
+            assert systemd_units.get_property('swss.service', 'ActiveState') == 'active'
+            assert mock_run_command.call_count == 1
+
+    def test_reset_failed(self):
+        with mock.patch("utilities_common.cli.run_command") as mock_run_command:
+            systemd_units = systemd_util.SystemdUnits()
+            systemd_units.reset_failed(['swss', 'snmp'])
+            systemd_units.reset_failed([])
+
+            mock_run_command.assert_called_once_with("systemctl reset-failed swss snmp")
@@ -305,6 +305,78 @@ test_data = {
                 },
             },
         }
+    },
+    "7": {
+        DESCR: "VNET route missed in ASIC DB for a VNET which is not checked",
+        ARGS: "vnet_route_check --vnet Vnet2",
+        PRE: {
+            APPL_DB: {
+                VXLAN_TUNNEL_TABLE: {
+                    "tunnel_v4": { "src_ip": "10.1.0.32" }
+                },
+                VNET_TABLE: {
+                    "Vnet1": { "vxlan_tunnel": "tunnel_v4", "vni": "10001" },
+                    "Vnet2": { "vxlan_tunnel": "tunnel_v4", "vni": "10002" }
+                },
+                INTF_TABLE: {
+                    "Vlan3001": { "vnet_name": "Vnet1" },
+                    "Vlan3002": { "vnet_name": "Vnet2" }
+                },
+                VNET_ROUTE_TABLE: {
+                    "Vnet1:50.1.1.0/24": { "ifname": "Vlan3001" },
+                    "Vnet2:60.1.1.0/24": { "ifname": "Vlan3002" }
+                }
+            },
+            ASIC_DB: {
+                ASIC_STATE: {
+                    RT_ENTRY_KEY_PREFIX + "60.1.1.0/24" + '\",\"switch_id\":\"oid:0x21000000000000\",\"vr\":\"oid:0x3000000000d4c\"}': {},
+                    "SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x6000000000d76": {
+                        "SAI_ROUTER_INTERFACE_ATTR_VIRTUAL_ROUTER_ID": "oid:0x3000000000d4b"
+                    },
+                    "SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x6000000000d77": {
+                        "SAI_ROUTER_INTERFACE_ATTR_VIRTUAL_ROUTER_ID": "oid:0x3000000000d4c"
+                    }
+                }
+            },
+            CNTR_DB: {
+                "COUNTERS_RIF_NAME_MAP": { "Vlan3001": "oid:0x6000000000d76", "Vlan3002": "oid:0x6000000000d77" }
+            }
+        }
+    },
+    "8": {
+        DESCR: "VNET IP2ME route present in ASIC DB only",
+        ARGS: "vnet_route_check",
+        PRE: {
+            APPL_DB: {
+                VXLAN_TUNNEL_TABLE: {
+                    "tunnel_v4": { "src_ip": "10.1.0.32" }
+                },
+                VNET_TABLE: {
+                    "Vnet1": { "vxlan_tunnel": "tunnel_v4", "vni": "10001" }
+                },
+                INTF_TABLE: {
+                    "Vlan3001": { "vnet_name": "Vnet1" },
+                    "Vlan3001:30.1.10.1/24": {},
+                    "Vlan3001:fc00:1::1/64": {}
+                },
+                VNET_ROUTE_TABLE: {
+                    "Vnet1:30.1.10.0/24": { "ifname": "Vlan3001" }
+                }
+            },
+            ASIC_DB: {
+                ASIC_STATE: {
+                    RT_ENTRY_KEY_PREFIX + "30.1.10.0/24" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "30.1.10.1/32" + RT_ENTRY_KEY_SUFFIX: {},
+                    RT_ENTRY_KEY_PREFIX + "fc00:1::1/128" + RT_ENTRY_KEY_SUFFIX: {},
+                    "SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x6000000000d76": {
+                        "SAI_ROUTER_INTERFACE_ATTR_VIRTUAL_ROUTER_ID": "oid:0x3000000000d4b"
+                    }
+                }
+            },
+            CNTR_DB: {
+                "COUNTERS_RIF_NAME_MAP": { "Vlan3001": "oid:0x6000000000d76" }
+            }
+        }
     }
 }
 
@@ -326,6 +398,12 @@ class Table:
         self.db = db
         self.tbl = tbl
         self.data = copy.deepcopy(self.get_val(current_test_data[PRE], [db, tbl]))
+        if not self.data and ":" in tbl:
+            # Table nested in another one, Eg: ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY
+            parent_tbl, prefix = tbl.split(":", 1)
+            parent_data = self.get_val(current_test_data[PRE], [db, parent_tbl])
+            self.data = {k[len(prefix) + 1:]: copy.deepcopy(v) for k, v in parent_data.items()
+                         if k.startswith(prefix + ":")}
 
     def get_val(self, d, keys):
         for k in keys:
@@ -5,6 +5,7 @@ import pytest
 import show.main as show
 from click.testing import CliRunner
 
+from .mock_tables import dbconnector
 from .wm_input.wm_test_vectors import *
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -18,7 +19,10 @@ sys.path.insert(0, modules_path)
 def q_multicast_wm_neg():
     print("Setup watermarkstat sample data: no queue multicast watermark counters")
     os.environ['WATERMARKSTAT_UNIT_TESTING'] = "1"
+    # show runs watermarkstat in-process, with the mock DBs of the tests
+    dbconnector.dedicated_dbs['COUNTERS_DB'] = os.path.join(test_path, "wm_input", "mock_db", "counters_db")
     yield
+    dbconnector.dedicated_dbs['COUNTERS_DB'] = None
     del os.environ['WATERMARKSTAT_UNIT_TESTING']
     print("Teardown watermarkstat sample data: no queue multicast watermark counters")
 
@@ -0,0 +1,259 @@
+# bulk redis access utility functions #
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of commands queued in a pipeline before it is flushed to redis
+PIPELINE_BATCH_SIZE = 1000
+# Number of keys asked to redis per SCAN call
+SCAN_BATCH_SIZE = 1000
+# Upper bound of namespaces processed at the same time
+MAX_NAMESPACE_WORKERS = 8
+
+_redis_clients = {}
+
+
+def _get_db_namespace(db):
+    namespace = getattr(db, 'namespace', None)
+    if namespace is None and hasattr(db, 'getNamespace'):
+        namespace = db.getNamespace()
+    return namespace or ''
+
+
+def get_pipeline_client(db, db_name):
+    """
+        Return a redis client for db_name that supports pipelining.
+
+        The connector's own client is used when it can pipeline, otherwise a
+        redis-py client is opened on the same unix socket. None is returned if
+        no such client can be built, callers then fall back to per-key access.
+    """
+    client = db.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+
+    namespace = _get_db_namespace(db)
+    cache_key = (namespace, db_name)
+    if cache_key in _redis_clients:
+        return _redis_clients[cache_key]
+
+    try:
+        import redis
+        from swsscommon.swsscommon import SonicDBConfig
+        pipeline_client = redis.Redis(unix_socket_path=SonicDBConfig.getDbSock(db_name, namespace),
+                                      db=SonicDBConfig.getDbId(db_name, namespace),
+                                      decode_responses=True)
+    except Exception:
+        pipeline_client = None
+
+    _redis_clients[cache_key] = pipeline_client
+    return pipeline_client
+
+
+def _queue_command(client, command):
+    name, args = command[:2]
+    kwargs = command[2] if len(command) > 2 else {}
+    return getattr(client, name)(*args, **kwargs)
+
+
+def _run_commands(client, commands, batch_size):
+    results = []
+    for start in range(0, len(commands), batch_size):
+        pipe = client.pipeline(transaction=False)
+        for command in commands[start:start + batch_size]:
+            _queue_command(pipe, command)
+        results.extend(pipe.execute())
+    return results
+
+
+def _run_pipelined(client, command, args_list, batch_size):
+    return _run_commands(client, [(command, args) for args in args_list], batch_size)
+
+
+def run_commands(db, db_name, commands, batch_size=PIPELINE_BATCH_SIZE):
+    """
+        Run commands, a list of (command, args) or (command, args, kwargs) such as
+        ('hset', (key,), {'mapping': fvs}), in pipelines of batch_size commands, in order.
+        Returns the list of the results. The commands are run one by one if
+        the client cannot pipeline.
+    """
+    commands = list(commands)
+    if not commands:
+        return []
+
+    client = get_pipeline_client(db, db_name)
+    if client is None:
+        client = db.get_redis_client(db_name)
+        return [_queue_command(client, command) for command in commands]
+
+    return _run_commands(client, commands, batch_size)
+
+
+def run_transactions(db, db_name, transactions, batch_size=PIPELINE_BATCH_SIZE):
+    """
+        Run transactions, lists of commands as taken by run_commands(), in order.
+        The transactions are batched in MULTI/EXEC blocks of about batch_size
+        commands, a transaction is never split over two blocks, so that no reader
+        sees it half applied.
+        Returns the list of the results of every transaction. The commands are
+        run one by one, without transaction, if the client cannot pipeline.
+    """
+    transactions = [list(transaction) for transaction in transactions]
+    if not transactions:
+        return []
+
+    client = get_pipeline_client(db, db_name)
+    if client is None:
+        client = db.get_redis_client(db_name)
+        return [[_queue_command(client, command) for command in transaction] for transaction in transactions]
+
+    results = []
+    batch = []
+    num_commands = 0
+
+    def flush():
+        pipe = client.pipeline(transaction=True)
+        for transaction in batch:
+            for command in transaction:
+                _queue_command(pipe, command)
+        batch_results = iter(pipe.execute())
+        results.extend([next(batch_results) for _ in transaction] for transaction in batch)
+
+    for transaction in transactions:
+        if batch and num_commands + len(transaction) > batch_size:
+            flush()
+            batch = []
+            num_commands = 0
+        batch.append(transaction)
+        num_commands += len(transaction)
+    flush()
+    return results
+
+
+def hgetall_bulk(db, db_name, keys, batch_size=PIPELINE_BATCH_SIZE):
+    """
+        Get all the field-values of every key in keys.
+        Returns a list of dicts in the order of keys, a missing key gives an empty dict.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    client = get_pipeline_client(db, db_name)
+    if client is None:
+        client = db.get_redis_client(db_name)
+        return [dict(client.hgetall(key) or {}) for key in keys]
+
+    return [dict(fvs or {}) for fvs in _run_pipelined(client, 'hgetall', [(key,) for key in keys], batch_size)]
+
+
+def hget_bulk(db, db_name, keys, field, batch_size=PIPELINE_BATCH_SIZE):
+    """
+        Get the value of field in every key in keys.
+        Returns a list in the order of keys, a missing key or field gives None.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    client = get_pipeline_client(db, db_name)
+    if client is None:
+        return [db.get(db_name, key, field) for key in keys]
+
+    return _run_pipelined(client, 'hget', [(key, field) for key in keys], batch_size)
+
+
+def hmget(db, db_name, key, fields, batch_size=PIPELINE_BATCH_SIZE):
+    """
+        Get the values of fields in the hash key with HMGETs of batch_size fields.
+        Returns a list in the order of fields, a missing field gives None.
+    """
+    fields = list(fields)
+    if not fields:
+        return []
+
+    client = get_pipeline_client(db, db_name)
+    if client is None or not hasattr(client, 'hmget'):
+        return [db.get(db_name, key, field) for field in fields]
+
+    values = []
+    for start in range(0, len(fields), batch_size):
+        values.extend(client.hmget(key, fields[start:start + batch_size]))
+    return values
+
+
+def scan_keys(db, db_name, pattern, count=SCAN_BATCH_SIZE):
+    """
+        Iterate over the keys of db_name matching pattern with cursor based SCAN calls,
+        so that redis is not blocked and the keys are not all held in memory.
+        Like SCAN, a key may be returned more than once if the keyspace is rehashed meanwhile.
+        Falls back to KEYS if the client cannot scan.
+    """
+    client = get_pipeline_client(db, db_name)
+    if client is None or not hasattr(client, 'scan_iter'):
+        client = db.get_redis_client(db_name)
+    if not hasattr(client, 'scan_iter'):
+        for key in client.keys(pattern) or []:
+            yield key
+        return
+
+    for key in client.scan_iter(match=pattern, count=count):
+        yield key
+
+
+class CachedDb(object):
+    """
+        Read-through view of a SonicV2Connector whose hashes are loaded in bulk.
+
+        get() and get_all() on a prefetched key are served from memory, a key
+        prefetched but missing from redis reads as missing. Any other access is
+        forwarded to the connector.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._hashes = {}
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def prefetch(self, db_name, keys):
+        keys = [key for key in keys if (db_name, key) not in self._hashes]
+        for key, fvs in zip(keys, hgetall_bulk(self._db, db_name, keys)):
+            self._hashes[(db_name, key)] = fvs
+
+    def get_all(self, db_name, key, *args, **kwargs):
+        fvs = self._hashes.get((db_name, key))
+        if fvs is None:
+            return self._db.get_all(db_name, key, *args, **kwargs)
+        return dict(fvs)
+
+    def get(self, db_name, key, field, *args, **kwargs):
+        fvs = self._hashes.get((db_name, key))
+        if fvs is None:
+            return self._db.get(db_name, key, field, *args, **kwargs)
+        return fvs.get(field)
+
+
+def iter_for_namespaces(func, ns_list, max_workers=MAX_NAMESPACE_WORKERS):
+    """
+        Call func(namespace) for every namespace in ns_list concurrently.
+        Yields the results in the order of ns_list, each one as soon as it and
+        the ones before it are done.
+    """
+    ns_list = list(ns_list)
+    if len(ns_list) <= 1:
+        for ns in ns_list:
+            yield func(ns)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ns_list))) as executor:
+        for result in executor.map(func, ns_list):
+            yield result
+
+
+def run_for_namespaces(func, ns_list, max_workers=MAX_NAMESPACE_WORKERS):
+    """
+        Call func(namespace) for every namespace in ns_list concurrently.
+        Returns the results in the order of ns_list.
+    """
+    return list(iter_for_namespaces(func, ns_list, max_workers))
@@ -13,6 +13,7 @@ import netaddr
 
 from natsort import natsorted
 from sonic_py_common import multi_asic
+from utilities_common import script_runner
 from utilities_common.db import Db
 from utilities_common.general import load_db_config
 
@@ -396,6 +397,16 @@ def run_command_in_alias_mode(command):
        in output with vendor-sepecific interface aliases.
     """
 
+    # The scripts run in-process display the aliases themselves
+    result = script_runner.run_command(command, iface_alias_converter.name_to_alias)
+    if result is not None:
+        output, rc = result
+        if output:
+            click.echo(output[:-1] if output.endswith('\n') else output)
+        if rc != 0:
+            sys.exit(rc)
+        return
+
     process = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
 
     while True:
@@ -535,6 +546,20 @@ def run_command(command, display_cmd=False, ignore_error=False, return_cmd=False
         run_command_in_alias_mode(command)
         sys.exit(0)
 
+    result = None if interactive_mode else script_runner.run_command(command)
+    if result is not None:
+        out, returncode = result
+        if return_cmd:
+            return out, returncode
+
+        if len(out) > 0:
+            click.echo(out.rstrip('\n'))
+
+        if returncode != 0 and not ignore_error:
+            sys.exit(returncode)
+
+        return
+
     proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
 
     if return_cmd:
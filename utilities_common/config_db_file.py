@@ -0,0 +1,144 @@
+# config_db.json file utility functions #
+
+import hashlib
+import json
+import os
+import tempfile
+
+from natsort import natsorted
+from swsscommon.swsscommon import ConfigDBConnector
+
+from utilities_common import bulk_db
+
+
+def entries_to_config(config_db, entries):
+    """
+        Convert the ConfigDb hashes of entries, {key: {field: value}}, to
+        {table: {key: entry}} in the format of 'sonic-cfggen -d --print-data':
+        the keys are not split and the entries are typed as ConfigDBConnector.get_config() does.
+        Keys without a table name are not config, e.g. CONFIG_DB_INITIALIZED, they are skipped.
+    """
+    separator = config_db.TABLE_NAME_SEPARATOR
+    tables = {}
+    for key, raw_data in entries.items():
+        if separator not in key:
+            continue
+        table, entry_key = key.split(separator, 1)
+        tables.setdefault(table, {})[entry_key] = config_db.raw_to_typed(raw_data)
+    return tables
+
+
+def config_to_entries(config_db, config):
+    """
+        Convert config in the format of config_db.json to the ConfigDb hashes,
+        {key: {field: value}}, as 'sonic-cfggen -j --write-to-db' would write them.
+    """
+    separator = config_db.TABLE_NAME_SEPARATOR
+    entries = {}
+    for table, table_data in config.items():
+        if not isinstance(table_data, dict):
+            continue
+        for entry_key, entry in table_data.items():
+            entries[table + separator + entry_key] = config_db.typed_to_raw(entry)
+    return entries
+
+
+def read_config_entries(config_db, keys):
+    """
+        Read the ConfigDb entries of keys with pipelined reads.
+        Returns them in the format of entries_to_config().
+    """
+    separator = config_db.TABLE_NAME_SEPARATOR
+    keys = [key for key in keys if separator in key]
+    return entries_to_config(config_db, dict(zip(keys, bulk_db.hgetall_bulk(config_db, config_db.CONFIG_DB, keys))))
+
+
+def get_config(namespace=None):
+    """
+        Read the whole ConfigDb of namespace, None for the host.
+    """
+    config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace or '')
+    config_db.connect()
+    return read_config_entries(config_db, list(bulk_db.scan_keys(config_db, config_db.CONFIG_DB, "*")))
+
+
+def dump_config(config):
+    """
+        Serialize config as 'config save' does: the tables and the keys sorted naturally,
+        the fields sorted, indented by 4 spaces.
+    """
+    sorted_config = {}
+    for table in natsorted(config):
+        entries = config[table]
+        if isinstance(entries, dict):
+            entries = {key: dict(sorted(entry.items())) if isinstance(entry, dict) else entry
+                       for key, entry in natsorted(entries.items())}
+        sorted_config[table] = entries
+    return json.dumps(sorted_config, indent=4)
+
+
+def get_file_digest(filename):
+    """
+        Return the sha256 digest of the file content, None if it cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def write_file_atomic(filename, content):
+    """
+        Write content to filename through a temporary file renamed into place, so that
+        filename is never left partially written. The file keeps its permissions.
+        Nothing is written if filename already has this content.
+        Returns True if the file was written.
+    """
+    filename = os.path.realpath(filename)
+    data = content.encode()
+    if get_file_digest(filename) == hashlib.sha256(data).hexdigest():
+        return False
+
+    dirname = os.path.dirname(filename)
+    try:
+        mode = os.stat(filename).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_file = tempfile.mkstemp(dir=dirname, prefix='.' + os.path.basename(filename) + '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, filename)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+
+    dir_fd = os.open(dirname, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return True
+
+
+def save_config(namespace_files):
+    """
+        Save the ConfigDb of every namespace to its file, namespace_files is a list of
+        (namespace, filename), namespace None being the host.
+        The namespaces are read concurrently, and every file is written atomically.
+        Returns the list of the files written, the files already up to date are not.
+    """
+    configs = bulk_db.run_for_namespaces(lambda namespace_file: dump_config(get_config(namespace_file[0])),
+                                         namespace_files)
+    return [filename for (_, filename), content in zip(namespace_files, configs)
+            if write_file_atomic(filename, content)]
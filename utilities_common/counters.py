@@ -0,0 +1,307 @@
+# counter family utility functions #
+
+import _pickle as pickle
+import datetime
+import mmap
+import struct
+import sys
+from array import array
+
+from utilities_common import bulk_db
+from utilities_common.netstat import STATUS_NA
+
+COUNTER_TABLE_PREFIX = "COUNTERS:"
+RATES_TABLE_PREFIX = "RATES:"
+
+# array typecodes: counters are unsigned 64 bit integers, rates are floats
+COUNTER_TYPECODE = 'Q'
+RATE_TYPECODE = 'd'
+
+# Counter snapshot file layout, integers are little endian:
+#   header     magic, version, reserved, counter count, row count, name width,
+#              saving time in microseconds since the epoch
+#   counters   counter count * name width bytes, NUL padded utf-8
+#   names      row count * name width bytes, NUL padded utf-8
+#   values     row count * counter count unsigned 64 bit integers, one row per object
+#   present    row count * counter count bytes, 0 for a counter missing in that row
+SNAPSHOT_MAGIC = b'SNCNTSNP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sHHIIIq')
+SNAPSHOT_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class CounterFamily(object):
+    """
+    Counters of a family of objects (ports, queues, priority groups...).
+
+    Values are stored column by column, one compact array per counter,
+    with one row per object. A parallel bytearray per column tells whether
+    the counter was present in the database for that row.
+    """
+
+    def __init__(self, counters, typecode=COUNTER_TYPECODE):
+        self.counters = tuple(counters)
+        self.typecode = typecode
+        self.names = []
+        self.rows = {}
+        self.columns = [array(typecode) for _ in self.counters]
+        self.present = [bytearray() for _ in self.counters]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    @classmethod
+    def load(cls, db, objects, counters, table_prefix=COUNTER_TABLE_PREFIX, typecode=COUNTER_TYPECODE):
+        """
+        Load the counters of every object with one batched read of COUNTERS_DB.
+
+        objects is an iterable of (name, oid) pairs, rows keep its order.
+        """
+        objects = list(objects)
+        family = cls(counters, typecode)
+        all_fvs = bulk_db.hgetall_bulk(db, db.COUNTERS_DB, [table_prefix + oid for _, oid in objects])
+        for (name, _), fvs in zip(objects, all_fvs):
+            family.append_fvs(name, fvs)
+        return family
+
+    @classmethod
+    def from_stats(cls, stats_dict, fields, typecode=COUNTER_TYPECODE):
+        """
+        Build a family from a dictionary of stats namedtuples, as kept in
+        the cached counters. fields are the namedtuple fields to use as counters.
+        A snapshot already holds a family, which is returned as is.
+        """
+        if isinstance(stats_dict, CounterSnapshot):
+            return stats_dict.family
+
+        family = cls(fields, typecode)
+        for name, stats in stats_dict.items():
+            if name == 'time':
+                continue
+            family.append_fvs(name, {field: getattr(stats, field) for field in fields})
+        return family
+
+    def append(self, name, values):
+        """
+        Add a row. values are aligned with the counters, None marks a missing counter.
+        """
+        self.rows[name] = len(self.names)
+        self.names.append(name)
+        for column, present, value in zip(self.columns, self.present, values):
+            if value is None:
+                column.append(0)
+                present.append(0)
+            else:
+                column.append(value)
+                present.append(1)
+
+    def append_fvs(self, name, fvs):
+        """
+        Add a row from the field-values of a counters hash.
+        """
+        parse = int if self.typecode == COUNTER_TYPECODE else float
+        values = []
+        for counter in self.counters:
+            try:
+                value = parse(fvs[counter])
+            except (KeyError, TypeError, ValueError):
+                value = None
+            values.append(value if value is None or value >= 0 else None)
+        self.append(name, values)
+
+    def get(self, name, counter):
+        row = self.rows[name]
+        pos = self.counters.index(counter)
+        return self.columns[pos][row] if self.present[pos][row] else None
+
+    def values(self, name):
+        """
+        Return the counters of a row, None for the missing ones.
+        """
+        row = self.rows[name]
+        return [column[row] if present[row] else None
+                for column, present in zip(self.columns, self.present)]
+
+    def stats(self, name, stats_cls):
+        """
+        Return a row as a stats namedtuple: counters as decimal strings,
+        rates as floats and STATUS_NA for the missing ones.
+        """
+        to_field = str if self.typecode == COUNTER_TYPECODE else float
+        return stats_cls._make([STATUS_NA if value is None else to_field(value)
+                                for value in self.values(name)])
+
+    def format(self, name):
+        """
+        Return the counters of a row formatted with thousands separators.
+        """
+        return [STATUS_NA if value is None else '{:,}'.format(value) for value in self.values(name)]
+
+    def diff(self, old):
+        """
+        Return the increase of the counters since old as a new family with the same rows.
+
+        A counter missing now stays missing, a counter missing in old counts
+        from 0 and the result is never negative. Rows or counters unknown to
+        old are kept as they are.
+        """
+        result = CounterFamily(self.counters, self.typecode)
+        result.names = list(self.names)
+        result.rows = dict(self.rows)
+        result.present = [bytearray(present) for present in self.present]
+
+        old_rows = [old.rows.get(name) for name in self.names]
+        for pos, (counter, column) in enumerate(zip(self.counters, self.columns)):
+            if counter not in old.counters:
+                result.columns[pos] = array(self.typecode, column)
+                continue
+            old_pos = old.counters.index(counter)
+            old_column, old_present = old.columns[old_pos], old.present[old_pos]
+            result.columns[pos] = array(self.typecode, (
+                max(0, value - old_column[row]) if row is not None and old_present[row] else value
+                for value, row in zip(column, old_rows)))
+        return result
+
+
+class CounterSnapshot(object):
+    """
+    Counters saved as a clear baseline.
+
+    Lookups behave like the stats dictionary the snapshot was saved from:
+    'time' gives the saving time and a row name gives a stats namedtuple,
+    built only when asked for.
+    """
+
+    def __init__(self, family, time, stats_cls):
+        self.family = family
+        self.time = time
+        self.stats_cls = stats_cls
+
+    def __len__(self):
+        # rows and 'time', as in the saved dictionary
+        return len(self.family) + 1
+
+    def __contains__(self, name):
+        return name == 'time' or name in self.family
+
+    def get(self, name, default=None):
+        if name == 'time':
+            return self.time
+        if name not in self.family:
+            return default
+        return self.family.stats(name, self.stats_cls)
+
+    @property
+    def names(self):
+        return self.family.names
+
+    def items(self):
+        yield 'time', self.time
+        for name in self.family.names:
+            yield name, self.family.stats(name, self.stats_cls)
+
+
+def save_snapshot(path, stats_dict, fields):
+    """
+    Save a stats dictionary (or a snapshot) to path in the snapshot format.
+    fields are the namedtuple fields to save.
+    """
+    write_snapshot(path, CounterFamily.from_stats(stats_dict, fields), stats_dict.get('time'))
+
+
+def load_snapshot(path, stats_cls):
+    """
+    Load the counters saved to path as a CounterSnapshot of stats_cls rows.
+    Files pickled by older versions are still read.
+    """
+    snapshot = read_snapshot(path)
+    if snapshot is not None:
+        family, time = snapshot
+        return CounterSnapshot(family, time, stats_cls)
+
+    with open(path, 'rb') as f:
+        stats_dict = pickle.load(f)
+    return CounterSnapshot(CounterFamily.from_stats(stats_dict, stats_cls._fields),
+                           stats_dict.get('time'), stats_cls)
+
+
+def write_snapshot(path, family, time=None):
+    """
+    Write the integer counters of a family to path in the snapshot format.
+    """
+    encoded_counters = [counter.encode() for counter in family.counters]
+    encoded_names = [name.encode() for name in family.names]
+    name_width = max([len(name) for name in encoded_counters + encoded_names] + [1])
+    name_width = (name_width + 7) // 8 * 8
+
+    counter_count, row_count = len(family.counters), len(family.names)
+    values = array(COUNTER_TYPECODE, bytes(8 * counter_count * row_count))
+    present = bytearray(counter_count * row_count)
+    for pos in range(counter_count):
+        values[pos::counter_count] = family.columns[pos]
+        present[pos::counter_count] = family.present[pos]
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    time_us = (time - SNAPSHOT_EPOCH) // datetime.timedelta(microseconds=1) if time is not None else -1
+
+    with open(path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0,
+                                     counter_count, row_count, name_width, time_us))
+        f.write(b''.join(name.ljust(name_width, b'\0') for name in encoded_counters))
+        f.write(b''.join(name.ljust(name_width, b'\0') for name in encoded_names))
+        f.write(values.tobytes())
+        f.write(present)
+
+
+def read_snapshot(path):
+    """
+    Read a file written by write_snapshot.
+
+    The file is memory mapped and the columns are sliced out of it without
+    building per-row objects. Returns a (family, time) tuple, or None if the
+    file is not in the snapshot format.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _parse_snapshot(data)
+
+
+def _parse_snapshot(data):
+    _, version, _, counter_count, row_count, name_width, time_us = SNAPSHOT_HEADER.unpack_from(data)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported counter snapshot version {}".format(version))
+
+    def read_names(offset, count):
+        return [data[offset + i * name_width:offset + (i + 1) * name_width].rstrip(b'\0').decode()
+                for i in range(count)]
+
+    offset = SNAPSHOT_HEADER.size
+    counters = read_names(offset, counter_count)
+    offset += counter_count * name_width
+    names = read_names(offset, row_count)
+    offset += row_count * name_width
+
+    cell_count = counter_count * row_count
+    values = array(COUNTER_TYPECODE)
+    values.frombytes(data[offset:offset + 8 * cell_count])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    offset += 8 * cell_count
+    present = bytearray(data[offset:offset + cell_count])
+    if len(values) != cell_count or len(present) != cell_count:
+        raise ValueError("Truncated counter snapshot")
+
+    family = CounterFamily(counters)
+    family.names = names
+    family.rows = {name: row for row, name in enumerate(names)}
+    family.columns = [values[pos::counter_count] for pos in range(counter_count)]
+    family.present = [present[pos::counter_count] for pos in range(counter_count)]
+
+    time = SNAPSHOT_EPOCH + datetime.timedelta(microseconds=time_us) if time_us >= 0 else None
+    return family, time
@@ -0,0 +1,243 @@
+# in-memory redis database snapshot #
+
+import copy
+import fnmatch
+
+from utilities_common import bulk_db
+
+
+class DbSnapshot(object):
+    """
+        In-memory view of one database of a ConfigDBConnector or SonicV2Connector.
+
+        The hashes of a table are read in bulk the first time the table is accessed,
+        all the reads and writes are then done in memory. The writes are only
+        applied to redis by commit(), in one transaction, after get_diff() has
+        computed the minimal set of changes. The methods of the connectors are
+        provided with the same behavior, any other attribute is forwarded to the
+        connector.
+
+        If data, {key: {field: value}}, is given, it is the whole database and
+        redis is never accessed, the connector need not be connected.
+    """
+
+    def __init__(self, db, db_name, data=None):
+        self._db = db
+        self._db_name = db_name
+        self._separator = db.get_db_separator(db_name)
+        self._data = {}
+        self._original = {}
+        self._loaded_tables = set()
+        self._scanned_patterns = set()
+        self._offline = data is not None
+        if self._offline:
+            self._original = {key: dict(fvs) for key, fvs in data.items() if fvs}
+            self._data = copy.deepcopy(self._original)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    @property
+    def db_name(self):
+        return self._db_name
+
+    def _get_table_name(self, key):
+        return key.split(self._separator, 1)[0]
+
+    def _read_keys(self, pattern):
+        return list(bulk_db.scan_keys(self._db, self._db_name, pattern))
+
+    def _read_hashes(self, keys):
+        return bulk_db.hgetall_bulk(self._db, self._db_name, keys)
+
+    def _add_hashes(self, keys, hashes):
+        for key, fvs in zip(keys, hashes):
+            if fvs and key not in self._original:
+                self._original[key] = fvs
+                self._data[key] = dict(fvs)
+
+    def _load_tables(self, tables):
+        if self._offline:
+            return
+        tables = [table for table in tables if table not in self._loaded_tables]
+        if not tables:
+            return
+        keys = []
+        for table in tables:
+            keys.extend(self._read_keys(table + self._separator + '*'))
+            keys.append(table)
+        self._add_hashes(keys, self._read_hashes(keys))
+        self._loaded_tables.update(tables)
+
+    def _load_pattern(self, pattern):
+        if self._offline or pattern in self._scanned_patterns:
+            return
+        prefix = pattern
+        for i, c in enumerate(pattern):
+            if c in '*?[\\':
+                prefix = pattern[:i]
+                break
+        if not prefix:
+            self.load()
+        elif self._separator in prefix:
+            self._load_tables([self._get_table_name(prefix)])
+        else:
+            self._load_tables(set(self._get_table_name(key) for key in self._read_keys(pattern)))
+        self._scanned_patterns.add(pattern)
+
+    def _get_hash(self, key):
+        self._load_tables([self._get_table_name(key)])
+        return self._data.get(key)
+
+    def load(self):
+        """
+            Read the whole database at once.
+        """
+        if self._offline:
+            return
+        keys = [key for key in self._read_keys('*') if key not in self._original]
+        self._add_hashes(keys, self._read_hashes(keys))
+        self._loaded_tables.update(self._get_table_name(key) for key in self._data)
+        self._scanned_patterns.add('*')
+
+    # SonicV2Connector methods, db_name is the snapshot database
+
+    def keys(self, db_name, pattern='*', *args, **kwargs):
+        self._load_pattern(pattern)
+        return [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+
+    def exists(self, db_name, key):
+        return self._get_hash(key) is not None
+
+    def get_all(self, db_name, key, *args, **kwargs):
+        return dict(self._get_hash(key) or {})
+
+    def get(self, db_name, key, field, *args, **kwargs):
+        return (self._get_hash(key) or {}).get(field)
+
+    def hexists(self, db_name, key, field):
+        return field in (self._get_hash(key) or {})
+
+    def set(self, db_name, key, field, value, *args, **kwargs):
+        self._get_hash(key)
+        self._data.setdefault(key, {})[field] = str(value)
+
+    def hmset(self, db_name, key, fvs):
+        self._get_hash(key)
+        self._data.setdefault(key, {}).update((field, str(value)) for field, value in fvs.items())
+
+    def hdel(self, db_name, key, field):
+        fvs = self._get_hash(key)
+        if fvs is None or field not in fvs:
+            return 0
+        del fvs[field]
+        if not fvs:
+            del self._data[key]
+        return 1
+
+    def delete(self, db_name, key, *args, **kwargs):
+        if self._get_hash(key) is None:
+            return 0
+        del self._data[key]
+        return 1
+
+    # ConfigDBConnector methods
+
+    def _get_entry_key(self, table, key):
+        return '{}{}{}'.format(table.upper(), self._separator, self._db.serialize_key(key))
+
+    def get_entry(self, table, key):
+        return self._db.raw_to_typed(self.get_all(self._db_name, self._get_entry_key(table, key))) or {}
+
+    def set_entry(self, table, key, data):
+        entry_key = self._get_entry_key(table, key)
+        if data is None:
+            self.delete(self._db_name, entry_key)
+            return
+        self._get_hash(entry_key)
+        self._data[entry_key] = {field: str(value) for field, value in self._db.typed_to_raw(data).items()}
+
+    def mod_entry(self, table, key, data):
+        entry_key = self._get_entry_key(table, key)
+        if data is None:
+            self.delete(self._db_name, entry_key)
+            return
+        self.hmset(self._db_name, entry_key, self._db.typed_to_raw(data))
+
+    def get_keys(self, table, split=True):
+        prefix = table.upper() + self._separator
+        keys = []
+        for key in self.keys(self._db_name, prefix + '*'):
+            row = key[len(prefix):]
+            keys.append(self._db.deserialize_key(row) if split else row)
+        return keys
+
+    def get_table(self, table):
+        prefix = table.upper() + self._separator
+        data = {}
+        for key in self.keys(self._db_name, prefix + '*'):
+            entry = self._db.raw_to_typed(self._data[key])
+            if entry is not None:
+                data[self._db.deserialize_key(key[len(prefix):])] = entry
+        return data
+
+    def delete_table(self, table):
+        for key in self.keys(self._db_name, table.upper() + self._separator + '*'):
+            del self._data[key]
+
+    def get_data(self):
+        """
+            Return the content of the snapshot as {key: {field: value}}.
+        """
+        self.load()
+        return copy.deepcopy(self._data)
+
+    # changes
+
+    def get_diff(self):
+        """
+            Return the changes made to the snapshot: {key: None} for a deleted key,
+            {key: {'set': {field: value}, 'del': [field]}} for an added or modified one.
+        """
+        diff = {}
+        for key in set(self._original) | set(self._data):
+            original = self._original.get(key)
+            current = self._data.get(key)
+            if original == current:
+                continue
+            if current is None:
+                diff[key] = None
+                continue
+            original = original or {}
+            diff[key] = {
+                'set': {field: value for field, value in current.items() if original.get(field) != value},
+                'del': sorted(field for field in original if field not in current),
+            }
+        return diff
+
+    def commit(self):
+        """
+            Apply the changes to redis in one transaction, the changes of a
+            snapshot created from data are only accepted.
+            Returns the changes applied.
+        """
+        diff = self.get_diff()
+        if not diff or self._offline:
+            self._original = copy.deepcopy(self._data)
+            return diff
+
+        client = bulk_db.get_pipeline_client(self._db, self._db_name)
+        pipe = client.pipeline(transaction=True) if client is not None else self._db.get_redis_client(self._db_name)
+        for key, changes in sorted(diff.items()):
+            if changes is None:
+                pipe.delete(key)
+                continue
+            for field in changes['del']:
+                pipe.hdel(key, field)
+            for field, value in changes['set'].items():
+                pipe.hset(key, field, value)
+        if client is not None:
+            pipe.execute()
+
+        self._original = copy.deepcopy(self._data)
+        return diff
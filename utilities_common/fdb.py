@@ -0,0 +1,145 @@
+# FDB entries utility functions #
+
+import json
+from collections import namedtuple
+
+from utilities_common import bulk_db
+
+FDB_ENTRY_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:"
+VLAN_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_VLAN:"
+BRIDGE_PORT_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:"
+OID_PREFIX = "oid:0x"
+
+# type is 'Static' or 'Dynamic', port is None for a bridge port without name
+FdbEntry = namedtuple('FdbEntry', ['vlan_id', 'mac', 'port', 'type'])
+
+
+def get_bridge_port_map(db):
+    """
+        Return the map of bridge port oids to port oids, both without the "oid:0x" prefix,
+        as port_util.get_bridge_port_map does, using pipelined reads.
+        None is returned if there is no bridge port.
+    """
+    keys = list(bulk_db.scan_keys(db, db.ASIC_DB, BRIDGE_PORT_PREFIX + "*"))
+    if not keys:
+        return None
+
+    if_br_oid_map = {}
+    offset = len(BRIDGE_PORT_PREFIX + OID_PREFIX)
+    for key, ent in zip(keys, bulk_db.hgetall_bulk(db, db.ASIC_DB, keys)):
+        if "SAI_BRIDGE_PORT_ATTR_PORT_ID" in ent:
+            if_br_oid_map[key[offset:]] = ent["SAI_BRIDGE_PORT_ATTR_PORT_ID"][len(OID_PREFIX):]
+    return if_br_oid_map
+
+
+def get_bridge_port_names(if_br_oid_map, if_oid_map):
+    """
+        Return the map of bridge port oids to interface names, from the maps of port_util.
+        A port without interface name is named by its oid.
+    """
+    return {OID_PREFIX + br_port_id: if_oid_map.get(port_id, port_id)
+            for br_port_id, port_id in (if_br_oid_map or {}).items()}
+
+
+class FdbResolver(object):
+    """
+        Load the FDB entries of ASIC_DB and resolve their vlan and port.
+
+        Entries are read with SCAN and pipelined HGETALLs, a page at a time.
+        The vlan of every bvid is read once, with all the VLAN objects.
+        The mac and vlan filters are pushed down to the key patterns.
+    """
+
+    def __init__(self, db, bridge_port_names):
+        self.db = db
+        self.bridge_port_names = bridge_port_names
+        self.bvid_vlans = None
+
+    def get_bvid_vlans(self):
+        """
+            Return the map of VLAN object oids (bvids) to vlan ids. The vlan id is None
+            for a VLAN object without vlan id, e.g. the default VLAN.
+        """
+        if self.bvid_vlans is None:
+            keys = list(bulk_db.scan_keys(self.db, self.db.ASIC_DB, VLAN_PREFIX + "*"))
+            self.bvid_vlans = {}
+            for key, ent in zip(keys, bulk_db.hgetall_bulk(self.db, self.db.ASIC_DB, keys)):
+                if ent:
+                    self.bvid_vlans[key[len(VLAN_PREFIX):]] = ent.get("SAI_VLAN_ATTR_VLAN_ID")
+        return self.bvid_vlans
+
+    def get_bvids(self, vlan_id):
+        return [bvid for bvid, bvid_vlan_id in self.get_bvid_vlans().items()
+                if bvid_vlan_id is not None and int(bvid_vlan_id) == vlan_id]
+
+    def _get_patterns(self, vlan_id, mac):
+        if mac is not None:
+            return [FDB_ENTRY_PREFIX + '*"mac":"{}"*'.format(mac)]
+        if vlan_id is not None:
+            return [FDB_ENTRY_PREFIX + '*"bvid":"{}"*'.format(bvid) for bvid in self.get_bvids(vlan_id)] + \
+                   [FDB_ENTRY_PREFIX + '*"vlan":"{}"*'.format(vlan_id)]
+        return [FDB_ENTRY_PREFIX + "*"]
+
+    def _get_vlan_id(self, fdb, skip_unknown_bvid):
+        if 'vlan' in fdb:
+            return int(fdb["vlan"])
+        if 'bvid' not in fdb:
+            # no possibility to find the Vlan id
+            return None
+
+        bvid = fdb["bvid"]
+        bvid_vlans = self.get_bvid_vlans()
+        if bvid not in bvid_vlans:
+            if skip_unknown_bvid:
+                return None
+            raise ValueError("Failed to get Vlan id for bvid {}".format(bvid))
+        # None for the FDB entries linked to the default Vlan, caused by untagged traffic
+        vlan_id = bvid_vlans[bvid]
+        return None if vlan_id is None else int(vlan_id)
+
+    def get_entries(self, vlan_id=None, mac=None, port=None, entry_type=None,
+                    skip_unknown_bvid=False, skip_unknown_port=True):
+        """
+            Return the FdbEntry tuples matching the given filters, in the order of the keys.
+
+            mac is compared as is, ASIC_DB macs are upper case. An entry on a bvid without
+            VLAN object raises ValueError, unless skip_unknown_bvid is set.
+        """
+        if not self.bridge_port_names and skip_unknown_port:
+            return []
+
+        entries = []
+        seen_keys = set()
+        for pattern in self._get_patterns(vlan_id, mac):
+            # SCAN may return a key more than once
+            keys = (key for key in bulk_db.scan_keys(self.db, self.db.ASIC_DB, pattern)
+                    if key not in seen_keys and not seen_keys.add(key))
+            while True:
+                page = [key for _, key in zip(range(bulk_db.PIPELINE_BATCH_SIZE), keys)]
+                if not page:
+                    break
+                for key, ent in zip(page, bulk_db.hgetall_bulk(self.db, self.db.ASIC_DB, page)):
+                    entry = self._resolve(key, ent, skip_unknown_bvid, skip_unknown_port)
+                    if entry is not None and \
+                            (vlan_id is None or entry.vlan_id == vlan_id) and \
+                            (mac is None or entry.mac == mac) and \
+                            (port is None or entry.port == port) and \
+                            (entry_type is None or entry.type == entry_type):
+                        entries.append(entry)
+        return entries
+
+    def _resolve(self, key, ent, skip_unknown_bvid, skip_unknown_port):
+        fdb = json.loads(key[len(FDB_ENTRY_PREFIX):])
+        if not fdb or not ent:
+            return None
+
+        port = self.bridge_port_names.get(ent["SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID"])
+        if port is None and skip_unknown_port:
+            return None
+
+        vlan_id = self._get_vlan_id(fdb, skip_unknown_bvid)
+        if vlan_id is None:
+            return None
+
+        fdb_type = ['Dynamic', 'Static'][ent["SAI_FDB_ENTRY_ATTR_TYPE"] == "SAI_FDB_ENTRY_TYPE_STATIC"]
+        return FdbEntry(vlan_id, fdb["mac"], port, fdb_type)
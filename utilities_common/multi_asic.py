@@ -27,22 +27,25 @@ class MultiAsic(object):
     def get_display_option(self):
         return self.display_option
 
-    def is_object_internal(self, object_type, cli_object):
+    def is_object_internal(self, object_type, cli_object, namespace=None):
         '''
         The function checks if a CLI object is internal and returns true or false.
         Internal objects are port or portchannel which are connected to other
         ports or portchannels within a multi ASIC device.
 
+        The check is done in the current namespace unless namespace is given.
         For single asic, this function is not applicable
         '''
+        if namespace is None:
+            namespace = self.current_namespace
         if object_type == constants.PORT_OBJ:
-            return multi_asic.is_port_internal(cli_object, self.current_namespace)
+            return multi_asic.is_port_internal(cli_object, namespace)
         elif object_type == constants.PORT_CHANNEL_OBJ:
-            return multi_asic.is_port_channel_internal(cli_object, self.current_namespace)
+            return multi_asic.is_port_channel_internal(cli_object, namespace)
         elif object_type == constants.BGP_NEIGH_OBJ:
-            return multi_asic.is_bgp_session_internal(cli_object, self.current_namespace)
+            return multi_asic.is_bgp_session_internal(cli_object, namespace)
 
-    def skip_display(self, object_type, cli_object):
+    def skip_display(self, object_type, cli_object, namespace=None):
         '''
         The function determines if the passed cli_object has to be displayed or not.
         returns true if the display_option is external and  the cli object is internal.
@@ -53,7 +56,7 @@ class MultiAsic(object):
             return False
         if self.get_display_option() == constants.DISPLAY_ALL:
             return False
-        return self.is_object_internal(object_type, cli_object)
+        return self.is_object_internal(object_type, cli_object, namespace)
 
     def get_ns_list_based_on_options(self):
         ns_list = []
@@ -0,0 +1,131 @@
+# in-process script runner utility functions #
+
+import contextlib
+import io
+import os
+import shlex
+import shutil
+import sys
+import traceback
+
+from utilities_common.general import load_module_from_source
+
+# Scripts run in the CLI process, by a call of their main(argv), instead of in a
+# new Python interpreter. They read the DBs and print, their clear and delete
+# options (-c, -d) also write or remove their counter cache files, and
+# 'watermarkstat -c' publishes a clear request to APPL_DB. A failure, such as a
+# cache file which cannot be written, is reported as by a new process: in the
+# output, on stderr and by the exit code.
+# The value tells whether main() also takes name_to_alias, with which the
+# script translates the interface names it displays in alias mode.
+IN_PROCESS_SCRIPTS = {
+    'portstat': True,
+    'intfstat': True,
+    'intfutil': False,
+    'pfcstat': True,
+    'queuestat': True,
+    'fdbshow': True,
+    'nbrshow': True,
+    'watermarkstat': False,
+    'pg-drop': False,
+    'dropstat': False,
+}
+
+# Characters making a command depend on the shell
+SHELL_CHARACTERS = set('|&;<>()$`\\"\'*?[]~{}#\n')
+
+# Scripts loaded as modules, by path, with their modification time
+_loaded_scripts = {}
+
+
+def get_script_argv(command):
+    """
+        Return the argv of command if it can run in-process, None otherwise.
+        Only plain invocations of IN_PROCESS_SCRIPTS qualify: no sudo, environment,
+        quoting, redirection or pipe.
+    """
+    if SHELL_CHARACTERS.intersection(command):
+        return None
+
+    argv = shlex.split(command)
+    if not argv or argv[0] not in IN_PROCESS_SCRIPTS:
+        return None
+    return argv
+
+
+def load_script(name):
+    """
+        Return the script name found in PATH loaded as a module, None if it is not
+        a Python script with a main(argv) function.
+        The module is loaded again when the script file changes.
+    """
+    path = shutil.which(name)
+    if path is None:
+        return None
+
+    mtime = os.stat(path).st_mtime_ns
+    loaded = _loaded_scripts.get(path)
+    if loaded is None or loaded[0] != mtime:
+        with open(path) as f:
+            first_line = f.readline()
+        if not first_line.startswith('#!') or 'python' not in first_line:
+            return None
+        loaded = (mtime, load_module_from_source(name, path))
+        _loaded_scripts[path] = loaded
+
+    module = loaded[1]
+    return module if callable(getattr(module, 'main', None)) else None
+
+
+def run_script(argv, name_to_alias=None):
+    """
+        Run the script argv[0] with the arguments argv[1:] in the current process,
+        by calling the main(argv) function of the script loaded as a module, with
+        its standard output captured.
+        Only the interpreter start-up and the imports are saved.
+
+        If name_to_alias is given, it is passed to main() which displays the
+        interface names translated with it.
+
+        Returns (output, returncode), or None if the script cannot run in-process.
+    """
+    if name_to_alias is not None and not IN_PROCESS_SCRIPTS.get(argv[0]):
+        return None
+
+    module = load_script(argv[0])
+    if module is None:
+        return None
+
+    output = io.StringIO()
+    returncode = 0
+    # The errors of the script are not part of its output, as for a new process
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(sys.__stderr__):
+        try:
+            if name_to_alias is not None:
+                module.main(argv[1:], name_to_alias=name_to_alias)
+            else:
+                module.main(argv[1:])
+        except SystemExit as e:
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+
+    return output.getvalue(), returncode
+
+
+def run_command(command, name_to_alias=None):
+    """
+        Run command in-process if possible, see run_script().
+        Returns (output, returncode), or None if command must run in a shell.
+    """
+    argv = get_script_argv(command)
+    if argv is None:
+        return None
+    return run_script(argv, name_to_alias)
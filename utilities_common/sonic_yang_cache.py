@@ -0,0 +1,120 @@
+# loaded sonic_yang model utility functions #
+
+import copy
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+import sonic_yang
+
+YANG_DIR = "/usr/local/yang-models"
+# Directory of the serialized models, keyed by the fingerprint of the YANG directory
+CACHE_DIR = "/var/cache/sonic-utilities/sonic-yang"
+
+# Fields filled by loadYangModel() that only depend on the YANG models.
+# They are shared by all the SonicYang instances returned by get_sonic_yang().
+MODEL_FIELDS = ('yangFiles', 'yJson', 'confDbYangMap', 'preProcessedYang')
+
+_loaded_models = {}
+
+
+def _get_yang_files(yang_dir):
+    return sorted(glob.glob(os.path.join(yang_dir, "*.yang")))
+
+
+def get_fingerprint(yang_dir):
+    """
+        Return a digest of the names, sizes and modification times of the YANG
+        models in yang_dir and of the sonic_yang sources parsing them.
+    """
+    digest = hashlib.sha256()
+    sonic_yang_dir = os.path.dirname(os.path.abspath(sonic_yang.__file__))
+    for path in _get_yang_files(yang_dir) + sorted(glob.glob(os.path.join(sonic_yang_dir, "sonic_yang*.py"))):
+        stat = os.stat(path)
+        digest.update("{}:{}:{}\n".format(path, stat.st_size, stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def _get_cache_file(fingerprint, sonic_yang_options):
+    return os.path.join(CACHE_DIR, "{}-{}.pickle".format(fingerprint, sonic_yang_options))
+
+
+def _read_cache(cache_file):
+    try:
+        # Only trust files written by root or by the current user
+        stat = os.stat(cache_file)
+        if stat.st_uid not in (0, os.getuid()) or stat.st_mode & 0o022:
+            return None
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _write_cache(cache_file, model_fields):
+    try:
+        os.makedirs(CACHE_DIR, mode=0o755, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(model_fields, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        # The cache is an optimization only, e.g. the CLI may run without write access
+        pass
+
+
+def _load_models(yang_dir, fingerprint, debug, print_log_enabled, sonic_yang_options):
+    sy = sonic_yang.SonicYang(yang_dir, debug=debug, print_log_enabled=print_log_enabled,
+                              sonic_yang_options=sonic_yang_options)
+    cache_file = _get_cache_file(fingerprint, sonic_yang_options)
+    model_fields = _read_cache(cache_file)
+    if model_fields is not None:
+        # libyang schemas cannot be serialized, they are parsed again but the
+        # JSON conversion of the models, which is the slow part, is skipped
+        for yang_file in _get_yang_files(yang_dir):
+            if sy._load_schema_module(yang_file) is None:
+                raise sonic_yang.SonicYangException("Could not load module {}".format(yang_file))
+        for field, value in model_fields.items():
+            setattr(sy, field, value)
+        return sy
+
+    sy.loadYangModel()
+    _write_cache(cache_file, {field: getattr(sy, field) for field in MODEL_FIELDS if hasattr(sy, field)})
+    return sy
+
+
+def reset_data_tree(sy):
+    """
+        Drop the config data loaded in sy, keeping its loaded models.
+    """
+    sy.root = None
+    sy.jIn = dict()
+    sy.xlateJson = dict()
+    sy.revXlateJson = dict()
+    sy.tablesWithOutYang = dict()
+    sy.elementPath = []
+    return sy
+
+
+def get_sonic_yang(yang_dir=YANG_DIR, debug=False, print_log_enabled=True, sonic_yang_options=0):
+    """
+        Return a SonicYang with all the models of yang_dir loaded and no data.
+
+        The models are loaded once per process and, through a file cache, once
+        per change of yang_dir. Every call returns a new instance sharing the
+        loaded models, its data tree can be used independently of the others.
+    """
+    key = (yang_dir, sonic_yang_options)
+    fingerprint = get_fingerprint(yang_dir)
+    loaded = _loaded_models.get(key)
+    if loaded is None or loaded[0] != fingerprint:
+        loaded = (fingerprint, _load_models(yang_dir, fingerprint, debug, print_log_enabled, sonic_yang_options))
+        _loaded_models[key] = loaded
+
+    sy = reset_data_tree(copy.copy(loaded[1]))
+    sy.DEBUG = debug
+    sy.print_log_enabled = print_log_enabled
+    return sy
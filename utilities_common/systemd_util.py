@@ -0,0 +1,86 @@
+# systemd query utility functions #
+
+import utilities_common.cli as clicommon
+
+
+def parse_show_output(output):
+    """
+        Parse the output of 'systemctl show' for several units: one block of
+        property=value lines per unit, the blocks separated by empty lines.
+        Returns the list of the blocks, as dicts.
+    """
+    blocks = []
+    properties = None
+    for line in output.splitlines():
+        if not line.strip():
+            properties = None
+            continue
+        if properties is None:
+            properties = {}
+            blocks.append(properties)
+        name, _, value = line.partition('=')
+        properties[name.strip()] = value.strip()
+    return blocks
+
+
+class SystemdUnits(object):
+    """
+        Query systemd about units with one systemctl command for all the units
+        instead of one per unit and property. The results are cached for the
+        lifetime of the object.
+    """
+    def __init__(self):
+        self._dependencies = {}
+        self._unit_file_states = {}
+        self._properties = {}
+
+    def get_dependencies(self, target):
+        """
+            Return the units target depends on.
+        """
+        if target not in self._dependencies:
+            out, _ = clicommon.run_command("systemctl list-dependencies --plain {} | sed '1d'".format(target),
+                                           return_cmd=True)
+            self._dependencies[target] = [unit.strip() for unit in out.splitlines() if unit.strip()]
+        return self._dependencies[target]
+
+    def get_enabled_units(self, units):
+        """
+            Return the units of units which are enabled.
+        """
+        missing = [unit for unit in units if unit not in self._unit_file_states]
+        if missing:
+            out, _ = clicommon.run_command("systemctl is-enabled {}".format(' '.join(missing)), return_cmd=True)
+            for unit, state in zip(missing, out.splitlines()):
+                self._unit_file_states[unit] = state.strip()
+        return [unit for unit in units if self._unit_file_states.get(unit) == "enabled"]
+
+    def prefetch(self, units, properties):
+        """
+            Read properties of all the units with one 'systemctl show'.
+            A property not shown for a unit is read as an empty string.
+        """
+        missing = [unit for unit in units
+                   if any((unit, prop) not in self._properties for prop in properties)]
+        if not missing:
+            return
+
+        # Id is shown for any unit, so that every unit has its block
+        out, _ = clicommon.run_command("systemctl show {} --property=Id,{}".format(' '.join(missing), ','.join(properties)),
+                                       return_cmd=True)
+        blocks = parse_show_output(out)
+        for i, unit in enumerate(missing):
+            block = blocks[i] if i < len(blocks) else {}
+            for prop in properties:
+                self._properties[(unit, prop)] = block.get(prop, '')
+
+    def get_property(self, unit, prop):
+        self.prefetch([unit], [prop])
+        return self._properties[(unit, prop)]
+
+    def reset_failed(self, units):
+        """
+            Reset the failed state of units with one 'systemctl reset-failed'.
+        """
+        if units:
+            clicommon.run_command("systemctl reset-failed {}".format(' '.join(units)))